@@ -9,6 +9,7 @@ BASE_URL = "https://web-production-3b1a6.up.railway.app/api/"
 USERNAME = "admin"
 PASSWORD = "admin123"
 EXPORT_FILE = "full_database_export.json"
+BULK_BATCH_SIZE = 1000
 
 def get_auth_token(username, password):
     print("Logging in to get authentication token...")
@@ -29,7 +30,7 @@ def clear_all_products(token):
     
     # Get all products
     try:
-        response = requests.get(f"{BASE_URL}products/", headers=headers)
+        response = requests.get(f"{BASE_URL}products/?paginate=false", headers=headers)
         response.raise_for_status()
         products = response.json()
         print(f"Found {len(products)} products to delete")
@@ -55,37 +56,42 @@ def clear_all_products(token):
 
 def upload_products_once(token, products_data):
     headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
-    success_count = 0
     
     print(f"Uploading {len(products_data)} products (once only)...")
     
+    # Extract data from the 'fields' structure
+    clean_products = []
     for product_data in products_data:
+        fields = product_data.get('fields', {})
+        clean_products.append({
+            'name': fields.get('name', ''),
+            'buying_price': fields.get('buying_price', '0.00'),
+            'selling_price': fields.get('selling_price', '0.00'),
+            'stock_qty': fields.get('stock_qty', 0),
+            'is_bulk_product': fields.get('is_bulk_product', False),
+            'units_per_box': fields.get('units_per_box', 1),
+        })
+    
+    # One request per batch; the server applies each batch in a single transaction
+    success_count = 0
+    for start in range(0, len(clean_products), BULK_BATCH_SIZE):
+        batch = clean_products[start:start + BULK_BATCH_SIZE]
         try:
-            # Extract data from the 'fields' structure
-            fields = product_data.get('fields', {})
-            
-            # Create clean product data
-            clean_product = {
-                'name': fields.get('name', ''),
-                'buying_price': fields.get('buying_price', '0.00'),
-                'selling_price': fields.get('selling_price', '0.00'),
-                'stock_qty': fields.get('stock_qty', 0),
-                'is_bulk_product': fields.get('is_bulk_product', False),
-                'units_per_box': fields.get('units_per_box', 1),
-            }
-            
-            response = requests.post(f"{BASE_URL}products/", headers=headers, json=clean_product)
+            response = requests.post(f"{BASE_URL}products/bulk-upsert/", headers=headers, json={'products': batch})
+            if response.status_code == 400 and 'results' in response.json():
+                for result in response.json()['results']:
+                    if result['status'] == 'error':
+                        print(f"✗ Failed to create product {batch[result['index']]['name']}: {result['errors']}")
+                print("✗ Batch rejected, nothing from it was saved")
+                continue
             response.raise_for_status()
-            success_count += 1
-            
-            if success_count % 20 == 0:
-                print(f"✓ Created {success_count} products so far...")
-                
+            summary = response.json()
+            success_count += summary['created'] + summary['updated']
+            print(f"✓ Batch saved: {summary['created']} created, {summary['updated']} updated ({success_count} so far)")
         except RequestException as e:
-            product_name = fields.get('name', 'Unknown')
-            print(f"✗ Failed to create product {product_name}: {e}")
+            print(f"✗ Failed to upload batch starting at product {start}: {e}")
     
-    print(f"\n✓ Successfully created {success_count} products!")
+    print(f"\n✓ Successfully saved {success_count} products!")
     return success_count
 
 def main():
@@ -123,7 +129,7 @@ def main():
     print("\nVerifying final upload...")
     headers = {"Authorization": f"Bearer {token}"}
     try:
-        response = requests.get(f"{BASE_URL}products/", headers=headers)
+        response = requests.get(f"{BASE_URL}products/?paginate=false", headers=headers)
         response.raise_for_status()
         products = response.json()
         print(f"✓ Final product count: {len(products)}")
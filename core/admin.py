@@ -1,6 +1,6 @@
 from django.contrib import admin
 from import_export.admin import ImportExportModelAdmin
-from .models import Category, Product, Sale, Expense, AuditLog
+from .models import Category, Product, Sale, Expense, AuditLog, DailySalesSummary, ReportJob, StockMovement, StockSnapshot
 
 class ProductAdmin(ImportExportModelAdmin):
     list_display = ('name', 'buying_price', 'selling_price', 'stock_qty')
@@ -10,3 +10,14 @@ admin.site.register(Product, ProductAdmin)
 admin.site.register(Sale)
 admin.site.register(Expense)
 admin.site.register(AuditLog)
+admin.site.register(DailySalesSummary)
+admin.site.register(ReportJob)
+
+
+class StockMovementAdmin(admin.ModelAdmin):
+    list_display = ('created_at', 'product', 'kind', 'quantity', 'user', 'note')
+    list_filter = ('kind',)
+    raw_id_fields = ('product', 'sale')
+
+admin.site.register(StockMovement, StockMovementAdmin)
+admin.site.register(StockSnapshot)
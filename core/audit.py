@@ -0,0 +1,121 @@
+import atexit
+import json
+import logging
+import threading
+import time
+from contextlib import nullcontext
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.db.models.fields.files import FieldFile
+from .models import AuditLog
+
+logger = logging.getLogger(__name__)
+
+
+def audit_is_strict():
+    return settings.AUDIT_LOG_STRICT
+
+
+def audit_atomic():
+    """Transaction around a write and its audit entries in strict mode; a no-op otherwise"""
+    return transaction.atomic() if audit_is_strict() else nullcontext()
+
+
+class AuditBuffer:
+    """Per-process queue of audit entries, written with bulk_create once it is
+    large or old enough.
+
+    Flushes happen after a response is sent (see flush_if_due), from a timer
+    when the process goes idle, and at exit. Entries still queued when the
+    process is killed are lost; use strict mode where that is unacceptable.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = []
+        self._oldest = None
+        self._timer = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, entry):
+        with self._lock:
+            self._entries.append(entry)
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+                self._timer = threading.Timer(settings.AUDIT_LOG_FLUSH_SECONDS, self._flush_from_timer)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def is_due(self):
+        return self._oldest is not None and (
+            len(self._entries) >= settings.AUDIT_LOG_BUFFER_SIZE
+            or time.monotonic() - self._oldest >= settings.AUDIT_LOG_FLUSH_SECONDS
+        )
+
+    def flush_if_due(self):
+        if self.is_due():
+            self.flush()
+
+    def flush(self):
+        """Write every queued entry; returns how many"""
+        with self._lock:
+            entries, self._entries, self._oldest = self._entries, [], None
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if not entries:
+            return 0
+        try:
+            AuditLog.objects.bulk_create(entries, batch_size=500)
+        except Exception:
+            logger.exception(
+                "Dropped %d audit entries: %s", len(entries),
+                '; '.join(f"{e.action} {e.model} {e.object_id} {e.details}" for e in entries),
+            )
+            return 0
+        return len(entries)
+
+    def _flush_from_timer(self):
+        try:
+            self.flush()
+        finally:
+            # Timer threads get their own connection; don't leave it open
+            connection.close()
+
+
+audit_buffer = AuditBuffer()
+atexit.register(audit_buffer.flush)
+
+
+def snapshot(instance, exclude=()):
+    """JSON-safe values of an instance's editable fields, to diff before and after a save"""
+    values = {}
+    for field in instance._meta.concrete_fields:
+        if field.primary_key or getattr(field, 'auto_now', False) or field.name in exclude:
+            continue
+        value = getattr(instance, field.attname)
+        if isinstance(value, FieldFile):
+            value = value.name or None
+        values[field.attname] = json.loads(json.dumps(value, cls=DjangoJSONEncoder))
+    return values
+
+
+def diff(before, after):
+    """{field: [before, after]} for every field whose value changed"""
+    return {name: [before.get(name), value] for name, value in after.items() if before.get(name) != value}
+
+
+def log_action(user, action, model, object_id, details='', changes=None):
+    """Record an audit entry for a write.
+
+    Inside a transaction (always the case in strict mode, see audit_atomic)
+    the entry is written with it, so both commit or roll back together.
+    Otherwise it is queued and written in a batch after the response.
+    """
+    entry = AuditLog(user=user, action=action, model=model, object_id=str(object_id), details=details, changes=changes or {})
+    if audit_is_strict() or connection.in_atomic_block:
+        entry.save()
+    else:
+        audit_buffer.add(entry)
@@ -0,0 +1,140 @@
+import gzip
+import json
+import os
+from datetime import timedelta
+from pathlib import Path
+from django.conf import settings
+from django.db import transaction
+from .models import AuditLog, business_date
+
+# Entries per gzip member; a search decompresses only the members it needs
+ARCHIVE_BLOCK_SIZE = 1000
+DELETE_BATCH_SIZE = 500
+ARCHIVE_SEARCH_LIMIT = 1000
+ARCHIVE_SEARCH_MAX_DAYS = 31
+
+
+def archive_paths(day, archive_dir=None):
+    """(data file, offset index) for one business day: YYYY/MM/audit-YYYY-MM-DD.jsonl.gz"""
+    folder = Path(archive_dir or settings.AUDIT_ARCHIVE_DIR) / f"{day:%Y}" / f"{day:%m}"
+    return folder / f"audit-{day.isoformat()}.jsonl.gz", folder / f"audit-{day.isoformat()}.idx.json"
+
+
+def _read_index(index_path):
+    if not index_path.exists():
+        return []
+    with open(index_path) as f:
+        return json.load(f)['blocks']
+
+
+def _entry_dict(log):
+    return {
+        'id': log.id,
+        'timestamp': log.timestamp.isoformat(),
+        'user': log.user_id,
+        'username': log.user.username if log.user_id else None,
+        'action': log.action,
+        'model': log.model,
+        'object_id': log.object_id,
+        'details': log.details,
+        'changes': log.changes,
+    }
+
+
+def _write_day(day, entries, archive_dir):
+    """Append entries to the day's archive in gzip members and extend its index"""
+    data_path, index_path = archive_paths(day, archive_dir)
+    data_path.parent.mkdir(parents=True, exist_ok=True)
+    blocks = _read_index(index_path)
+    with open(data_path, 'ab') as f:
+        for start in range(0, len(entries), ARCHIVE_BLOCK_SIZE):
+            block = entries[start:start + ARCHIVE_BLOCK_SIZE]
+            payload = gzip.compress(''.join(json.dumps(entry) + '\n' for entry in block).encode())
+            blocks.append({
+                'offset': f.tell(),
+                'length': len(payload),
+                'count': len(block),
+                'first': block[0]['timestamp'],
+                'last': block[-1]['timestamp'],
+                'models': sorted({entry['model'] for entry in block}),
+                'actions': sorted({entry['action'] for entry in block}),
+                'users': sorted({entry['user'] for entry in block if entry['user'] is not None}),
+            })
+            f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    # Replace the index in one step so a reader never sees it half written
+    tmp_path = index_path.with_suffix('.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump({'date': day.isoformat(), 'blocks': blocks}, f)
+    os.replace(tmp_path, index_path)
+
+
+def _delete(ids):
+    with transaction.atomic():
+        for start in range(0, len(ids), DELETE_BATCH_SIZE):
+            AuditLog.objects.filter(id__in=ids[start:start + DELETE_BATCH_SIZE]).delete()
+
+
+def archive_audit_logs(before, archive_dir=None):
+    """Move audit entries older than before into the archive; returns {day: count}.
+
+    Each day is written and synced before its rows are deleted, so an
+    interrupted run loses nothing; rerunning it may archive a day's last
+    entries twice.
+    """
+    logs = AuditLog.objects.filter(timestamp__lt=before).select_related('user').order_by('timestamp', 'id')
+    archived = {}
+    day, entries = None, []
+    for log in logs.iterator(chunk_size=2000):
+        log_day = business_date(log.timestamp)
+        if log_day != day and entries:
+            _write_day(day, entries, archive_dir)
+            _delete([entry['id'] for entry in entries])
+            archived[day] = len(entries)
+            entries = []
+        day = log_day
+        entries.append(_entry_dict(log))
+    if entries:
+        _write_day(day, entries, archive_dir)
+        _delete([entry['id'] for entry in entries])
+        archived[day] = len(entries)
+    return archived
+
+
+def _matches(entry, user, model, action, object_id):
+    return (
+        (user is None or entry['user'] == user)
+        and (model is None or entry['model'] == model)
+        and (action is None or entry['action'] == action)
+        and (object_id is None or entry['object_id'] == object_id)
+    )
+
+
+def search_archive(from_date, to_date, user=None, model=None, action=None, object_id=None, limit=None, archive_dir=None):
+    """Archived entries between two business dates (inclusive), oldest first.
+
+    Blocks whose index shows they can't match are skipped without being read.
+    """
+    found = []
+    day = from_date
+    while day <= to_date:
+        data_path, index_path = archive_paths(day, archive_dir)
+        blocks = [
+            block for block in _read_index(index_path)
+            if (model is None or model in block['models'])
+            and (action is None or action in block['actions'])
+            and (user is None or user in block['users'])
+        ]
+        if blocks:
+            with open(data_path, 'rb') as f:
+                for block in blocks:
+                    f.seek(block['offset'])
+                    for line in gzip.decompress(f.read(block['length'])).splitlines():
+                        entry = json.loads(line)
+                        if _matches(entry, user, model, action, object_id):
+                            found.append(entry)
+                            if limit is not None and len(found) >= limit:
+                                return found
+        day += timedelta(days=1)
+    return found
@@ -0,0 +1,100 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from .models import TokenVersion
+
+TOKEN_VERSION_CLAIM = 'ver'
+# Stands for a deleted or deactivated user, whose tokens never match
+REVOKED = -1
+# Claims copied onto the lightweight request user, with the groups claim
+USER_CLAIMS = ('username', 'is_superuser', 'is_staff')
+
+
+def _version_key(user_id):
+    return f'token-version:{user_id}'
+
+
+def load_token_version(user_id):
+    """The user's token version from the database, or REVOKED"""
+    rows = list(User.objects.filter(pk=user_id, is_active=True).values_list('token_version__version', flat=True)[:1])
+    if not rows:
+        return REVOKED
+    return rows[0] or 0
+
+
+def current_token_version(user_id):
+    """load_token_version, cached for TOKEN_VERSION_CACHE_SECONDS"""
+    version = cache.get(_version_key(user_id))
+    if version is None:
+        version = load_token_version(user_id)
+        cache.set(_version_key(user_id), version, settings.TOKEN_VERSION_CACHE_SECONDS)
+    return version
+
+
+def forget_token_version(user_id):
+    """Drop the cached version once the current transaction commits"""
+    transaction.on_commit(lambda: cache.delete(_version_key(user_id)))
+
+
+def revoke_tokens(user_id):
+    """Invalidate every token issued to the user so far"""
+    TokenVersion.bump(user_id)
+    forget_token_version(user_id)
+
+
+def user_group_names(user):
+    """Group names from the token claims, or from the database for a full user"""
+    if getattr(user, 'group_names', None) is None:
+        user.group_names = frozenset(user.groups.values_list('name', flat=True))
+    return user.group_names
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """Issues tokens carrying the user's roles and token version"""
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        for claim in USER_CLAIMS:
+            token[claim] = getattr(user, claim)
+        token['groups'] = sorted(user.groups.values_list('name', flat=True))
+        token[TOKEN_VERSION_CLAIM] = load_token_version(user.pk)
+        return token
+
+
+class VersionCheckedTokenRefreshSerializer(TokenRefreshSerializer):
+    """Refuses refresh tokens issued before the user's roles last changed"""
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        version = refresh.get(TOKEN_VERSION_CLAIM)
+        if version is not None and version != load_token_version(refresh[api_settings.USER_ID_CLAIM]):
+            raise InvalidToken('Token has been revoked')
+        return super().validate(attrs)
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """JWT authentication that builds request.user from the token's claims.
+
+    The user is a User instance with only the claimed fields loaded, so it
+    works as a foreign key value without a query; any other field is
+    fetched on first access, and save() only writes the loaded fields. The
+    token version is checked against a short-lived cache instead of the
+    database. Tokens issued without claims fall back to a database lookup.
+    """
+    def get_user(self, validated_token):
+        if TOKEN_VERSION_CLAIM not in validated_token:
+            return super().get_user(validated_token)
+        user_id = validated_token[api_settings.USER_ID_CLAIM]
+        if validated_token[TOKEN_VERSION_CLAIM] != current_token_version(user_id):
+            raise AuthenticationFailed('Token has been revoked', code='token_revoked')
+        loaded = {'id': user_id, 'is_active': True, **{claim: validated_token[claim] for claim in USER_CLAIMS}}
+        # from_db takes values in the model's field order
+        names = [field.attname for field in User._meta.concrete_fields if field.attname in loaded]
+        user = User.from_db(DEFAULT_DB_ALIAS, names, [loaded[name] for name in names])
+        user.group_names = frozenset(validated_token.get('groups', ()))
+        return user
@@ -0,0 +1,125 @@
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import serializers
+from .audit import snapshot, diff
+from .models import Product, CatalogVersion, StockMovement
+from .reports import invalidate_reports_cache
+from .serializers import ProductBulkRowSerializer
+
+BULK_UPSERT_MAX_ROWS = 5000
+BULK_BATCH_SIZE = 500
+
+
+def _match_existing(rows):
+    """Existing products for the batch, looked up by SKU and by name in two queries"""
+    skus = {row.get('sku') for row in rows if isinstance(row, dict) and row.get('sku')}
+    names = {row.get('name') for row in rows if isinstance(row, dict) and row.get('name')}
+    by_sku = {product.sku: product for product in Product.objects.filter(sku__in=skus)}
+    by_name = {}
+    for product in Product.objects.filter(name__in=names).order_by('id'):
+        by_name.setdefault(product.name, []).append(product)
+    return by_sku, by_name
+
+
+def bulk_upsert_products(rows):
+    """Create or update products from a list of dicts in one transaction.
+
+    Rows match an existing product by SKU, then by exact name; unmatched rows
+    are created. Matched rows only change the fields they include. If any row
+    is invalid nothing is written. Returns (results, created, updated) with
+    one result per input row; updated rows carry the fields they changed.
+    """
+    by_sku, by_name = _match_existing(rows)
+    # Building a ModelSerializer's fields is the slow part, so two validators serve every row
+    create_validator = ProductBulkRowSerializer()
+    update_validator = ProductBulkRowSerializer(partial=True)
+    results = []
+    to_create = []
+    to_update = []
+    stock_changes = []
+    update_fields = set()
+    seen = set()
+    matched_ids = set()
+    has_errors = False
+
+    for index, row in enumerate(rows):
+        if not isinstance(row, dict):
+            results.append({'index': index, 'status': 'error', 'errors': {'non_field_errors': ['Expected an object']}})
+            has_errors = True
+            continue
+        sku = row.get('sku') or None
+        name = row.get('name')
+        key = ('sku', sku) if sku else ('name', name)
+        if key in seen:
+            results.append({'index': index, 'status': 'error', 'errors': {key[0]: ['Appears more than once in this upload']}})
+            has_errors = True
+            continue
+        seen.add(key)
+
+        instance = by_sku.get(sku) if sku else None
+        if instance is None and name in by_name:
+            matches = by_name[name]
+            if len(matches) > 1:
+                results.append({'index': index, 'status': 'error', 'errors': {'name': [f'Matches {len(matches)} products; give a sku instead']}})
+                has_errors = True
+                continue
+            instance = matches[0]
+            if sku and instance.sku and instance.sku != sku:
+                # Same name but a different SKU is a different product
+                instance = None
+        if instance is not None:
+            if instance.id in matched_ids:
+                results.append({'index': index, 'status': 'error', 'errors': {key[0]: [f'Matches product {instance.id}, which another row already updates']}})
+                has_errors = True
+                continue
+            matched_ids.add(instance.id)
+
+        validator = create_validator if instance is None else update_validator
+        try:
+            data = validator.run_validation(row)
+        except serializers.ValidationError as e:
+            results.append({'index': index, 'status': 'error', 'errors': e.detail})
+            has_errors = True
+            continue
+        if instance is None:
+            to_create.append(Product(**data))
+            results.append({'index': index, 'status': 'created', 'name': data['name']})
+        else:
+            if 'stock_qty' in data and data['stock_qty'] != instance.stock_qty:
+                stock_changes.append((instance, data['stock_qty'] - instance.stock_qty))
+            before = snapshot(instance)
+            for field, value in data.items():
+                setattr(instance, field, value)
+            update_fields.update(data)
+            to_update.append(instance)
+            results.append({'index': index, 'status': 'updated', 'id': instance.id, 'name': instance.name,
+                            'changes': diff(before, snapshot(instance))})
+
+    if has_errors:
+        for result in results:
+            if result['status'] != 'error':
+                result['status'] = 'skipped'
+        return results, 0, 0
+
+    with transaction.atomic():
+        created = Product.objects.bulk_create(to_create, batch_size=BULK_BATCH_SIZE)
+        if to_update:
+            now = timezone.now()
+            for product in to_update:
+                product.updated_at = now
+            # bulk_update skips auto_now and model signals, so stamp and invalidate by hand
+            Product.objects.bulk_update(to_update, sorted(update_fields | {'updated_at'}), batch_size=BULK_BATCH_SIZE)
+        # bulk_create and bulk_update skip Product.save(), which records stock movements
+        stock_changes += [(product, product.stock_qty) for product in created if product.stock_qty]
+        StockMovement.objects.bulk_create([
+            StockMovement(product=product, kind='import', quantity=change, note='Bulk upload')
+            for product, change in stock_changes
+        ], batch_size=BULK_BATCH_SIZE)
+        CatalogVersion.bump_on_commit()
+        transaction.on_commit(invalidate_reports_cache)
+
+    created_ids = iter(product.id for product in created)
+    for result in results:
+        if result['status'] == 'created':
+            result['id'] = next(created_ids)
+    return results, len(created), len(to_update)
@@ -0,0 +1,124 @@
+from collections import defaultdict
+from decimal import Decimal
+from django.db import transaction
+from django.db.models import Case, When, F, Q
+from django.utils import timezone
+from rest_framework import serializers
+from .audit import log_action
+from .models import Product, Sale, DailySalesSummary, BusinessSettings, CatalogVersion, StockMovement
+from .reports import invalidate_reports_cache
+
+CHECKOUT_MAX_LINES = 100
+
+
+class CheckoutLineSerializer(serializers.Serializer):
+    # A plain id: products are loaded together in one query, not one per line
+    product = serializers.IntegerField()
+    quantity = serializers.IntegerField(min_value=1)
+    price = serializers.DecimalField(max_digits=12, decimal_places=2, min_value=Decimal('0'))
+    discount = serializers.DecimalField(max_digits=12, decimal_places=2, min_value=Decimal('0'), default=Decimal('0'))
+
+
+class CheckoutSerializer(serializers.Serializer):
+    payment_type = serializers.ChoiceField(choices=Sale._meta.get_field('payment_type').choices)
+    items = CheckoutLineSerializer(many=True, allow_empty=False, max_length=CHECKOUT_MAX_LINES)
+
+
+class CheckoutError(Exception):
+    """Raised with per-line errors when a cart can't be sold"""
+    def __init__(self, errors):
+        super().__init__(errors)
+        self.errors = errors
+
+
+def _deduct_all(needed):
+    """Deduct stock for every product in one conditional UPDATE; True if all rows had enough"""
+    condition = Q()
+    for product_id, quantity in needed.items():
+        condition |= Q(id=product_id, stock_qty__gte=quantity)
+    updated = Product.objects.filter(condition).update(
+        stock_qty=Case(*[When(id=product_id, then=F('stock_qty') - quantity) for product_id, quantity in needed.items()]),
+        updated_at=timezone.now(),
+    )
+    return updated == len(needed)
+
+
+def checkout(items, payment_type, user):
+    """Sell a cart of line items in one transaction and return the created sales.
+
+    Stock for all lines is checked with one query and deducted with one
+    UPDATE, sales are bulk inserted and one audit entry is logged. Call it
+    inside audit_atomic() so strict mode commits the entry with the sales.
+    Raises CheckoutError with {line index: message} if any line can't be sold.
+    """
+    needed = defaultdict(int)
+    for item in items:
+        needed[item['product']] += item['quantity']
+
+    with transaction.atomic():
+        products = Product.objects.select_for_update().in_bulk(list(needed))
+        errors = {}
+        for index, item in enumerate(items):
+            product = products.get(item['product'])
+            if product is None:
+                errors[index] = f"Product {item['product']} not found"
+            elif product.stock_qty < needed[product.id]:
+                errors[index] = f"Insufficient stock for {product.name}. Available: {product.stock_qty}, Requested: {needed[product.id]}"
+        if errors:
+            raise CheckoutError(errors)
+        if not _deduct_all(needed):
+            # Only possible where select_for_update is a no-op and another till got in first
+            raise CheckoutError({'non_field_errors': 'Stock changed during checkout, please try again'})
+
+        sales = Sale.objects.bulk_create([
+            Sale(
+                product=products[item['product']],
+                quantity=item['quantity'],
+                price=item['price'],
+                discount=item['discount'],
+                payment_type=payment_type,
+                user=user,
+                unit_cost=products[item['product']].unit_cost,
+            )
+            for item in items
+        ])
+        # bulk_create skips Sale.save() and signals, so do their bookkeeping here
+        StockMovement.objects.bulk_create([
+            StockMovement(product=sale.product, kind='sale', quantity=-sale.quantity, sale=sale, user=user)
+            for sale in sales
+        ])
+        DailySalesSummary.record_sales(sales)
+        CatalogVersion.bump_on_commit()
+        transaction.on_commit(invalidate_reports_cache)
+    total = sum((sale.line_total for sale in sales), Decimal('0'))
+    log_action(user, 'create', 'Sale', sales[0].id, f"Checkout of {len(sales)} items (sales #{sales[0].id}-{sales[-1].id}), total {total}")
+    return sales
+
+
+def build_receipt(sales, user):
+    business = BusinessSettings.cached()
+    lines = [
+        {
+            'sale_id': sale.id,
+            'product': sale.product_id,
+            'product_name': sale.product.name,
+            'quantity': sale.quantity,
+            'price': sale.price,
+            'discount': sale.discount,
+            'line_total': sale.line_total,
+        }
+        for sale in sales
+    ]
+    return {
+        'receipt_number': f"R{sales[0].id}",
+        'business_name': business.business_name,
+        'currency': business.currency,
+        'date': sales[0].date,
+        'cashier': user.username,
+        'payment_type': sales[0].payment_type,
+        'lines': lines,
+        'item_count': sum(sale.quantity for sale in sales),
+        'subtotal': sum((Decimal(str(sale.price)) * sale.quantity for sale in sales), Decimal('0')),
+        'discount_total': sum((Decimal(str(sale.discount)) for sale in sales), Decimal('0')),
+        'total': sum((sale.line_total for sale in sales), Decimal('0')),
+    }
@@ -0,0 +1,280 @@
+import csv
+import json
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from .models import BusinessSettings, business_date, get_business_timezone
+from .reports import filter_sales
+
+try:
+    from openpyxl import Workbook
+    OPENPYXL_AVAILABLE = True
+except ImportError:
+    OPENPYXL_AVAILABLE = False
+
+try:
+    from reportlab.pdfgen import canvas
+    REPORTLAB_AVAILABLE = True
+except ImportError:
+    REPORTLAB_AVAILABLE = False
+
+EXPORT_CHUNK_SIZE = 2000
+
+
+def iter_report_sales(from_date=None, to_date=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """Sales for a report, newest first, fetched in chunks with their product joined"""
+    sales = filter_sales(from_date, to_date).select_related('product').order_by('-date', '-id')
+    return sales.iterator(chunk_size=chunk_size)
+
+
+def sale_product_name(sale):
+    return sale.product.name if sale.product else f"Product {sale.product_id}"
+
+
+def write_sales_excel(fileobj, from_date=None, to_date=None):
+    """Write the sales report workbook to fileobj.
+
+    Uses openpyxl's write-only mode, so rows are flushed to disk as they
+    are appended and memory stays flat however many sales are exported.
+    """
+    business = BusinessSettings.cached()
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Sales Report")
+
+    # Add header
+    ws.append([f"{business.business_name} Sales Report"])
+    ws.append([f"Generated on: {timezone.localtime(timezone.now(), get_business_timezone()).strftime('%Y-%m-%d %H:%M:%S')}"])
+    ws.append([])  # Empty row
+
+    # Add column headers
+    currency = business.currency
+    headers = ["ID", "Date", "Product", "Quantity", f"Price ({currency})", f"Discount ({currency})", f"Total ({currency})", "Payment Type"]
+    ws.append(headers)
+
+    # Add data
+    total_revenue = 0
+    total_sales = 0
+    for sale in iter_report_sales(from_date, to_date):
+        try:
+            sale_total = float(sale.price) * sale.quantity - float(sale.discount or 0)
+            total_revenue += sale_total
+        except (ValueError, TypeError):
+            sale_total = 0
+        total_sales += 1
+
+        ws.append([
+            sale.id,
+            business_date(sale.date).isoformat(),
+            sale_product_name(sale),
+            sale.quantity,
+            float(sale.price),
+            float(sale.discount),
+            sale_total,
+            sale.payment_type
+        ])
+
+    # Add summary
+    ws.append([])  # Empty row
+    ws.append(["Summary"])
+    ws.append(["Total Revenue", total_revenue])
+    ws.append(["Total Sales", total_sales])
+
+    wb.save(fileobj)
+    return total_sales
+
+
+# PDF page layout (points, letter size)
+PDF_PAGE_SIZE = (612, 792)
+PDF_FIRST_ROW_Y = 670
+PDF_CONTINUED_ROW_Y = 700
+PDF_LAST_ROW_Y = 80
+PDF_ROW_HEIGHT = 18
+PDF_SUMMARY_HEIGHT = 90
+
+
+def _pdf_page_count(row_count):
+    """Number of pages the PDF report needs for row_count sales"""
+    if row_count == 0:
+        return 1
+    pages = 1
+    y = PDF_FIRST_ROW_Y
+    for _ in range(row_count):
+        if y < PDF_LAST_ROW_Y:
+            pages += 1
+            y = PDF_CONTINUED_ROW_Y
+        y -= PDF_ROW_HEIGHT
+    # The summary box goes on a new page if it doesn't fit under the last row
+    if y - PDF_SUMMARY_HEIGHT < PDF_LAST_ROW_Y - PDF_ROW_HEIGHT:
+        pages += 1
+    return pages
+
+
+class SalesPdfWriter:
+    """Draws the sales report page by page with repeating headers and subtotals"""
+
+    def __init__(self, fileobj, from_date=None, to_date=None, currency=None):
+        business = BusinessSettings.cached()
+        self.from_date = from_date
+        self.to_date = to_date
+        self.business_name = business.business_name
+        self.currency = currency or business.currency
+        # Compress page streams so a long report stays small while it's being built
+        self.canvas = canvas.Canvas(fileobj, pagesize=PDF_PAGE_SIZE, pageCompression=1)
+        self.canvas.setTitle(f"{self.business_name} Sales Report")
+        self.canvas.setAuthor("Moto Spares Manager")
+        self.canvas.setSubject("Sales Report")
+        self.canvas.setCreator("Moto Spares Manager")
+        self.page_number = 0
+        self.total_pages = 1
+        self.page_total = 0
+        self.page_rows = 0
+        self.y = 0
+
+    def start_page(self):
+        p = self.canvas
+        self.page_number += 1
+        self.page_total = 0
+        self.page_rows = 0
+        if self.page_number == 1:
+            p.setFont("Helvetica-Bold", 18)
+            p.drawString(50, 750, f"{self.business_name.upper()} SALES REPORT")
+            p.setFont("Helvetica", 10)
+            p.drawString(50, 730, f"Generated on: {timezone.localtime(timezone.now(), get_business_timezone()).strftime('%Y-%m-%d %H:%M:%S')}")
+            # Add date range if specified
+            if self.from_date or self.to_date:
+                p.drawString(50, 710, f"Date Range: {self.from_date or 'Start'} to {self.to_date or 'End'}")
+            header_y = 690
+        else:
+            p.setFont("Helvetica-Bold", 12)
+            p.drawString(50, 750, "Sales Report (Continued)")
+            header_y = 720
+        self.y = header_y - 20
+
+    def draw_table_header(self):
+        p = self.canvas
+        header_y = self.y + 20
+        p.setFont("Helvetica-Bold", 11)
+        p.drawString(50, header_y, "Date")
+        p.drawString(120, header_y, "Product")
+        p.drawString(320, header_y, "Qty")
+        p.drawString(380, header_y, "Price")
+        p.drawString(480, header_y, "Total")
+        p.line(50, header_y - 5, 550, header_y - 5)
+        p.setFont("Helvetica", 10)
+
+    def finish_page(self):
+        p = self.canvas
+        if self.page_rows:
+            p.setFont("Helvetica-Bold", 9)
+            p.drawString(320, 60, f"Page subtotal ({self.page_rows} sales):")
+            p.drawString(480, 60, f"{self.currency} {self.page_total:,.2f}")
+        p.setFont("Helvetica", 8)
+        p.drawString(50, 30, "Generated by Moto Spares Manager")
+        p.drawString(50, 20, f"Page {self.page_number} of {self.total_pages}")
+        p.showPage()
+
+    def draw_row(self, sale):
+        p = self.canvas
+        if self.y < PDF_LAST_ROW_Y:
+            self.finish_page()
+            self.start_page()
+            self.draw_table_header()
+
+        # Calculate total with error handling
+        try:
+            sale_total = float(sale.price) * sale.quantity - float(sale.discount or 0)
+        except (ValueError, TypeError):
+            sale_total = 0
+
+        product_name = sale_product_name(sale)
+        display_name = product_name[:35] + "..." if len(product_name) > 35 else product_name
+        p.drawString(50, self.y, business_date(sale.date).isoformat())
+        p.drawString(120, self.y, display_name)
+        p.drawString(320, self.y, str(sale.quantity))
+        p.drawString(380, self.y, f"{self.currency} {sale.price}")
+        p.drawString(480, self.y, f"{self.currency} {sale_total:.2f}")
+
+        # Draw subtle line between rows
+        p.setStrokeColorRGB(0.9, 0.9, 0.9)
+        p.line(50, self.y - 2, 550, self.y - 2)
+        p.setStrokeColorRGB(0, 0, 0)  # Reset to black
+
+        self.y -= PDF_ROW_HEIGHT
+        self.page_total += sale_total
+        self.page_rows += 1
+        return sale_total
+
+    def draw_summary(self, total_revenue, total_sales):
+        p = self.canvas
+        if self.y - PDF_SUMMARY_HEIGHT < PDF_LAST_ROW_Y - PDF_ROW_HEIGHT:
+            self.finish_page()
+            self.start_page()
+            self.y += 20
+        y = self.y
+        p.setFillColorRGB(0.95, 0.95, 0.95)
+        p.rect(50, y - 80, 500, 60, fill=1)
+        p.setFillColorRGB(0, 0, 0)  # Reset to black
+        p.setFont("Helvetica-Bold", 12)
+        p.drawString(60, y - 30, "SUMMARY")
+        p.setFont("Helvetica", 10)
+        p.drawString(60, y - 50, f"Total Revenue: {self.currency} {total_revenue:,.2f}")
+        p.drawString(60, y - 70, f"Total Sales: {total_sales}")
+
+    def write(self):
+        sales = filter_sales(self.from_date, self.to_date)
+        row_count = sales.count()
+        self.total_pages = _pdf_page_count(row_count)
+
+        self.start_page()
+        total_revenue = 0
+        total_sales = 0
+        if row_count == 0:
+            self.canvas.drawString(50, 690, "No sales data available")
+        else:
+            self.draw_table_header()
+            for sale in iter_report_sales(self.from_date, self.to_date):
+                total_revenue += self.draw_row(sale)
+                total_sales += 1
+            self.draw_summary(total_revenue, total_sales)
+        self.finish_page()
+        self.canvas.save()
+        return total_sales
+
+
+def write_sales_pdf(fileobj, from_date=None, to_date=None):
+    """Write the paginated sales report PDF to fileobj"""
+    return SalesPdfWriter(fileobj, from_date, to_date).write()
+
+
+class _Echo:
+    """File-like object that hands back whatever is written, for streaming csv.writer output"""
+    def write(self, value):
+        return value
+
+
+def iter_csv(rows, header):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def iter_ndjson(rows, header):
+    for row in rows:
+        yield json.dumps(dict(zip(header, row)), cls=DjangoJSONEncoder) + '\n'
+
+
+STREAM_FORMATS = {
+    'csv': (iter_csv, 'text/csv', 'csv'),
+    'ndjson': (iter_ndjson, 'application/x-ndjson', 'ndjson'),
+}
+
+
+def streaming_export_response(queryset, fields, output, filename, chunk_size=EXPORT_CHUNK_SIZE):
+    """Stream queryset rows as CSV or NDJSON without loading them all into memory"""
+    stream, content_type, extension = STREAM_FORMATS[output]
+    rows = queryset.values_list(*fields).iterator(chunk_size=chunk_size)
+    header = [field.replace('__', '_') for field in fields]
+    response = StreamingHttpResponse(stream(rows, header), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{extension}"'
+    return response
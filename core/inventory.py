@@ -0,0 +1,79 @@
+from datetime import date, datetime, timezone as dt_timezone
+from decimal import Decimal
+from django.db import transaction
+from django.db.models import Exists, F, OuterRef, Subquery, Sum, Value, DateTimeField, IntegerField, DecimalField
+from django.db.models.functions import Coalesce
+from .models import Product, StockMovement, StockSnapshot, business_midnight
+
+# Earlier than any snapshot; products without one have their whole history in the ledger
+EPOCH = datetime(2000, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def month_end(year, month):
+    """End of a month in business time: midnight starting the next month"""
+    return business_midnight(date(year + month // 12, month % 12 + 1, 1))
+
+
+def stock_as_of(moment, products=None):
+    """Products annotated with stock_at, their stock on hand at moment, and snapshot_cost.
+
+    Reads each product's latest snapshot at or before moment and adds only
+    the movements recorded after it, all in one query.
+    """
+    products = Product.objects.all() if products is None else products
+    snapshots = StockSnapshot.objects.filter(product=OuterRef('pk'), taken_at__lte=moment).order_by('-taken_at')
+    movements = (
+        StockMovement.objects.filter(product=OuterRef('pk'), created_at__gt=OuterRef('snapshot_at'), created_at__lte=moment)
+        .order_by().values('product').annotate(total=Sum('quantity')).values('total')
+    )
+    return products.annotate(
+        snapshot_at=Coalesce(Subquery(snapshots.values('taken_at')[:1]), Value(EPOCH), output_field=DateTimeField()),
+        snapshot_qty=Coalesce(Subquery(snapshots.values('stock_qty')[:1]), Value(0), output_field=IntegerField()),
+        snapshot_cost=Subquery(snapshots.values('unit_cost')[:1], output_field=DecimalField(max_digits=14, decimal_places=4)),
+    ).annotate(
+        stock_at=F('snapshot_qty') + Coalesce(Subquery(movements, output_field=IntegerField()), Value(0)),
+    )
+
+
+def inventory_value_at(moment):
+    """Total units and value of stock on hand at moment.
+
+    Stock is valued at the unit cost recorded in the snapshot it was read
+    from, or the product's current unit cost if it has none.
+    """
+    units = 0
+    value = Decimal('0')
+    rows = stock_as_of(moment).filter(stock_at__gt=0).only('buying_price', 'units_per_box', 'is_bulk_product')
+    for product in rows.iterator(chunk_size=2000):
+        cost = product.snapshot_cost if product.snapshot_cost is not None else product.unit_cost
+        units += product.stock_at
+        value += cost * product.stock_at
+    return {
+        'as_of': moment.isoformat(),
+        'total_units': units,
+        'inventory_value': float(value.quantize(Decimal('0.01'))),
+    }
+
+
+def take_snapshots(moment):
+    """Snapshot, at moment, every product whose stock moved since its last snapshot; returns how many.
+
+    Snapshots are derived from the ledger rather than stock_qty, so moment
+    should be safely in the past (e.g. last midnight) for every movement up
+    to it to have committed. Products without new movements are skipped:
+    their last snapshot still bounds the replay.
+    """
+    moved = StockMovement.objects.filter(product=OuterRef('pk'), created_at__gt=OuterRef('snapshot_at'), created_at__lte=moment)
+    products = (
+        stock_as_of(moment)
+        .filter(Exists(moved))
+        .only('buying_price', 'units_per_box', 'is_bulk_product')
+    )
+    snapshots = [
+        StockSnapshot(product_id=product.id, taken_at=moment, stock_qty=product.stock_at, unit_cost=product.unit_cost)
+        for product in products.iterator(chunk_size=2000)
+    ]
+    with transaction.atomic():
+        StockSnapshot.objects.bulk_create(snapshots, batch_size=2000, ignore_conflicts=True)
+    return len(snapshots)
+
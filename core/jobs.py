@@ -0,0 +1,88 @@
+import logging
+import os
+import tempfile
+from datetime import timedelta
+from django.conf import settings
+from django.core.files import File
+from django.utils import timezone
+from .exports import write_sales_excel, write_sales_pdf
+from .models import ReportJob
+from .reports import to_business_date
+
+logger = logging.getLogger(__name__)
+
+REPORT_WRITERS = {
+    'pdf': (write_sales_pdf, 'pdf'),
+    'excel': (write_sales_excel, 'xlsx'),
+}
+
+
+def report_job_ttl():
+    """How long a finished report is reused for identical requests"""
+    return timedelta(seconds=getattr(settings, 'REPORT_JOB_CACHE_TTL', 10 * 60))
+
+
+def enqueue_report_job(report_type, from_date=None, to_date=None, user=None):
+    """Queue a report, reusing a pending or recently finished identical job.
+
+    Dates are stored as business dates, so equivalent ranges share a job.
+    Returns (job, created); raises ValueError for a bad date.
+    """
+    from_date = to_business_date(from_date).isoformat() if from_date else ''
+    to_date = to_business_date(to_date).isoformat() if to_date else ''
+    identical = ReportJob.objects.filter(report_type=report_type, from_date=from_date, to_date=to_date)
+    existing = (
+        identical.filter(status__in=['queued', 'running']).order_by('-created_at').first()
+        or identical.filter(status='done', finished_at__gte=timezone.now() - report_job_ttl()).order_by('-finished_at').first()
+    )
+    if existing:
+        return existing, False
+    job = ReportJob.objects.create(report_type=report_type, from_date=from_date, to_date=to_date, requested_by=user)
+    return job, True
+
+
+def claim_next_job():
+    """Mark the oldest queued job as running and return it, or None if the queue is empty"""
+    for job_id in ReportJob.objects.filter(status='queued').order_by('created_at').values_list('id', flat=True)[:10]:
+        # The conditional update makes sure only one worker gets each job
+        claimed = ReportJob.objects.filter(id=job_id, status='queued').update(status='running', started_at=timezone.now())
+        if claimed:
+            return ReportJob.objects.get(id=job_id)
+    return None
+
+
+def run_report_job(job):
+    """Generate the report file for a claimed job and store it under MEDIA_ROOT"""
+    writer, extension = REPORT_WRITERS[job.report_type]
+    try:
+        with tempfile.TemporaryFile() as report_file:
+            writer(report_file, job.from_date or None, job.to_date or None)
+            report_file.seek(0)
+            job.file.save(f'sales_report_{job.id}.{extension}', File(report_file), save=False)
+        job.status = 'done'
+        job.error = ''
+    except Exception as e:
+        logger.exception("Report job %s failed", job.id)
+        job.status = 'failed'
+        job.error = str(e)
+    job.finished_at = timezone.now()
+    job.save(update_fields=['file', 'status', 'error', 'finished_at'])
+    return job
+
+
+def requeue_stale_jobs(max_runtime):
+    """Put jobs back in the queue if their worker died while running them"""
+    cutoff = timezone.now() - max_runtime
+    return ReportJob.objects.filter(status='running', started_at__lt=cutoff).update(status='queued', started_at=None)
+
+
+def prune_report_jobs(max_age):
+    """Delete old jobs together with their files"""
+    cutoff = timezone.now() - max_age
+    removed = 0
+    for job in ReportJob.objects.filter(created_at__lt=cutoff).exclude(status__in=['queued', 'running']).iterator():
+        if job.file and os.path.exists(job.file.path):
+            job.file.delete(save=False)
+        job.delete()
+        removed += 1
+    return removed
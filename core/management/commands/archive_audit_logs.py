@@ -0,0 +1,28 @@
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from core.audit_archive import archive_audit_logs
+from core.inventory import business_midnight
+from core.models import AuditLog, business_date
+
+
+class Command(BaseCommand):
+    help = "Move audit log entries older than the retention period into compressed daily archive files"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.AUDIT_LOG_RETENTION_DAYS, help="Keep this many days in the database")
+        parser.add_argument('--dry-run', action='store_true', help="Only report how many entries would be archived")
+
+    def handle(self, *args, **options):
+        before = business_midnight(business_date(timezone.now()) - timedelta(days=options['days']))
+        if options['dry_run']:
+            count = AuditLog.objects.filter(timestamp__lt=before).count()
+            self.stdout.write(f"{count} audit entries before {before.isoformat()} would be archived")
+            return
+        archived = archive_audit_logs(before)
+        for day, count in archived.items():
+            self.stdout.write(f"{day}: archived {count} entries")
+        self.stdout.write(self.style.SUCCESS(
+            f"Archived {sum(archived.values())} audit entries from {len(archived)} days to {settings.AUDIT_ARCHIVE_DIR}"
+        ))
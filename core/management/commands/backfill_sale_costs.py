@@ -0,0 +1,45 @@
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from core.models import Sale
+from core.reports import invalidate_reports_cache
+
+
+class Command(BaseCommand):
+    help = "Fill in Sale.unit_cost for sales recorded before costs were snapshotted"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--no-rebuild', action='store_true', help="Skip rebuilding the daily sales rollups afterwards")
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        updated = 0
+        last_id = 0
+        while True:
+            # Walk the table by primary key so each batch is a cheap index range scan
+            batch = list(
+                Sale.objects.select_related('product')
+                .filter(id__gt=last_id, unit_cost__isnull=True, product__isnull=False)
+                .order_by('id')[:batch_size]
+            )
+            if not batch:
+                break
+            now = timezone.now()
+            for sale in batch:
+                sale.unit_cost = sale.product.unit_cost
+                sale.updated_at = now
+            with transaction.atomic():
+                # bulk_update skips auto_now, so stamp updated_at for /api/sync/ clients
+                Sale.objects.bulk_update(batch, ['unit_cost', 'updated_at'])
+            updated += len(batch)
+            last_id = batch[-1].id
+            self.stdout.write(f"Backfilled {updated} sales")
+
+        self.stdout.write(self.style.SUCCESS(f"Backfilled unit cost on {updated} sales"))
+        if updated and not options['no_rebuild']:
+            call_command('rebuild_sales_summary', stdout=self.stdout)
+        if updated:
+            # bulk_update sends no signals, so cached profit figures still use the old costs
+            invalidate_reports_cache()
@@ -0,0 +1,70 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections, transaction
+from django.utils import timezone
+from core.models import Product, CatalogVersion
+from core.thumbnails import generate_thumbnails
+
+
+def _init_worker():
+    # Needed when workers are spawned rather than forked (macOS, Windows)
+    django.setup()
+
+
+def _generate(item):
+    """Runs in a worker process; returns (product id, thumbnails, error)"""
+    product_id, image_name = item
+    try:
+        return product_id, generate_thumbnails(image_name), None
+    except Exception as e:
+        return product_id, {}, str(e)
+
+
+class Command(BaseCommand):
+    help = "Generate thumbnails for product images uploaded before thumbnails existed, using a process pool"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+        parser.add_argument('--batch-size', type=int, default=200)
+        parser.add_argument('--force', action='store_true', help="Regenerate thumbnails that already exist")
+
+    def handle(self, *args, **options):
+        products = Product.objects.exclude(image='').exclude(image__isnull=True)
+        if not options['force']:
+            products = products.filter(thumbnails={})
+        items = list(products.order_by('id').values_list('id', 'image'))
+        if not items:
+            self.stdout.write(self.style.SUCCESS("No product images need thumbnails"))
+            return
+
+        self.stdout.write(f"Generating thumbnails for {len(items)} images with {options['workers']} workers")
+        # Don't let forked workers inherit open database connections
+        connections.close_all()
+        done = failed = 0
+        with ProcessPoolExecutor(max_workers=options['workers'], initializer=_init_worker) as pool:
+            results = pool.map(_generate, items, chunksize=8)
+            batch = []
+            for product_id, thumbnails, error in results:
+                if error:
+                    failed += 1
+                    self.stdout.write(self.style.WARNING(f"Product {product_id}: {error}"))
+                    continue
+                batch.append(Product(id=product_id, thumbnails=thumbnails, updated_at=timezone.now()))
+                if len(batch) >= options['batch_size']:
+                    done += self.save_batch(batch)
+                    batch = []
+                    self.stdout.write(f"Generated thumbnails for {done} products")
+            done += self.save_batch(batch)
+
+        self.stdout.write(self.style.SUCCESS(f"Generated thumbnails for {done} products, {failed} failed"))
+
+    def save_batch(self, batch):
+        if not batch:
+            return 0
+        with transaction.atomic():
+            # bulk_update skips signals, so bump the catalog version for ETag clients ourselves
+            Product.objects.bulk_update(batch, ['thumbnails', 'updated_at'])
+            CatalogVersion.bump_on_commit()
+        return len(batch)
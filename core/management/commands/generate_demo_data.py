@@ -0,0 +1,144 @@
+import random
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from core.models import Category, Product, Sale, Expense, StockMovement
+
+PART_NAMES = [
+    'BRAKE PADS', 'CLUTCH PLATE', 'CHAIN SPROCKET KIT', 'SPARK PLUG', 'AIR FILTER', 'OIL FILTER',
+    'HEADLIGHT BULB', 'VIKOMBE VYA SINORAI', 'SIDE MIRROR', 'CARBURETOR', 'PISTON RING SET',
+    'TUBE 3.00-18', 'TYRE 2.75-17', 'BRAKE CABLE', 'CLUTCH CABLE', 'THROTTLE CABLE', 'BATTERY 12V',
+    'INDICATOR LIGHT', 'FOOT REST', 'KICK STARTER', 'SHOCK ABSORBER', 'FUEL TAP', 'GEAR LEVER',
+]
+MODELS = ['BOXER', 'TVS', 'HONDA', 'YAMAHA', 'SANLG', 'HAOJUE', 'KINGLION']
+CATEGORIES = ['Engine', 'Brakes', 'Electrical', 'Tyres', 'Body', 'Transmission']
+EXPENSE_CATEGORIES = ['Rent', 'Transport', 'Electricity', 'Salaries', 'Other']
+PAYMENT_WEIGHTS = [('cash', 6), ('mobile', 3), ('bank', 1)]
+
+
+@contextmanager
+def _manual_sale_dates():
+    """Let bulk_create keep the generated Sale.date instead of stamping it with now()"""
+    field = Sale._meta.get_field('date')
+    field.auto_now_add = False
+    try:
+        yield
+    finally:
+        field.auto_now_add = True
+
+
+class Command(BaseCommand):
+    help = "Generate a synthetic catalog and sales history for benchmarking (skewed popularity, bulk products)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--products', type=int, default=1000)
+        parser.add_argument('--sales', type=int, default=10000)
+        parser.add_argument('--expenses', type=int, default=500)
+        parser.add_argument('--days', type=int, default=365, help="Spread sales over this many days before today")
+        parser.add_argument('--bulk-ratio', type=float, default=0.2, help="Share of products sold by the box")
+        parser.add_argument('--skew', type=float, default=1.1, help="Zipf exponent for product popularity")
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--clear', action='store_true', help="Delete existing products, sales and expenses first")
+        parser.add_argument('--no-rebuild', action='store_true', help="Skip rebuilding the daily sales rollups")
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        batch_size = options['batch_size']
+        if options['products'] < 1:
+            raise CommandError("--products must be at least 1")
+
+        if options['clear']:
+            self.stdout.write("Clearing existing data...")
+            Sale.objects.all().delete()
+            Expense.objects.all().delete()
+            Product.objects.all().delete()
+
+        for name in CATEGORIES:
+            Category.objects.get_or_create(name=name)
+
+        products = self.create_products(rng, options)
+        self.create_sales(rng, products, options)
+        self.create_expenses(rng, options)
+
+        if not options['no_rebuild']:
+            call_command('rebuild_sales_summary', chunk_size=batch_size, stdout=self.stdout)
+        self.stdout.write(self.style.SUCCESS("Synthetic data generated"))
+
+    def create_products(self, rng, options):
+        products = []
+        for i in range(options['products']):
+            is_bulk = rng.random() < options['bulk_ratio']
+            units_per_box = rng.choice([6, 10, 12, 24, 50]) if is_bulk else 1
+            buying_price = Decimal(rng.randrange(500, 150000, 50))
+            markup = Decimal(str(round(rng.uniform(1.1, 1.6), 2)))
+            products.append(Product(
+                name=f"{rng.choice(PART_NAMES)} {rng.choice(MODELS)} #{i + 1}",
+                buying_price=buying_price,
+                selling_price=(buying_price * markup).quantize(Decimal('1')),
+                # Mostly healthy stock with a tail of low and empty shelves
+                stock_qty=rng.choice([0, 1, 2, 4, 8]) if rng.random() < 0.15 else rng.randint(11, 500),
+                is_bulk_product=is_bulk,
+                units_per_box=units_per_box,
+            ))
+        products = Product.objects.bulk_create(products, batch_size=options['batch_size'])
+        StockMovement.objects.bulk_create([
+            StockMovement(product=product, kind='import', quantity=product.stock_qty, note='Demo data')
+            for product in products if product.stock_qty
+        ], batch_size=options['batch_size'])
+        self.stdout.write(f"Created {len(products)} products")
+        return products
+
+    def create_sales(self, rng, products, options):
+        # Zipf-like weights so a few products account for most of the sales
+        popularity = [1 / (rank ** options['skew']) for rank in range(1, len(products) + 1)]
+        ranked = products[:]
+        rng.shuffle(ranked)
+        payment_types = [p for p, _ in PAYMENT_WEIGHTS]
+        payment_weights = [w for _, w in PAYMENT_WEIGHTS]
+        now = timezone.now()
+        seconds = options['days'] * 24 * 3600
+        remaining = options['sales']
+        created = 0
+
+        with _manual_sale_dates():
+            while remaining > 0:
+                count = min(options['batch_size'], remaining)
+                chosen = rng.choices(ranked, weights=popularity, k=count)
+                batch = []
+                for product in chosen:
+                    quantity = rng.choice([1, 1, 1, 2, 2, 3, 5, 10]) if not product.is_bulk_product else rng.randint(1, product.units_per_box)
+                    price = product.unit_selling_price if product.is_bulk_product else product.selling_price
+                    discount = Decimal(rng.choice([0, 0, 0, 0, 500, 1000]))
+                    batch.append(Sale(
+                        product=product,
+                        quantity=quantity,
+                        price=Decimal(price).quantize(Decimal('0.01')),
+                        discount=min(discount, price * quantity),
+                        payment_type=rng.choices(payment_types, weights=payment_weights)[0],
+                        unit_cost=product.unit_cost,
+                        date=now - timedelta(seconds=rng.randrange(seconds)),
+                    ))
+                with transaction.atomic():
+                    Sale.objects.bulk_create(batch)
+                created += count
+                remaining -= count
+                self.stdout.write(f"Created {created} sales")
+
+    def create_expenses(self, rng, options):
+        today = timezone.localdate()
+        expenses = [
+            Expense(
+                date=today - timedelta(days=rng.randrange(max(options['days'], 1))),
+                description=f"{category} payment",
+                category=category,
+                amount=Decimal(rng.randrange(5000, 500000, 500)),
+            )
+            for category in rng.choices(EXPENSE_CATEGORIES, k=options['expenses'])
+        ]
+        Expense.objects.bulk_create(expenses, batch_size=options['batch_size'])
+        self.stdout.write(f"Created {len(expenses)} expenses")
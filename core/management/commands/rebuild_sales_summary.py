@@ -0,0 +1,91 @@
+from collections import defaultdict
+from decimal import Decimal
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from core.models import Sale, DailySalesSummary, business_date
+from core.reports import invalidate_reports_cache
+
+CHECKED_FIELDS = ['sale_count', 'quantity', 'revenue', 'discount', 'cost']
+
+
+def _empty_totals():
+    return {
+        'sale_count': 0,
+        'quantity': 0,
+        'revenue': Decimal('0'),
+        'discount': Decimal('0'),
+        'cost': Decimal('0'),
+    }
+
+
+class Command(BaseCommand):
+    help = "Rebuild the daily sales rollups from raw sales, or check them with --check"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--check', action='store_true', help="Compare rollups with raw sales without writing")
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def compute_from_sales(self, chunk_size):
+        totals = defaultdict(_empty_totals)
+        sales = Sale.objects.select_related('product').order_by('pk')
+        for sale in sales.iterator(chunk_size=chunk_size):
+            row = totals[(business_date(sale.date), sale.product_id, sale.payment_type)]
+            row['sale_count'] += 1
+            row['quantity'] += sale.quantity
+            row['revenue'] += sale.line_total
+            row['discount'] += Decimal(str(sale.discount or 0))
+            row['cost'] += sale.cost_of_goods
+        return totals
+
+    def stored_rollups(self):
+        totals = defaultdict(_empty_totals)
+        for summary in DailySalesSummary.objects.all().iterator():
+            row = totals[(summary.business_date, summary.product_id, summary.payment_type)]
+            for field in row:
+                row[field] += getattr(summary, field)
+        return totals
+
+    def lock_sales(self):
+        """Hold off sale writes until the rebuild commits.
+
+        A sale committed between the aggregation and the delete would be
+        wiped from the rollups and never reinserted. SQLite transactions
+        here start IMMEDIATE, which already takes the write lock.
+        """
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                # SHARE mode still lets tills read while blocking inserts, updates and deletes
+                cursor.execute(f'LOCK TABLE {Sale._meta.db_table} IN SHARE MODE')
+
+    def handle(self, *args, **options):
+        if options['check']:
+            expected = self.compute_from_sales(options['chunk_size'])
+            stored = self.stored_rollups()
+            mismatches = []
+            for key in set(expected) | set(stored):
+                want = expected.get(key, _empty_totals())
+                have = stored.get(key, _empty_totals())
+                for field in CHECKED_FIELDS:
+                    if want[field] != have[field]:
+                        mismatches.append(f"{key[0]} product={key[1]} {key[2]}: {field} expected {want[field]}, found {have[field]}")
+            for line in mismatches[:50]:
+                self.stdout.write(line)
+            if mismatches:
+                raise CommandError(f"{len(mismatches)} rollup mismatches found")
+            self.stdout.write(self.style.SUCCESS(f"{len(expected)} rollup rows match raw sales"))
+            return
+
+        with transaction.atomic():
+            self.lock_sales()
+            expected = self.compute_from_sales(options['chunk_size'])
+            DailySalesSummary.objects.all().delete()
+            DailySalesSummary.objects.bulk_create(
+                [
+                    DailySalesSummary(business_date=key[0], product_id=key[1], payment_type=key[2], **values)
+                    for key, values in expected.items()
+                ],
+                batch_size=options['chunk_size'],
+            )
+            # Cached reports were built from the old rollups
+            transaction.on_commit(invalidate_reports_cache)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {len(expected)} rollup rows"))
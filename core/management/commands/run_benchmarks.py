@@ -0,0 +1,186 @@
+import json
+import statistics
+import tempfile
+import time
+import tracemalloc
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings, setup_test_environment
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from core.audit import audit_buffer
+from core.models import Product, Sale, AuditLog, StockMovement, SyncTombstone
+from core.reports import REPORTS_CACHE_ALIAS, invalidate_reports_cache
+
+BENCHMARK_USERNAME = 'benchmark-runner'
+BENCHMARK_CACHE_ALIAS = 'benchmark-reports'
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure wall time, query count and peak memory of the main API endpoints against the "
+        "current database (see generate_demo_data), and compare them with a stored baseline. "
+        "Writes commit as in production and are cleaned up afterwards; prefer a disposable database"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=5, help="Timed runs per endpoint; the median is reported")
+        parser.add_argument('--output', default='benchmark_results.json')
+        parser.add_argument('--baseline', help="Results file to compare against")
+        parser.add_argument('--tolerance', type=float, default=0.25, help="Allowed slowdown before a run counts as a regression")
+        parser.add_argument('--only', nargs='*', help="Run only these benchmarks")
+
+    def benchmarks(self):
+        """Name -> (method, url, payload, clear the reports cache before each run)"""
+        today = timezone.localdate()
+        return {
+            'reports_data_cold': ('get', reverse('reports_data'), None, True),
+            'reports_data_warm': ('get', reverse('reports_data'), None, False),
+            'reports_data_month': ('get', f"{reverse('reports_data')}?from={today.replace(day=1)}&to={today}", None, True),
+            'dashboard_data': ('get', reverse('dashboard_data'), None, False),
+            'low_stock': ('get', reverse('low_stock_products'), None, False),
+            'product_list': ('get', reverse('product-list'), None, False),
+            'sale_list': ('get', reverse('sale-list'), None, False),
+            'expense_list': ('get', reverse('expense-list'), None, False),
+            'auditlog_list': ('get', reverse('auditlog-list'), None, False),
+            'sale_create': ('post', reverse('sale-list'), 'sale', False),
+        }
+
+    def sale_payload(self):
+        product = Product.objects.filter(stock_qty__gt=0).order_by('-stock_qty').first()
+        if product is None:
+            raise CommandError("No product with stock to benchmark sale creation; run generate_demo_data first")
+        return {
+            'product': product.id,
+            'quantity': 1,
+            'price': str(product.selling_price),
+            'discount': '0',
+            'payment_type': 'cash',
+        }
+
+    def request(self, client, method, url, payload):
+        if method == 'post':
+            response = client.post(url, payload, format='json')
+        else:
+            response = client.get(url)
+        # Consume streamed bodies so their cost is part of the measurement
+        size = sum(len(chunk) for chunk in response.streaming_content) if response.streaming else len(response.content)
+        if response.status_code >= 400:
+            raise CommandError(f"{method.upper()} {url} returned {response.status_code}")
+        return size
+
+    def run_once(self, client, method, url, payload, cold):
+        """Returns (seconds, query count, response bytes)"""
+        if cold:
+            invalidate_reports_cache()
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            size = self.request(client, method, url, payload)
+            elapsed = time.perf_counter() - start
+        return elapsed, len(queries.captured_queries), size
+
+    def peak_memory(self, client, method, url, payload, cold):
+        """Peak Python memory for one request, measured separately since tracing slows everything down"""
+        if cold:
+            invalidate_reports_cache()
+        tracemalloc.start()
+        try:
+            self.request(client, method, url, payload)
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    def benchmark_caches(self, cache_dir):
+        """The configured caches plus a private copy of the reports cache"""
+        reports = dict(settings.CACHES.get(REPORTS_CACHE_ALIAS, settings.CACHES['default']))
+        if 'filebased' in reports['BACKEND']:
+            reports['LOCATION'] = cache_dir
+        else:
+            reports['KEY_PREFIX'] = BENCHMARK_CACHE_ALIAS
+        return {**settings.CACHES, BENCHMARK_CACHE_ALIAS: reports}
+
+    def clean_up(self, user):
+        """Remove the benchmark user and everything its requests wrote"""
+        audit_buffer.flush()
+        sales = list(Sale.objects.filter(user=user))
+        sale_ids = [sale.id for sale in sales]
+        for sale in sales:
+            # Sale.delete puts the stock back and takes the sale out of the rollups
+            sale.delete()
+        StockMovement.objects.filter(user=user).delete()
+        SyncTombstone.objects.filter(model='sale', object_id__in=sale_ids).delete()
+        audit_buffer.flush()
+        AuditLog.objects.filter(user=user).delete()
+        user.delete()
+        self.stdout.write(f"Removed {len(sales)} benchmark sales")
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        results = {
+            'generated_at': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'counts': {
+                'products': Product.objects.count(),
+                'sales': Sale.objects.count(),
+            },
+            'benchmarks': {},
+        }
+
+        # Requests commit for real so on_commit hooks and the buffered audit path run as in
+        # production; reports are cached in a throwaway directory, not the live cache
+        with tempfile.TemporaryDirectory() as cache_dir, override_settings(
+            CACHES=self.benchmark_caches(cache_dir), REPORTS_CACHE_ALIAS=BENCHMARK_CACHE_ALIAS,
+        ):
+            User.objects.filter(username=BENCHMARK_USERNAME).delete()
+            user = User.objects.create_superuser(BENCHMARK_USERNAME, 'benchmark@example.com', None)
+            client = APIClient()
+            client.force_authenticate(user)
+            try:
+                for name, (method, url, payload, cold) in self.benchmarks().items():
+                    if options['only'] and name not in options['only']:
+                        continue
+                    if payload == 'sale':
+                        payload = self.sale_payload()
+                    # Warm-up run so connection setup and imports aren't measured
+                    self.run_once(client, method, url, payload, cold)
+                    runs = [self.run_once(client, method, url, payload, cold) for _ in range(options['repeat'])]
+                    results['benchmarks'][name] = {
+                        'wall_time_ms': round(statistics.median(r[0] for r in runs) * 1000, 2),
+                        'queries': max(r[1] for r in runs),
+                        'peak_memory_kb': round(self.peak_memory(client, method, url, payload, cold) / 1024, 1),
+                        'response_bytes': runs[-1][2],
+                    }
+                    row = results['benchmarks'][name]
+                    self.stdout.write(f"{name:<22} {row['wall_time_ms']:>10.2f} ms {row['queries']:>6} queries {row['peak_memory_kb']:>10.1f} KB")
+            finally:
+                self.clean_up(user)
+
+        with open(options['output'], 'w') as f:
+            json.dump(results, f, indent=2)
+        self.stdout.write(f"Results written to {options['output']}")
+
+        if options['baseline']:
+            self.compare(results, options['baseline'], options['tolerance'])
+
+    def compare(self, results, baseline_path, tolerance):
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+        regressions = []
+        for name, current in results['benchmarks'].items():
+            previous = baseline.get('benchmarks', {}).get(name)
+            if previous is None:
+                continue
+            if current['wall_time_ms'] > previous['wall_time_ms'] * (1 + tolerance):
+                regressions.append(f"{name}: {previous['wall_time_ms']} ms -> {current['wall_time_ms']} ms")
+            if current['queries'] > previous['queries']:
+                regressions.append(f"{name}: {previous['queries']} -> {current['queries']} queries")
+            if current['peak_memory_kb'] > previous['peak_memory_kb'] * (1 + tolerance):
+                regressions.append(f"{name}: {previous['peak_memory_kb']} KB -> {current['peak_memory_kb']} KB peak memory")
+        for line in regressions:
+            self.stdout.write(self.style.ERROR(f"REGRESSION {line}"))
+        if regressions:
+            raise CommandError(f"{len(regressions)} regressions against {baseline_path}")
+        self.stdout.write(self.style.SUCCESS(f"No regressions against {baseline_path}"))
@@ -0,0 +1,48 @@
+import time
+from datetime import timedelta
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils import timezone
+from core.jobs import claim_next_job, run_report_job, requeue_stale_jobs, prune_report_jobs
+from core.inventory import business_midnight, take_snapshots
+from core.models import business_date
+
+# Let sales made just before midnight commit before snapshotting them
+SNAPSHOT_DELAY = timedelta(minutes=5)
+
+
+class Command(BaseCommand):
+    help = "Process queued report jobs, polling the database for new work"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=2.0, help="Seconds to sleep when the queue is empty")
+        parser.add_argument('--once', action='store_true', help="Process the queue once and exit")
+        parser.add_argument('--max-runtime', type=int, default=30, help="Minutes before a running job is considered abandoned")
+        parser.add_argument('--keep-hours', type=int, default=24, help="Hours to keep finished jobs and their files")
+
+    def handle(self, *args, **options):
+        max_runtime = timedelta(minutes=options['max_runtime'])
+        keep = timedelta(hours=options['keep_hours'])
+        snapshotted = None
+        self.stdout.write("Report worker started")
+        while True:
+            close_old_connections()
+            requeue_stale_jobs(max_runtime)
+            job = claim_next_job()
+            if job is not None:
+                self.stdout.write(f"Running {job}")
+                job = run_report_job(job)
+                self.stdout.write(f"Finished {job}")
+                continue
+            midnight = business_midnight(business_date(timezone.now() - SNAPSHOT_DELAY))
+            if midnight != snapshotted:
+                taken = take_snapshots(midnight)
+                snapshotted = midnight
+                if taken:
+                    self.stdout.write(f"Snapshotted stock for {taken} products")
+            removed = prune_report_jobs(keep)
+            if removed:
+                self.stdout.write(f"Removed {removed} old report jobs")
+            if options['once']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,36 @@
+from datetime import timedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import F
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from core.inventory import business_midnight, stock_as_of, take_snapshots
+from core.models import business_date
+
+
+class Command(BaseCommand):
+    help = "Snapshot stock levels from the movement ledger so stock-as-of queries stay fast"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--at', help="Snapshot at the end of this date (YYYY-MM-DD); defaults to last midnight")
+        parser.add_argument('--check', action='store_true', help="Report products whose ledger disagrees with stock_qty")
+
+    def handle(self, *args, **options):
+        if options['check']:
+            mismatched = stock_as_of(timezone.now()).exclude(stock_at=F('stock_qty'))
+            for product in mismatched.only('name', 'stock_qty')[:50]:
+                self.stdout.write(self.style.WARNING(f"{product.name}: stock_qty {product.stock_qty}, ledger {product.stock_at}"))
+            count = mismatched.count()
+            if count:
+                raise CommandError(f"{count} products disagree with the stock ledger")
+            self.stdout.write(self.style.SUCCESS("Stock ledger matches stock_qty"))
+            return
+
+        if options['at']:
+            day = parse_date(options['at'])
+            if day is None:
+                raise CommandError("--at must be YYYY-MM-DD")
+            moment = business_midnight(day + timedelta(days=1))
+        else:
+            moment = business_midnight(business_date(timezone.now()))
+        taken = take_snapshots(moment)
+        self.stdout.write(self.style.SUCCESS(f"Snapshotted {taken} products at {moment.isoformat()}"))
@@ -0,0 +1,75 @@
+from django.db import migrations, transaction, DatabaseError, OperationalError
+
+
+SQLITE_FORWARD = [
+    "CREATE VIRTUAL TABLE core_product_fts USING fts5(name, tokenize='trigram')",
+    "INSERT INTO core_product_fts(rowid, name) SELECT id, name FROM core_product",
+    """CREATE TRIGGER core_product_fts_insert AFTER INSERT ON core_product BEGIN
+        INSERT INTO core_product_fts(rowid, name) VALUES (new.id, new.name);
+    END""",
+    """CREATE TRIGGER core_product_fts_update AFTER UPDATE OF name ON core_product BEGIN
+        UPDATE core_product_fts SET name = new.name WHERE rowid = old.id;
+    END""",
+    """CREATE TRIGGER core_product_fts_delete AFTER DELETE ON core_product BEGIN
+        DELETE FROM core_product_fts WHERE rowid = old.id;
+    END""",
+]
+
+SQLITE_REVERSE = [
+    "DROP TRIGGER IF EXISTS core_product_fts_insert",
+    "DROP TRIGGER IF EXISTS core_product_fts_update",
+    "DROP TRIGGER IF EXISTS core_product_fts_delete",
+    "DROP TABLE IF EXISTS core_product_fts",
+]
+
+POSTGRES_FORWARD = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS core_product_name_trgm ON core_product USING gin (name gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS core_product_name_tsv ON core_product USING gin (to_tsvector('simple', name))",
+]
+
+POSTGRES_REVERSE = [
+    "DROP INDEX IF EXISTS core_product_name_trgm",
+    "DROP INDEX IF EXISTS core_product_name_tsv",
+]
+
+
+def _run(schema_editor, statements):
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        try:
+            _run(schema_editor, SQLITE_FORWARD)
+        except OperationalError:
+            # SQLite older than 3.34 has no trigram tokenizer; search falls back to LIKE
+            _run(schema_editor, SQLITE_REVERSE)
+    elif vendor == 'postgresql':
+        try:
+            with transaction.atomic(using=schema_editor.connection.alias):
+                _run(schema_editor, POSTGRES_FORWARD)
+        except DatabaseError:
+            # pg_trgm may not be installable for this database role; search falls back to ILIKE
+            pass
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        _run(schema_editor, SQLITE_REVERSE)
+    elif vendor == 'postgresql':
+        _run(schema_editor, POSTGRES_REVERSE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0011_list_ordering_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
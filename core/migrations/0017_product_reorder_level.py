@@ -0,0 +1,26 @@
+# Generated by Django 5.2.4 on 2026-10-18 00:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_product_sku'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='reorder_level',
+            field=models.PositiveIntegerField(blank=True, help_text='Stock at or below this triggers alerts; blank uses DEFAULT_REORDER_LEVEL', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['stock_qty'], name='core_produc_stock_q_706635_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['reorder_level', 'stock_qty'], name='core_produc_reorder_fbc70d_idx'),
+        ),
+    ]
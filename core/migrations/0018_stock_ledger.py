@@ -0,0 +1,62 @@
+# Generated by Django 5.2.4 on 2026-10-18 00:48
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from decimal import Decimal
+from django.db import migrations, models
+
+
+def opening_snapshots(apps, schema_editor):
+    """Record current stock as the starting point of the ledger"""
+    Product = apps.get_model('core', 'Product')
+    StockSnapshot = apps.get_model('core', 'StockSnapshot')
+    now = django.utils.timezone.now()
+    snapshots = []
+    for product in Product.objects.all().iterator():
+        unit_cost = Decimal(str(product.buying_price))
+        if product.is_bulk_product and product.units_per_box > 1:
+            unit_cost = (unit_cost / product.units_per_box).quantize(Decimal('0.0001'))
+        snapshots.append(StockSnapshot(product_id=product.id, taken_at=now, stock_qty=product.stock_qty, unit_cost=unit_cost))
+    StockSnapshot.objects.bulk_create(snapshots, batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_product_reorder_level'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockMovement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('sale', 'Sale'), ('restock', 'Restock'), ('adjustment', 'Adjustment'), ('import', 'Import')], max_length=20)),
+                ('quantity', models.IntegerField()),
+                ('note', models.CharField(blank=True, max_length=255)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_movements', to='core.product')),
+                ('sale', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='core.sale')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['product', 'created_at'], name='core_stockm_product_ef6271_idx'), models.Index(fields=['created_at'], name='core_stockm_created_a48320_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='StockSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('taken_at', models.DateTimeField()),
+                ('stock_qty', models.IntegerField()),
+                ('unit_cost', models.DecimalField(decimal_places=4, default=0, max_digits=14)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_snapshots', to='core.product')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('product', 'taken_at'), name='unique_stock_snapshot')],
+            },
+        ),
+        migrations.RunPython(opening_snapshots, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-18 01:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0022_token_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='businesssettings',
+            name='version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,40 @@
+from django.db import migrations
+
+# Rebuilding core_product on SQLite (0014, 0016, 0017) drops its triggers, so
+# the FTS index stopped following product inserts, renames and deletes.
+TRIGGERS = [
+    """CREATE TRIGGER IF NOT EXISTS core_product_fts_insert AFTER INSERT ON core_product BEGIN
+        INSERT INTO core_product_fts(rowid, name) VALUES (new.id, new.name);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS core_product_fts_update AFTER UPDATE OF name ON core_product BEGIN
+        UPDATE core_product_fts SET name = new.name WHERE rowid = old.id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS core_product_fts_delete AFTER DELETE ON core_product BEGIN
+        DELETE FROM core_product_fts WHERE rowid = old.id;
+    END""",
+]
+
+
+def restore_search_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return  # the Postgres indexes live on the table and survive ALTERs
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'core_product_fts'")
+        if cursor.fetchone() is None:
+            return  # no trigram tokenizer when 0012 ran; search uses LIKE
+    # Re-fill from scratch: rows added, renamed or deleted since the triggers went missing
+    schema_editor.execute("DELETE FROM core_product_fts")
+    schema_editor.execute("INSERT INTO core_product_fts(rowid, name) SELECT id, name FROM core_product")
+    for statement in TRIGGERS:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0023_businesssettings_version'),
+    ]
+
+    operations = [
+        migrations.RunPython(restore_search_triggers, migrations.RunPython.noop),
+    ]
@@ -1,9 +1,38 @@
-from django.db import models
+import threading
+import time
+from datetime import datetime, time as dt_time
+from decimal import Decimal
+from zoneinfo import ZoneInfo
+from django.conf import settings
+from django.db import models, transaction, IntegrityError
+from django.db.models import F, Q, Case, When, Value
+from django.db.models.functions import Coalesce
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
+from django.utils import timezone
+from django.dispatch import Signal
 
 # Create your models here.
 
+def get_business_timezone():
+    """Time zone the shop trades in, used for business day boundaries"""
+    return ZoneInfo(getattr(settings, 'BUSINESS_TIME_ZONE', settings.TIME_ZONE))
+
+# Sent after stock is changed with a direct UPDATE, which skips post_save
+stock_changed = Signal()
+
+def default_reorder_level():
+    """Reorder level for products that don't set their own"""
+    return getattr(settings, 'DEFAULT_REORDER_LEVEL', 10)
+
+def business_date(value):
+    """Local business date for an aware datetime"""
+    return timezone.localtime(value, get_business_timezone()).date()
+
+def business_midnight(day):
+    """Start of a business day as an aware datetime"""
+    return datetime.combine(day, dt_time.min, tzinfo=get_business_timezone())
+
 class Category(models.Model):
     name = models.CharField(max_length=100, unique=True)
     def __str__(self):
@@ -11,14 +40,29 @@ class Category(models.Model):
 
 class Product(models.Model):
     name = models.CharField(max_length=200)
+    # Optional stock keeping unit; bulk uploads match on it before falling back to name
+    sku = models.CharField(max_length=64, unique=True, null=True, blank=True)
     buying_price = models.DecimalField(max_digits=12, decimal_places=2, default=0)
     selling_price = models.DecimalField(max_digits=12, decimal_places=2, default=0)
     stock_qty = models.PositiveIntegerField()
     image = models.ImageField(upload_to='product_images/', blank=True, null=True)
+    # Resized copies of image, {variant: storage name}; see core.thumbnails
+    thumbnails = models.JSONField(default=dict, blank=True)
     
     # New fields for bulk/unit handling
     units_per_box = models.PositiveIntegerField(default=1, help_text="Number of units in one box/case")
     is_bulk_product = models.BooleanField(default=False, help_text="Product is sold in boxes/cases")
+    reorder_level = models.PositiveIntegerField(null=True, blank=True, help_text="Stock at or below this triggers alerts; blank uses DEFAULT_REORDER_LEVEL")
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+    
+    # Alert levels below the reorder level: critical at a fifth of it, low at half
+    STOCK_ALERT_DIVISORS = [('critical', 5), ('low', 2), ('medium', 1)]
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['stock_qty']),
+            models.Index(fields=['reorder_level', 'stock_qty']),
+        ]
     
     def __str__(self):
         return self.name
@@ -28,19 +72,33 @@ class Product(models.Model):
         """Check if product is out of stock"""
         return self.stock_qty <= 0
     
+    @property
+    def effective_reorder_level(self):
+        return self.reorder_level if self.reorder_level is not None else default_reorder_level()
+    
     @property
     def stock_status(self):
         """Get stock status for alerts"""
         if self.stock_qty <= 0:
             return 'out_of_stock'
-        elif self.stock_qty <= 2:
-            return 'critical'
-        elif self.stock_qty <= 5:
-            return 'low'
-        elif self.stock_qty <= 10:
-            return 'medium'
-        else:
-            return 'normal'
+        reorder_level = self.effective_reorder_level
+        for status, divisor in self.STOCK_ALERT_DIVISORS:
+            if self.stock_qty <= reorder_level // divisor:
+                return status
+        return 'normal'
+    
+    @classmethod
+    def stock_alerts(cls):
+        """Products at or below their reorder level, annotated with alert_level (same buckets as stock_status)"""
+        default = default_reorder_level()
+        reorder_level = Coalesce('reorder_level', Value(default), output_field=models.PositiveIntegerField())
+        whens = [When(stock_qty__lte=0, then=Value('out_of_stock'))]
+        whens += [When(stock_qty__lte=reorder_level / divisor, then=Value(status)) for status, divisor in cls.STOCK_ALERT_DIVISORS]
+        # Written as an OR of two ranges (reorder_level >= 0 rather than IS NOT NULL)
+        # so both sides can use the (reorder_level, stock_qty) index
+        return cls.objects.filter(
+            Q(reorder_level__isnull=True, stock_qty__lte=default) | Q(reorder_level__gte=0, stock_qty__lte=F('reorder_level'))
+        ).annotate(alert_level=Case(*whens, default=Value('normal')))
     
     @property
     def unit_buying_price(self):
@@ -70,25 +128,55 @@ class Product(models.Model):
             return self.stock_qty % self.units_per_box
         return 0
     
+    @property
+    def unit_cost(self):
+        """Buying cost of one unit as it is sold (per item for bulk products)"""
+        if self.is_bulk_product and self.units_per_box > 1:
+            return (Decimal(str(self.buying_price)) / self.units_per_box).quantize(Decimal('0.0001'))
+        return Decimal(str(self.buying_price))
+    
     def can_sell_quantity(self, quantity):
         """Check if the specified quantity can be sold"""
         return self.stock_qty >= quantity
     
-    def deduct_stock(self, quantity):
+    def deduct_stock(self, quantity, kind='sale', sale=None, user=None, note=''):
         """Deduct stock quantity and validate"""
-        if not self.can_sell_quantity(quantity):
-            raise ValidationError(f"Insufficient stock. Available: {self.stock_qty}, Requested: {quantity}")
-        
-        self.stock_qty -= quantity
-        self.save()
+        # Conditional UPDATE, so concurrent sales can't both pass the check and oversell
+        with transaction.atomic():
+            updated = Product.objects.filter(pk=self.pk, stock_qty__gte=quantity).update(
+                stock_qty=F('stock_qty') - quantity, updated_at=timezone.now()
+            )
+            self.refresh_from_db(fields=['stock_qty', 'updated_at'])
+            if not updated:
+                raise ValidationError(f"Insufficient stock for {self.name}. Available: {self.stock_qty}, Requested: {quantity}")
+            StockMovement.objects.create(product=self, kind=kind, quantity=-quantity, sale=sale, user=user, note=note)
+        stock_changed.send(sender=Product, instance=self)
         return self.stock_qty
     
-    def add_stock(self, quantity):
+    def add_stock(self, quantity, kind='restock', sale=None, user=None, note=''):
         """Add stock quantity"""
-        self.stock_qty += quantity
-        self.save()
+        with transaction.atomic():
+            Product.objects.filter(pk=self.pk).update(stock_qty=F('stock_qty') + quantity, updated_at=timezone.now())
+            self.refresh_from_db(fields=['stock_qty', 'updated_at'])
+            StockMovement.objects.create(product=self, kind=kind, quantity=quantity, sale=sale, user=user, note=note)
+        stock_changed.send(sender=Product, instance=self)
         return self.stock_qty
     
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'stock_qty' not in update_fields:
+            return super().save(*args, **kwargs)
+        # Direct edits of stock_qty (API, admin) are recorded as adjustments
+        with transaction.atomic():
+            previous = None
+            if self.pk:
+                previous = Product.objects.select_for_update().filter(pk=self.pk).values_list('stock_qty', flat=True).first()
+            super().save(*args, **kwargs)
+            change = self.stock_qty - (previous or 0)
+            if change:
+                note = 'Stock edited' if previous is not None else 'Opening stock'
+                StockMovement.objects.create(product=self, kind='adjustment', quantity=change, note=note)
+    
     def get_display_info(self):
         """Get formatted display information for the product"""
         if self.is_bulk_product and self.units_per_box > 1:
@@ -115,27 +203,192 @@ class Sale(models.Model):
     payment_type = models.CharField(max_length=50, choices=[('cash', 'Cash'), ('mobile', 'Mobile Money'), ('bank', 'Bank')])
     user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
     discount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    # Product's unit cost when the sale was made, so margins don't move when prices are edited
+    unit_cost = models.DecimalField(max_digits=14, decimal_places=4, null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['date', 'id']),
+        ]
     
     def __str__(self):
         return f"Sale #{self.id} - {self.product} x {self.quantity} on {self.date.strftime('%Y-%m-%d')}"
     
+    @property
+    def line_total(self):
+        """Revenue for this sale: price x quantity - discount"""
+        return Decimal(str(self.price)) * self.quantity - Decimal(str(self.discount or 0))
+    
+    @property
+    def cost_of_goods(self):
+        """Cost of the goods sold, from the unit cost captured at sale time"""
+        if self.unit_cost is not None:
+            return Decimal(str(self.unit_cost)) * self.quantity
+        if self.product:
+            return self.product.unit_cost * self.quantity
+        return Decimal('0')
+    
     def save(self, *args, **kwargs):
-        # If this is a new sale, deduct stock
-        if not self.pk and self.product:
-            self.product.deduct_stock(self.quantity)
-        super().save(*args, **kwargs)
+        with transaction.atomic():
+            previous = None
+            if self.pk:
+                # Lock the stored row so concurrent edits of this sale adjust stock one at a time
+                previous = Sale.objects.select_for_update().filter(pk=self.pk).first()
+            # Snapshot the unit cost for new sales and when the product changes
+            if self.product and (self.unit_cost is None or (previous and previous.product_id != self.product_id)):
+                self.unit_cost = self.product.unit_cost
+            super().save(*args, **kwargs)
+            # Saved first so stock movements can point at the sale; a stock error rolls it back
+            self.adjust_stock(previous)
+            # Keep the daily rollups in step with the sale
+            if previous:
+                DailySalesSummary.record_sale(previous, sign=-1)
+            DailySalesSummary.record_sale(self)
+    
+    def adjust_stock(self, previous):
+        """Move stock for a new sale, or by the difference when quantity or product changes"""
+        movement = {'kind': 'sale', 'sale': self, 'user': self.user}
+        if previous is None or previous.product_id != self.product_id:
+            if previous is not None and previous.product:
+                previous.product.add_stock(previous.quantity, **movement)
+            if self.product:
+                self.product.deduct_stock(self.quantity, **movement)
+        elif self.product:
+            difference = self.quantity - previous.quantity
+            if difference > 0:
+                self.product.deduct_stock(difference, **movement)
+            elif difference < 0:
+                self.product.add_stock(-difference, **movement)
     
     def delete(self, *args, **kwargs):
-        # If deleting a sale, add back the stock
-        if self.product:
-            self.product.add_stock(self.quantity)
-        super().delete(*args, **kwargs)
+        with transaction.atomic():
+            # If deleting a sale, add back the stock
+            if self.product:
+                self.product.add_stock(self.quantity, kind='sale', user=self.user, note=f'Sale #{self.pk} deleted')
+            DailySalesSummary.record_sale(self, sign=-1)
+            return super().delete(*args, **kwargs)
+
+class DailySalesSummary(models.Model):
+    """Sales totals per business day, product and payment type.
+
+    Maintained by Sale.save() and Sale.delete(); rebuild with the
+    rebuild_sales_summary management command.
+    """
+    business_date = models.DateField()
+    product = models.ForeignKey(Product, on_delete=models.SET_NULL, null=True, blank=True)
+    payment_type = models.CharField(max_length=50)
+    sale_count = models.IntegerField(default=0)
+    quantity = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    discount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    cost = models.DecimalField(max_digits=16, decimal_places=4, default=0)
+    
+    TOTAL_FIELDS = ('sale_count', 'quantity', 'revenue', 'discount', 'cost')
+    
+    class Meta:
+        verbose_name_plural = "Daily sales summaries"
+        constraints = [
+            models.UniqueConstraint(fields=['business_date', 'product', 'payment_type'], name='unique_daily_sales_summary'),
+        ]
+    
+    def __str__(self):
+        return f"{self.business_date} {self.product} {self.payment_type}: {self.sale_count} sales"
+    
+    @classmethod
+    def record_sale(cls, sale, sign=1):
+        """Add (sign=1) or remove (sign=-1) a sale's contribution to its rollup row"""
+        cls.apply_deltas(cls.sale_key(sale), cls.sale_deltas(sale, sign), sign)
+    
+    @classmethod
+    def record_sales(cls, sales):
+        """Add several new sales at once: one locking read, then one bulk insert and one bulk update"""
+        totals = {}
+        for sale in sales:
+            key = tuple(cls.sale_key(sale).items())
+            deltas = cls.sale_deltas(sale)
+            if key in totals:
+                for field, delta in deltas.items():
+                    totals[key][field] += delta
+            else:
+                totals[key] = deltas
+        if not totals:
+            return
+        
+        match = Q()
+        for key in totals:
+            match |= Q(**dict(key))
+        existing = {}
+        for row in cls.objects.select_for_update().filter(match).order_by('pk'):
+            existing.setdefault((('business_date', row.business_date), ('product_id', row.product_id), ('payment_type', row.payment_type)), row)
+        
+        # Rows are locked, so their new totals can be written directly
+        updated = []
+        for key, deltas in totals.items():
+            row = existing.get(key)
+            if row is not None:
+                for field, delta in deltas.items():
+                    setattr(row, field, getattr(row, field) + delta)
+                updated.append(row)
+        if updated:
+            cls.objects.bulk_update(updated, list(cls.TOTAL_FIELDS))
+        
+        missing = {key: deltas for key, deltas in totals.items() if key not in existing}
+        if missing:
+            try:
+                with transaction.atomic():
+                    cls.objects.bulk_create([cls(**dict(key), **deltas) for key, deltas in missing.items()])
+            except IntegrityError:
+                # Another till created some of these rows first
+                for key, deltas in missing.items():
+                    cls.apply_deltas(dict(key), deltas)
+    
+    @staticmethod
+    def sale_key(sale):
+        return {
+            'business_date': business_date(sale.date),
+            'product_id': sale.product_id,
+            'payment_type': sale.payment_type,
+        }
+    
+    @staticmethod
+    def sale_deltas(sale, sign=1):
+        return {
+            'sale_count': sign,
+            'quantity': sign * sale.quantity,
+            'revenue': sign * sale.line_total,
+            'discount': sign * Decimal(str(sale.discount or 0)),
+            'cost': sign * sale.cost_of_goods,
+        }
+    
+    @classmethod
+    def apply_deltas(cls, key, deltas, sign=1):
+        # Rows for deleted products share a NULL product, so take the first match
+        row = cls.objects.select_for_update().filter(**key).order_by('pk').first()
+        if row is None:
+            try:
+                with transaction.atomic():
+                    cls.objects.create(**key, **deltas)
+                return
+            except IntegrityError:
+                # Another till created the row first
+                row = cls.objects.select_for_update().filter(**key).order_by('pk').first()
+        cls.objects.filter(pk=row.pk).update(**{field: F(field) + delta for field, delta in deltas.items()})
+        if sign < 0:
+            cls.objects.filter(pk=row.pk, sale_count__lte=0).delete()
 
 class Expense(models.Model):
     date = models.DateField()
     description = models.CharField(max_length=255)
     category = models.CharField(max_length=100)
     amount = models.DecimalField(max_digits=12, decimal_places=2)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['date', 'id']),
+        ]
+    
     def __str__(self):
         return f"{self.description} - {self.amount}"
 
@@ -152,17 +405,92 @@ class AuditLog(models.Model):
     model = models.CharField(max_length=50)
     object_id = models.CharField(max_length=50, blank=True, null=True)
     details = models.TextField(blank=True)
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # {field: [before, after]} for updates
+    changes = models.JSONField(default=dict, blank=True)
+    # Not auto_now_add: buffered entries are inserted later but keep the time of the action
+    timestamp = models.DateTimeField(default=timezone.now, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['timestamp', 'id']),
+            # Filtered browsing keeps the keyset order within one user or model
+            models.Index(fields=['user', 'timestamp', 'id']),
+            models.Index(fields=['model', 'timestamp', 'id']),
+            # One object's history is a single range scan
+            models.Index(fields=['model', 'object_id', 'timestamp', 'id']),
+        ]
 
     def __str__(self):
         return f"{self.timestamp} {self.user} {self.action} {self.model} {self.object_id}"
 
+class StockMovement(models.Model):
+    """Append-only record of every change to a product's stock_qty"""
+    KIND_CHOICES = [
+        ('sale', 'Sale'),
+        ('restock', 'Restock'),
+        ('adjustment', 'Adjustment'),
+        ('import', 'Import'),
+    ]
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='stock_movements')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    # Signed: negative takes stock out, positive puts it back
+    quantity = models.IntegerField()
+    sale = models.ForeignKey('Sale', on_delete=models.SET_NULL, null=True, blank=True)
+    user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    note = models.CharField(max_length=255, blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['product', 'created_at']),
+            models.Index(fields=['created_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.product} {self.quantity:+d} ({self.kind}) at {self.created_at}"
+
+class StockSnapshot(models.Model):
+    """A product's stock at a point in time, so history queries only replay movements after it"""
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='stock_snapshots')
+    taken_at = models.DateTimeField()
+    stock_qty = models.IntegerField()
+    # Unit cost at snapshot time, for valuing the stock
+    unit_cost = models.DecimalField(max_digits=14, decimal_places=4, default=0)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['product', 'taken_at'], name='unique_stock_snapshot'),
+        ]
+    
+    def __str__(self):
+        return f"{self.product}: {self.stock_qty} at {self.taken_at}"
+
+class SyncTombstone(models.Model):
+    """Records a deleted row so syncing clients can drop their copy"""
+    MODEL_CHOICES = [
+        ('product', 'Product'),
+        ('sale', 'Sale'),
+        ('expense', 'Expense'),
+    ]
+    model = models.CharField(max_length=20, choices=MODEL_CHOICES)
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now, db_index=True)
+    
+    def __str__(self):
+        return f"Deleted {self.model} #{self.object_id}"
+
 class BusinessSettings(models.Model):
     """Store business settings like name, currency, etc."""
     business_name = models.CharField(max_length=200, default='Moto Spares')
     currency = models.CharField(max_length=10, default='TZS')
+    # Bumped on every save so other processes can tell their cached copy is stale
+    version = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+    _cached = None
+    _checked_at = 0.0
+    _cache_lock = threading.Lock()
     
     class Meta:
         verbose_name = "Business Settings"
@@ -170,9 +498,118 @@ class BusinessSettings(models.Model):
     
     def __str__(self):
         return f"Business Settings - {self.business_name}"
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            # Bumped in the database so two workers saving at once can't both write the same version
+            self.version = F('version') + 1
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'version'}
+        super().save(*args, **kwargs)
+        if not isinstance(self.version, int):
+            self.refresh_from_db(fields=['version'])
+        # This process reloads on its next read; others notice the new version
+        BusinessSettings._cached = None
     
     @classmethod
     def get_settings(cls):
         """Get or create the single settings instance"""
         settings, created = cls.objects.get_or_create(pk=1)
         return settings
+
+    @classmethod
+    def cached(cls):
+        """The settings instance from a per-process cache, for reading only.
+
+        The stored version is re-checked at most every
+        BUSINESS_SETTINGS_CHECK_SECONDS, so changes made in another worker
+        show up within that time; between checks no query is made.
+        """
+        check_every = getattr(settings, 'BUSINESS_SETTINGS_CHECK_SECONDS', 5)
+        cached = cls._cached
+        if cached is not None and time.monotonic() - cls._checked_at < check_every:
+            return cached
+        with cls._cache_lock:
+            if cls._cached is not None and time.monotonic() - cls._checked_at < check_every:
+                return cls._cached  # another thread just checked
+            if cls._cached is None or cls.objects.filter(pk=1).values_list('version', flat=True).first() != cls._cached.version:
+                cls._cached = cls.get_settings()
+            cls._checked_at = time.monotonic()
+            return cls._cached
+
+class ReportJob(models.Model):
+    """A PDF/Excel report generated in the background by the report worker"""
+    REPORT_TYPES = [
+        ('pdf', 'PDF'),
+        ('excel', 'Excel'),
+    ]
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+    report_type = models.CharField(max_length=20, choices=REPORT_TYPES)
+    from_date = models.CharField(max_length=40, blank=True)
+    to_date = models.CharField(max_length=40, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    file = models.FileField(upload_to='reports/', blank=True, null=True)
+    error = models.TextField(blank=True)
+    requested_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+            models.Index(fields=['report_type', 'from_date', 'to_date']),
+        ]
+    
+    def __str__(self):
+        return f"Report job #{self.id} {self.report_type} ({self.status})"
+
+class CatalogVersion(models.Model):
+    """Counter bumped on every product/category write, used as the catalog's ETag"""
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(default=timezone.now)
+    
+    def __str__(self):
+        return f"Catalog version {self.version}"
+    
+    @classmethod
+    def current(cls):
+        """Get or create the single version row"""
+        catalog, created = cls.objects.get_or_create(pk=1)
+        return catalog
+    
+    @classmethod
+    def bump(cls):
+        if not cls.objects.filter(pk=1).update(version=F('version') + 1, updated_at=timezone.now()):
+            cls.current()
+            cls.objects.filter(pk=1).update(version=F('version') + 1, updated_at=timezone.now())
+
+    @classmethod
+    def bump_on_commit(cls):
+        """Bump once the current write commits (now, outside a transaction).
+
+        Bumping inside the write's transaction would hold the row lock until
+        commit, making every till's sale wait on the others. A request landing
+        between the commit and the bump may get a 304 for one moment more.
+        Nothing is bumped if the write rolls back.
+        """
+        transaction.on_commit(cls.bump)
+
+class TokenVersion(models.Model):
+    """Per-user counter carried in JWTs; bumping it revokes every token issued before"""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='token_version')
+    version = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"Token version {self.version} for user {self.user_id}"
+
+    @classmethod
+    def bump(cls, user_id):
+        if not cls.objects.filter(user_id=user_id).update(version=F('version') + 1):
+            cls.objects.get_or_create(user_id=user_id)
+            cls.objects.filter(user_id=user_id).update(version=F('version') + 1)
@@ -0,0 +1,287 @@
+import uuid
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Case, Count, F, FloatField, Max, Q, Sum, Value, When
+from django.db.models.functions import Cast, Coalesce, TruncMonth
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from .models import Sale, Product, Expense, DailySalesSummary, business_date, business_midnight
+
+
+def _float(field):
+    return Cast(field, FloatField())
+
+
+def to_business_date(value):
+    """Parse a from/to query value (date or datetime) into a local business date"""
+    parsed = parse_date(value)
+    if parsed is not None:
+        return parsed
+    parsed = parse_datetime(value)
+    if parsed is None:
+        raise ValueError(f"Invalid date: {value}")
+    if timezone.is_naive(parsed):
+        return parsed.date()
+    return business_date(parsed)
+
+
+def business_day_range(from_date=None, to_date=None):
+    """(start, end) datetimes spanning an inclusive range of business dates.
+
+    Either bound is None when not given; raises ValueError for a bad date.
+    Filter with >= start and < end.
+    """
+    start = business_midnight(to_business_date(from_date)) if from_date else None
+    end = business_midnight(to_business_date(to_date) + timedelta(days=1)) if to_date else None
+    return start, end
+
+
+def filter_sales(from_date=None, to_date=None):
+    """Sales in an inclusive range of business dates, matching the daily rollups"""
+    start, end = business_day_range(from_date, to_date)
+    sales = Sale.objects.all()
+    if start:
+        sales = sales.filter(date__gte=start)
+    if end:
+        sales = sales.filter(date__lt=end)
+    return sales
+
+
+def filter_expenses(from_date=None, to_date=None):
+    expenses = Expense.objects.all()
+    if from_date:
+        expenses = expenses.filter(date__gte=to_business_date(from_date))
+    if to_date:
+        expenses = expenses.filter(date__lte=to_business_date(to_date))
+    return expenses
+
+
+def filter_summaries(from_date=None, to_date=None):
+    """Daily rollup rows for an inclusive range of business dates"""
+    summaries = DailySalesSummary.objects.all()
+    if from_date:
+        summaries = summaries.filter(business_date__gte=to_business_date(from_date))
+    if to_date:
+        summaries = summaries.filter(business_date__lte=to_business_date(to_date))
+    return summaries
+
+
+def stock_analysis():
+    """Stock totals for the whole catalog in a single aggregate query"""
+    unit_cost = Case(
+        # For bulk products: use unit buying price x stock quantity
+        When(
+            is_bulk_product=True, units_per_box__gt=1,
+            then=F('stock_qty') * _float('buying_price') / F('units_per_box'),
+        ),
+        default=F('stock_qty') * _float('buying_price'),
+        output_field=FloatField(),
+    )
+    totals = Product.objects.aggregate(
+        total_products=Count('id'),
+        out_of_stock=Count('id', filter=Q(stock_qty=0)),
+        low_stock=Count('id', filter=Q(stock_qty__lte=5, stock_qty__gt=0)),
+        total_stock_value=Coalesce(Sum(unit_cost), Value(0.0)),
+        total_stock_quantity=Coalesce(Sum('stock_qty'), Value(0)),
+    )
+    return {
+        'total_products': totals['total_products'],
+        'out_of_stock': totals['out_of_stock'],
+        'low_stock': totals['low_stock'],
+        'total_stock_value': totals['total_stock_value'],
+        'total_stock_quantity': totals['total_stock_quantity'],
+    }
+
+
+def build_reports_data(from_date=None, to_date=None):
+    """Compute the reports payload from the daily sales rollups.
+
+    Runs a fixed number of queries regardless of how many sales exist.
+    """
+    summaries = filter_summaries(from_date, to_date)
+
+    # Monthly revenue data, newest month first
+    monthly_rows = (
+        summaries.annotate(month=TruncMonth('business_date'))
+        .values('month')
+        .annotate(total=Sum('revenue'))
+        .order_by('-month')
+    )
+    monthly_revenue = {row['month'].strftime('%Y-%m'): float(row['total']) for row in monthly_rows}
+
+    # Top products by quantity sold; ties keep the most recently sold product first
+    product_rows = (
+        summaries.values('product__name')
+        .annotate(total_quantity=Sum('quantity'), last_sold=Max('business_date'))
+        .order_by('-total_quantity', '-last_sold')[:10]
+    )
+    top_products = {
+        (row['product__name'] if row['product__name'] is not None else 'Product None'): row['total_quantity']
+        for row in product_rows
+    }
+
+    # Payment method distribution, ordered by most recent use
+    payment_rows = (
+        summaries.values('payment_type')
+        .annotate(count=Sum('sale_count'), last_used=Max('business_date'))
+        .order_by('-last_used')
+    )
+    payment_methods = {row['payment_type']: row['count'] for row in payment_rows}
+
+    # Revenue and cost of goods sold (COGS) in one pass
+    totals = summaries.aggregate(
+        total_sales=Coalesce(Sum('sale_count'), Value(0)),
+        total_revenue=Coalesce(Sum(_float('revenue')), Value(0.0)),
+        total_cost=Coalesce(Sum(_float('cost')), Value(0.0)),
+    )
+    total_revenue = totals['total_revenue']
+    total_sales = totals['total_sales']
+
+    # Add expenses to the cost
+    total_expenses = filter_expenses(from_date, to_date).aggregate(
+        total=Coalesce(Sum(_float('amount')), Value(0.0))
+    )['total']
+    total_cost = totals['total_cost'] + total_expenses
+
+    total_profit = total_revenue - total_cost
+
+    return {
+        'monthly_revenue': monthly_revenue,
+        'top_products': top_products,
+        'payment_methods': payment_methods,
+        'stock_analysis': stock_analysis(),
+        'profit_analysis': {
+            'total_revenue': total_revenue,
+            'total_cost': total_cost,
+            'total_expenses': total_expenses,
+            'total_profit': total_profit,
+            'profit_margin': (total_profit / total_revenue * 100) if total_revenue > 0 else 0
+        },
+        'summary': {
+            'total_sales': total_sales,
+            'total_revenue': total_revenue,
+            'average_sale': total_revenue / total_sales if total_sales > 0 else 0
+        }
+    }
+
+
+DASHBOARD_RECENT_SALES = 5
+
+
+def build_dashboard_data(today=None):
+    """Dashboard KPIs for the current business day and month, read from the rollups"""
+    today = today or business_date(timezone.now())
+    month_start = today.replace(day=1)
+    growth_start = today - timedelta(days=13)
+    summaries = DailySalesSummary.objects.filter(business_date__lte=today)
+
+    daily_rows = (
+        summaries.filter(business_date__gte=min(growth_start, month_start))
+        .values('business_date')
+        .annotate(total=Sum('revenue'))
+    )
+    revenue_by_day = {row['business_date']: float(row['total']) for row in daily_rows}
+    sales_growth = [
+        {'date': day.isoformat(), 'total': revenue_by_day.get(day, 0.0)}
+        for day in (growth_start + timedelta(days=offset) for offset in range(14))
+    ]
+    monthly_revenue = sum(total for day, total in revenue_by_day.items() if day >= month_start)
+
+    payment_rows = (
+        summaries.filter(business_date__gte=month_start)
+        .values('payment_type')
+        .annotate(total_quantity=Sum('quantity'))
+    )
+    recent_sales = [
+        {
+            'id': sale.id,
+            'product': sale.product_id,
+            'product_name': sale.product.name if sale.product else None,
+            'quantity': sale.quantity,
+            'price': float(sale.price),
+            'date': sale.date.isoformat(),
+        }
+        for sale in Sale.objects.select_related('product').order_by('-date', '-id')[:DASHBOARD_RECENT_SALES]
+    ]
+    best = (
+        DailySalesSummary.objects.filter(product__isnull=False)
+        .values('product__name')
+        .annotate(total_quantity=Sum('quantity'))
+        .order_by('-total_quantity')
+        .first()
+    )
+
+    return {
+        'date': today.isoformat(),
+        'daily_revenue': revenue_by_day.get(today, 0.0),
+        'monthly_revenue': monthly_revenue,
+        'best_selling_product': best['product__name'] if best else None,
+        'sales_growth': sales_growth,
+        'payment_type_quantity': {row['payment_type']: row['total_quantity'] for row in payment_rows},
+        'recent_sales': recent_sales,
+    }
+
+
+REPORTS_CACHE_ALIAS = 'reports'
+GENERATION_KEY = 'reports:generation'
+HITS_KEY = 'reports:hits'
+MISSES_KEY = 'reports:misses'
+
+
+def reports_cache():
+    # Benchmarks point this at a throwaway cache so they don't evict the live one
+    alias = getattr(settings, 'REPORTS_CACHE_ALIAS', REPORTS_CACHE_ALIAS)
+    return caches[alias if alias in settings.CACHES else 'default']
+
+
+def _bump(cache, key):
+    # incr is a get then a set on some backends, so concurrent bumps can be lost;
+    # good enough for the hit/miss counters, not for the generation
+    try:
+        return cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, timeout=None)
+        return 1
+
+
+def invalidate_reports_cache():
+    """Drop every cached report by moving to a new cache generation.
+
+    The generation is a fresh random value, so two workers invalidating at
+    once each leave a generation no cached report was built under.
+    """
+    reports_cache().set(GENERATION_KEY, uuid.uuid4().hex, timeout=None)
+
+
+def cached_reports_data(from_date=None, to_date=None):
+    """Reports payload for a date range, served from the cache when possible.
+
+    Returns (data, hit).
+    """
+    start = to_business_date(from_date).isoformat() if from_date else ''
+    end = to_business_date(to_date).isoformat() if to_date else ''
+    cache = reports_cache()
+    generation = cache.get(GENERATION_KEY, 0)
+    key = f'reports:data:{generation}:{start}:{end}'
+    data = cache.get(key)
+    if data is not None:
+        _bump(cache, HITS_KEY)
+        return data, True
+    _bump(cache, MISSES_KEY)
+    data = build_reports_data(start or None, end or None)
+    cache.set(key, data)
+    return data, False
+
+
+def reports_cache_stats():
+    cache = reports_cache()
+    hits = cache.get(HITS_KEY, 0)
+    misses = cache.get(MISSES_KEY, 0)
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': hits / total if total else 0,
+        'generation': cache.get(GENERATION_KEY, 0),
+    }
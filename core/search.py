@@ -0,0 +1,227 @@
+from functools import lru_cache
+from django.db import connection, DatabaseError
+from .models import Product
+
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+# Candidates fetched from the index before re-ranking
+CANDIDATE_LIMIT = 200
+# Minimum trigram similarity for a fuzzy (typo) match, same as pg_trgm's default
+SIMILARITY_THRESHOLD = 0.3
+SQLITE_TRIGGERS = ('core_product_fts_insert', 'core_product_fts_update', 'core_product_fts_delete')
+
+
+@lru_cache(maxsize=50000)
+def _word_trigrams(word):
+    # Padded like pg_trgm so short words and word starts count
+    padded = f"  {word} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def trigrams(text):
+    """Trigrams of each word in text"""
+    return frozenset().union(*(_word_trigrams(word) for word in text.lower().split()))
+
+
+def _jaccard(a, b):
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def similarity(query, name):
+    return _jaccard(trigrams(query), trigrams(name))
+
+
+def word_similarity(query, name):
+    """Best similarity between query and any run of the same number of words in name"""
+    query_grams = trigrams(query)
+    size = len(query.split())
+    words = [_word_trigrams(word) for word in name.lower().split()]
+    spans = [frozenset().union(*words[i:i + size]) for i in range(max(1, len(words) - size + 1))]
+    return max(_jaccard(query_grams, span) for span in spans)
+
+
+def _edit_distance(a, b):
+    """Edits (insert, delete, substitute or swap two neighbouring letters) turning a into b"""
+    previous, current = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        before, previous, current = previous, current, [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (a[i - 1] != b[j - 1]))
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], before[j - 2] + 1)
+    return current[-1]
+
+
+def _allowed_edits(word):
+    # Short words have too many one-letter neighbours to guess at
+    return 0 if len(word) < 4 else 1 if len(word) <= 6 else 2
+
+
+class _WordMatcher:
+    """Similarity of one query word to name words, remembered for the rest of a search"""
+    def __init__(self, word):
+        self.word = word
+        self.letters = set(word)
+        self.allowed = _allowed_edits(word)
+        self.seen = {}
+
+    def similarity(self, name_word):
+        score = self.seen.get(name_word)
+        if score is None:
+            score = self.seen[name_word] = self._similarity(name_word)
+        return score
+
+    def _similarity(self, name_word):
+        if name_word.startswith(self.word):
+            return 1.0
+        # Cheap rejections first: each edit changes the length by at most one and
+        # the set of letters used by at most two
+        if abs(len(self.word) - len(name_word)) > self.allowed or len(self.letters.symmetric_difference(name_word)) > 2 * self.allowed:
+            return 0.0
+        distance = _edit_distance(self.word, name_word)
+        if distance > self.allowed:
+            return 0.0
+        return 1 - distance / max(len(self.word), len(name_word))
+
+
+def word_matchers(query):
+    return [_WordMatcher(word) for word in query.lower().split()]
+
+
+def token_similarity(matchers, name):
+    """Average over query words of their best match among name words.
+
+    A word prefix counts fully and a spelling within one or two edits by how
+    close it is, so single-word typos like 'sprak' still find 'spark', which
+    shares too few trigrams with it.
+    """
+    name_words = name.split()
+    if not matchers or not name_words:
+        return 0.0
+    return sum(max(map(matcher.similarity, name_words)) for matcher in matchers) / len(matchers)
+
+
+def _transpositions(word):
+    """word with each pair of neighbouring letters swapped, the commonest typing slip"""
+    return {word[:i] + word[i + 1] + word[i] + word[i + 2:] for i in range(len(word) - 1) if word[i] != word[i + 1]}
+
+
+def _score(query, name, matchers):
+    """Rank exact prefixes first, then word prefixes and substrings, then by spelling similarity"""
+    lowered_query = query.lower()
+    lowered_name = name.lower()
+    score = max(word_similarity(lowered_query, lowered_name), token_similarity(matchers, lowered_name))
+    if lowered_name.startswith(lowered_query):
+        score += 2
+    elif f" {lowered_query}" in f" {lowered_name}":
+        score += 1.5
+    elif lowered_query in lowered_name:
+        score += 1
+    return score
+
+
+def _fts_quote(text):
+    return '"' + text.replace('"', '""') + '"'
+
+
+def _fts_ids(cursor, match):
+    cursor.execute(
+        "SELECT rowid FROM core_product_fts WHERE core_product_fts MATCH %s ORDER BY rank LIMIT %s",
+        [match, CANDIDATE_LIMIT],
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+
+def _sqlite_index_is_current(cursor):
+    # Without its triggers the index silently stops following product writes
+    cursor.execute("SELECT count(*) FROM sqlite_master WHERE type = 'trigger' AND name IN (%s, %s, %s)", SQLITE_TRIGGERS)
+    return cursor.fetchone()[0] == len(SQLITE_TRIGGERS)
+
+
+def _sqlite_candidates(query, limit):
+    # FTS5 trigram index matches any substring of at least three characters
+    words = [word for word in query.lower().split() if len(word) >= 3]
+    if not words:
+        return None
+    with connection.cursor() as cursor:
+        if not _sqlite_index_is_current(cursor):
+            return None
+        # Names containing every word first; that's selective and covers prefixes
+        ids = _fts_ids(cursor, ' AND '.join(_fts_quote(word) for word in words))
+        if len(ids) >= limit:
+            return ids
+        # Then names sharing any trigram with the query, so misspellings still match,
+        # or holding a word with two letters swapped back, which shares too few
+        terms = {word[i:i + 3] for word in words for i in range(len(word) - 2)}
+        terms.update(variant for word in words if _allowed_edits(word) for variant in _transpositions(word))
+        seen = set(ids)
+        fuzzy = _fts_ids(cursor, ' OR '.join(_fts_quote(term) for term in terms))
+        ids += [product_id for product_id in fuzzy if product_id not in seen]
+        if not ids:
+            # Only trust "no matches" from an index holding every product
+            cursor.execute("SELECT (SELECT count(*) FROM core_product_fts) = (SELECT count(*) FROM core_product)")
+            if not cursor.fetchone()[0]:
+                return None
+        return ids
+
+
+def _postgres_candidates(query, limit):
+    # Trigram GIN index for typos and substrings, tsvector index for word prefixes
+    prefix = ' & '.join(word.replace("'", "") + ':*' for word in query.split() if word.replace("'", ""))
+    # Swapped letters defeat trigram similarity, so look for the unswapped words too
+    swapped = [f"%{variant}%" for word in query.lower().split() if _allowed_edits(word) for variant in _transpositions(word)]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT id FROM core_product
+            WHERE name %% %s OR name ILIKE %s OR name ILIKE ANY(%s)
+               OR (%s <> '' AND to_tsvector('simple', name) @@ to_tsquery('simple', %s))
+            ORDER BY similarity(name, %s) DESC
+            LIMIT %s
+            """,
+            [query, f"%{query}%", swapped, prefix, prefix or 'x', query, CANDIDATE_LIMIT],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _index_candidates(query, limit):
+    """Product ids from the database's search index, or None if it is missing or out of date"""
+    try:
+        if connection.vendor == 'sqlite':
+            return _sqlite_candidates(query, limit)
+        if connection.vendor == 'postgresql':
+            return _postgres_candidates(query, limit)
+    except DatabaseError:
+        # Index missing (e.g. old SQLite without the trigram tokenizer)
+        return None
+    return None
+
+
+def search_products(query, limit=DEFAULT_SEARCH_LIMIT):
+    """Ranked products matching query by prefix, substring or a close (typo) spelling"""
+    query = ' '.join(query.split())
+    if not query:
+        return []
+    limit = max(1, min(limit, MAX_SEARCH_LIMIT))
+
+    if len(query) < 3:
+        # Too short for trigrams or typos; a plain substring match
+        candidates = Product.objects.filter(name__icontains=query)[:CANDIDATE_LIMIT]
+    else:
+        candidate_ids = _index_candidates(query, limit)
+        if candidate_ids is None:
+            # No usable or up-to-date index: score every name so prefixes and typos still match
+            candidates = Product.objects.all()
+        else:
+            candidates = Product.objects.filter(id__in=candidate_ids)
+
+    # Score on names only, then load the full rows for the page of results
+    matchers = word_matchers(query)
+    scored = [(_score(query, name, matchers), name, product_id) for product_id, name in candidates.values_list('id', 'name')]
+    scored = [item for item in scored if item[0] >= SIMILARITY_THRESHOLD]
+    scored.sort(key=lambda item: (-item[0], item[1]))
+    top_ids = [product_id for _, _, product_id in scored[:limit]]
+    products = Product.objects.in_bulk(top_ids)
+    return [products[product_id] for product_id in top_ids]
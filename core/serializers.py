@@ -1,6 +1,8 @@
 from rest_framework import serializers
-from .models import Category, Product, Sale, Expense, AuditLog, BusinessSettings
+from .models import Category, Product, Sale, Expense, AuditLog, BusinessSettings, ReportJob
 from django.conf import settings
+from django.core.files.storage import default_storage
+from django.urls import reverse
 
 class CategorySerializer(serializers.ModelSerializer):
     class Meta:
@@ -8,35 +10,113 @@ class CategorySerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 class ProductSerializer(serializers.ModelSerializer):
+    """Product representation with optional sparse fieldsets.
+
+    On reads, `?fields=a,b` keeps only the listed fields, `?omit=a,b`
+    drops fields and `?view=compact` returns COMPACT_FIELDS. Unknown
+    names are rejected with a 400.
+    """
+    COMPACT_FIELDS = ['id', 'name', 'selling_price', 'stock_qty']
+    # Model columns each derived field reads, so views can load just those with .only()
+    DERIVED_FIELD_COLUMNS = {
+        'is_out_of_stock': ['stock_qty'],
+        'stock_status': ['stock_qty', 'reorder_level'],
+        'unit_buying_price': ['buying_price', 'units_per_box'],
+        'unit_selling_price': ['selling_price', 'units_per_box'],
+        'total_boxes': ['stock_qty', 'units_per_box'],
+        'remaining_units': ['stock_qty', 'units_per_box'],
+    }
+    
     is_out_of_stock = serializers.ReadOnlyField()
     stock_status = serializers.ReadOnlyField()
     unit_buying_price = serializers.ReadOnlyField()
     unit_selling_price = serializers.ReadOnlyField()
     total_boxes = serializers.ReadOnlyField()
     remaining_units = serializers.ReadOnlyField()
-    display_info = serializers.ReadOnlyField()
     is_bulk_product = serializers.BooleanField(default=False)
+    thumbnails = serializers.SerializerMethodField()
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        selected = self.selected_fields(self.context.get('request'))
+        if selected is not None:
+            for name in list(self.fields):
+                if name not in selected:
+                    self.fields.pop(name)
+    
+    @classmethod
+    def selected_fields(cls, request):
+        """Field names requested for a read, or None for the full representation"""
+        if request is None or request.method != 'GET':
+            return None
+        params = request.query_params
+        requested = [name.strip() for name in params.get('fields', '').split(',') if name.strip()]
+        omit = {name.strip() for name in params.get('omit', '').split(',') if name.strip()}
+        unknown = sorted({*requested, *omit} - set(cls.Meta.fields))
+        if unknown:
+            raise serializers.ValidationError({'fields': [f"Unknown field: {name}" for name in unknown]})
+        if params.get('view') == 'compact':
+            selected = list(cls.COMPACT_FIELDS)
+        elif requested:
+            selected = list(dict.fromkeys(requested))
+        else:
+            selected = list(cls.Meta.fields)
+        selected = [name for name in selected if name not in omit]
+        if len(selected) == len(cls.Meta.fields):
+            return None
+        return selected
+    
+    @classmethod
+    def model_columns(cls, field_names):
+        """Model columns needed to render field_names"""
+        columns = {'id'}
+        for name in field_names:
+            columns.update(cls.DERIVED_FIELD_COLUMNS.get(name, [name]))
+        return sorted(columns)
+    
+    def validate_sku(self, value):
+        # Store missing SKUs as NULL so they don't collide on the unique constraint
+        return value or None
+    
+    def get_thumbnails(self, instance):
+        request = self.context.get('request')
+        urls = {}
+        for variant, name in (instance.thumbnails or {}).items():
+            url = default_storage.url(name)
+            urls[variant] = request.build_absolute_uri(url) if request else url
+        return urls
     
     def to_representation(self, instance):
         data = super().to_representation(instance)
         # Add full URL for image if it exists
-        if instance.image:
+        if 'image' in self.fields and instance.image:
             data['image'] = self.context['request'].build_absolute_uri(instance.image.url)
         return data
     
     class Meta:
         model = Product
         fields = [
-            'id', 'name', 'buying_price', 'selling_price', 'stock_qty', 'image', 
-            'is_out_of_stock', 'stock_status', 'units_per_box', 'is_bulk_product',
+            'id', 'name', 'sku', 'buying_price', 'selling_price', 'stock_qty', 'image', 
+            'is_out_of_stock', 'stock_status', 'reorder_level', 'units_per_box', 'is_bulk_product',
             'unit_buying_price', 'unit_selling_price', 'total_boxes', 'remaining_units',
-            'display_info'
+            'thumbnails'
         ]
 
+class ProductBulkRowSerializer(serializers.ModelSerializer):
+    """One row of a bulk product upload; uniqueness is checked for the whole batch instead of per row"""
+    class Meta:
+        model = Product
+        fields = ['name', 'sku', 'buying_price', 'selling_price', 'stock_qty', 'reorder_level', 'units_per_box', 'is_bulk_product']
+        extra_kwargs = {'sku': {'validators': []}}
+    
+    def validate_sku(self, value):
+        return value or None
+
 class SaleSerializer(serializers.ModelSerializer):
     class Meta:
         model = Sale
         fields = '__all__'
+        read_only_fields = ['unit_cost']
 
 class ExpenseSerializer(serializers.ModelSerializer):
     class Meta:
@@ -48,7 +128,28 @@ class AuditLogSerializer(serializers.ModelSerializer):
         model = AuditLog
         fields = '__all__'
 
+class AuditLogHistorySerializer(serializers.ModelSerializer):
+    username = serializers.CharField(source='user.username', default=None, read_only=True)
+
+    class Meta:
+        model = AuditLog
+        fields = ['id', 'timestamp', 'user', 'username', 'action', 'details', 'changes']
+
 class BusinessSettingsSerializer(serializers.ModelSerializer):
     class Meta:
         model = BusinessSettings
-        fields = ['business_name', 'currency', 'created_at', 'updated_at'] 
\ No newline at end of file
+        fields = ['business_name', 'currency', 'created_at', 'updated_at']
+
+class ReportJobSerializer(serializers.ModelSerializer):
+    download_url = serializers.SerializerMethodField()
+    
+    def get_download_url(self, obj):
+        if obj.status != 'done' or not obj.file:
+            return None
+        url = reverse('reportjob-download', args=[obj.id])
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
+    
+    class Meta:
+        model = ReportJob
+        fields = ['id', 'report_type', 'from_date', 'to_date', 'status', 'error', 'created_at', 'started_at', 'finished_at', 'download_url']
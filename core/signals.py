@@ -0,0 +1,89 @@
+from django.db import transaction
+from django.core.signals import request_finished
+from django.contrib.auth.models import Group, User
+from django.db.models.signals import post_save, post_delete, pre_delete, pre_save, m2m_changed
+from django.utils import timezone
+from django.dispatch import receiver
+from .models import Category, Product, Sale, Expense, CatalogVersion, stock_changed
+from .reports import invalidate_reports_cache
+from .sync import record_tombstone
+from .audit import audit_buffer
+from .auth import revoke_tokens, forget_token_version
+
+
+@receiver([post_save, post_delete], sender=Sale)
+@receiver([post_save, post_delete], sender=Expense)
+@receiver([post_save, post_delete], sender=Product)
+def invalidate_reports_on_write(sender, **kwargs):
+    # Invalidate after commit so a concurrent request can't re-cache stale numbers
+    transaction.on_commit(invalidate_reports_cache)
+
+
+@receiver(stock_changed, sender=Product)
+def invalidate_reports_on_stock_change(sender, **kwargs):
+    transaction.on_commit(invalidate_reports_cache)
+
+
+@receiver([post_save, post_delete], sender=Product)
+@receiver([post_save, post_delete], sender=Category)
+@receiver(stock_changed, sender=Product)
+def bump_catalog_version(sender, **kwargs):
+    CatalogVersion.bump_on_commit()
+
+
+@receiver(post_delete, sender=Product)
+@receiver(post_delete, sender=Sale)
+@receiver(post_delete, sender=Expense)
+def record_sync_tombstone(sender, instance, **kwargs):
+    record_tombstone(instance)
+
+
+@receiver(pre_delete, sender=Product)
+def touch_sales_of_deleted_product(sender, instance, **kwargs):
+    # SET_NULL clears Sale.product with a bulk UPDATE that skips auto_now
+    Sale.objects.filter(product=instance).update(updated_at=timezone.now())
+
+
+@receiver(request_finished)
+def flush_audit_buffer(sender, **kwargs):
+    # Runs once the response has been sent, so batching costs the client nothing
+    audit_buffer.flush_if_due()
+
+
+# Changing any of these changes what a user's token claims or whether it should work
+TOKEN_USER_FIELDS = ('username', 'password', 'is_active', 'is_staff', 'is_superuser')
+
+
+@receiver(pre_save, sender=User)
+def revoke_tokens_on_user_change(sender, instance, update_fields=None, **kwargs):
+    if instance.pk is None or (update_fields is not None and not set(update_fields) & set(TOKEN_USER_FIELDS)):
+        return  # e.g. update_last_login
+    previous = User.objects.filter(pk=instance.pk).values(*TOKEN_USER_FIELDS).first()
+    if previous and any(previous[field] != getattr(instance, field) for field in TOKEN_USER_FIELDS):
+        revoke_tokens(instance.pk)
+
+
+@receiver(post_delete, sender=User)
+def revoke_tokens_on_user_delete(sender, instance, **kwargs):
+    # With the user gone their version loads as revoked
+    forget_token_version(instance.pk)
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def revoke_tokens_on_group_membership(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if not reverse:
+        revoke_tokens(instance.pk)
+    else:
+        user_ids = pk_set if action != 'pre_clear' else instance.user_set.values_list('pk', flat=True)
+        for user_id in user_ids:
+            revoke_tokens(user_id)
+
+
+@receiver(post_save, sender=Group)
+@receiver(pre_delete, sender=Group)
+def revoke_tokens_on_group_change(sender, instance, **kwargs):
+    # A renamed or deleted group changes the groups claim of every member
+    for user_id in instance.user_set.values_list('pk', flat=True):
+        revoke_tokens(user_id)
@@ -0,0 +1,148 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.conf import settings
+from django.core import signing
+from django.utils import timezone
+from .models import Product, Sale, Expense, SyncTombstone
+from .serializers import ProductSerializer, SaleSerializer, ExpenseSerializer
+
+# Response key -> (model, serializer, tombstone model name)
+SYNC_MODELS = {
+    'products': (Product, ProductSerializer, 'product'),
+    'sales': (Sale, SaleSerializer, 'sale'),
+    'expenses': (Expense, ExpenseSerializer, 'expense'),
+}
+
+# Rows are stamped before their transaction commits, so the next sync starts a
+# little before this one to pick up writes that committed late. Clients upsert by
+# id, so rows sent twice are harmless.
+SYNC_OVERLAP = timedelta(seconds=5)
+
+SYNC_PAGE_SIZE = 500
+SYNC_MAX_PAGE_SIZE = 2000
+CURSOR_SALT = 'core.sync.cursor'
+
+
+class SyncError(ValueError):
+    pass
+
+
+class InvalidSyncToken(SyncError):
+    pass
+
+
+def tombstone_retention():
+    return timedelta(days=getattr(settings, 'SYNC_TOMBSTONE_RETENTION_DAYS', 30))
+
+
+def encode_token(moment):
+    """Opaque sync token: microseconds since the epoch"""
+    return str(int(moment.timestamp() * 1_000_000))
+
+
+def decode_token(token):
+    try:
+        return datetime.fromtimestamp(int(token) / 1_000_000, tz=dt_timezone.utc)
+    except (TypeError, ValueError, OverflowError, OSError):
+        raise InvalidSyncToken(f"Invalid sync token '{token}'")
+
+
+def record_tombstone(instance):
+    """Remember a deleted row and drop tombstones nobody can still need"""
+    now = timezone.now()
+    SyncTombstone.objects.create(model=instance._meta.model_name, object_id=instance.pk, deleted_at=now)
+    SyncTombstone.objects.filter(deleted_at__lt=now - tombstone_retention()).delete()
+
+
+def parse_models(value):
+    """Response keys named in ?models=a,b, or every synced model"""
+    if not value:
+        return list(SYNC_MODELS)
+    names = [name.strip() for name in value.split(',') if name.strip()]
+    unknown = [name for name in names if name not in SYNC_MODELS]
+    if unknown or not names:
+        raise SyncError(f"Unknown sync models: {', '.join(unknown)}. Use any of: {', '.join(SYNC_MODELS)}")
+    return list(dict.fromkeys(names))
+
+
+def parse_page_size(value):
+    """?page_size= capped at SYNC_MAX_PAGE_SIZE, or None when not given"""
+    if not value:
+        return None
+    try:
+        size = int(value)
+    except ValueError:
+        raise SyncError('page_size must be a number')
+    return max(1, min(size, SYNC_MAX_PAGE_SIZE))
+
+
+def _start_state(since_token, models, page_size):
+    started = timezone.now()
+    since = decode_token(since_token) if since_token else None
+    full = since is None or since < started - tombstone_retention()
+    return {
+        'since': None if full else encode_token(since),
+        'token': encode_token(started - SYNC_OVERLAP),
+        'models': models,
+        'page_size': page_size or SYNC_PAGE_SIZE,
+        'model': 0,
+        'after': 0,
+    }
+
+
+def build_sync_payload(since_token, request, models=None, cursor=None, page_size=None):
+    """One page of rows changed since since_token, oldest id first.
+
+    Without a token, or with one older than the tombstone retention, everything
+    is returned with full=True and the client should replace its copy once it
+    has every page. Deleted ids come on the first page. While `next` is set,
+    fetch it with ?cursor=; the last page carries the token for the next sync.
+    The cursor keeps the first page's models and page size.
+    """
+    if cursor:
+        try:
+            state = signing.loads(cursor, salt=CURSOR_SALT)
+        except signing.BadSignature:
+            raise InvalidSyncToken(f"Invalid sync cursor '{cursor}'")
+    else:
+        state = _start_state(since_token, models or list(SYNC_MODELS), page_size)
+    since = decode_token(state['since']) if state['since'] else None
+    context = {'request': request}
+    payload = {'full': since is None}
+    if not cursor:
+        payload['deleted'] = {}
+        for key in state['models']:
+            deleted = []
+            if since is not None:
+                deleted = list(
+                    SyncTombstone.objects.filter(model=SYNC_MODELS[key][2], deleted_at__gte=since)
+                    .values_list('object_id', flat=True).distinct()
+                )
+            payload['deleted'][key] = deleted
+
+    remaining = page_size or state['page_size']
+    resume = None
+    for position, key in enumerate(state['models']):
+        payload[key] = []
+        if position < state['model'] or resume is not None:
+            continue
+        model, serializer_class, _ = SYNC_MODELS[key]
+        rows = model.objects.filter(id__gt=state['after'] if position == state['model'] else 0)
+        if since is not None:
+            rows = rows.filter(updated_at__gte=since)
+        # One extra row tells whether this model has more after the page
+        page = list(rows.order_by('id')[:remaining + 1])
+        if len(page) > remaining:
+            page = page[:remaining]
+            resume = {'model': position, 'after': page[-1].id}
+        payload[key] = serializer_class(page, many=True, context=context).data
+        remaining -= len(page)
+        if remaining == 0 and resume is None and position + 1 < len(state['models']):
+            resume = {'model': position + 1, 'after': 0}
+
+    if resume is None:
+        payload['next'] = None
+        payload['token'] = state['token']
+    else:
+        payload['next'] = signing.dumps({**state, **resume}, salt=CURSOR_SALT)
+        payload['token'] = None
+    return payload
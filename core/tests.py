@@ -1,3 +1,769 @@
-from django.test import TestCase
+import tempfile
+from contextlib import contextmanager
+from io import BytesIO, StringIO
+import threading
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+from django.contrib.auth.models import Group, User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Sum
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from openpyxl import load_workbook
+from rest_framework.test import APIClient
+from .audit import audit_buffer
+from .exports import write_sales_excel
+from .audit_archive import archive_audit_logs, search_archive
+from .jobs import REPORT_WRITERS, claim_next_job, enqueue_report_job, requeue_stale_jobs, run_report_job
+from .inventory import stock_as_of, inventory_value_at, take_snapshots
+from .reports import filter_sales, filter_summaries, reports_cache_stats
+from .search import search_products
+from .sync import encode_token
+from .models import Product, Sale, Expense, DailySalesSummary, AuditLog, StockMovement, BusinessSettings, CatalogVersion, ReportJob, business_date, business_midnight
 
-# Create your tests here.
+
+def sale_payload(product, quantity=1):
+    return {'product': product.id, 'quantity': quantity, 'price': str(product.selling_price), 'payment_type': 'cash'}
+
+
+class ConcurrentSaleTests(TransactionTestCase):
+    """Many tills selling the same product at once must never oversell or lose stock"""
+    THREADS = 12
+    SALES_PER_THREAD = 6
+    INITIAL_STOCK = 40
+
+    def setUp(self):
+        self.user = User.objects.create_superuser('cashier', 'cashier@example.com', 'pass')
+        self.product = Product.objects.create(name='BRAKE PADS BOXER', buying_price=1000, selling_price=1500, stock_qty=self.INITIAL_STOCK)
+
+    def tearDown(self):
+        # Don't let queued audit entries land in another test's database
+        audit_buffer.flush()
+
+    def sell(self, barrier, statuses):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        try:
+            barrier.wait()
+            for _ in range(self.SALES_PER_THREAD):
+                response = client.post('/api/sales/', sale_payload(self.product), format='json')
+                statuses.append(response.status_code)
+        finally:
+            connection.close()
+
+    def test_concurrent_sales_never_oversell(self):
+        barrier = threading.Barrier(self.THREADS)
+        statuses = []
+        threads = [threading.Thread(target=self.sell, args=(barrier, statuses)) for _ in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        attempts = self.THREADS * self.SALES_PER_THREAD
+        self.assertEqual(len(statuses), attempts)
+        self.assertEqual(set(statuses) - {201, 400}, set())
+        sold = statuses.count(201)
+        self.assertEqual(sold, self.INITIAL_STOCK)
+
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock_qty, 0)
+        self.assertEqual(Sale.objects.filter(product=self.product).count(), sold)
+        self.assertEqual(DailySalesSummary.objects.aggregate(total=Sum('quantity'))['total'], sold)
+        audit_buffer.flush()
+        self.assertEqual(AuditLog.objects.filter(model='Sale', action='create').count(), sold)
+
+
+class SaleStockTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_superuser('admin', 'admin@example.com', 'pass'))
+        self.product = Product.objects.create(name='CLUTCH CABLE TVS', buying_price=500, selling_price=800, stock_qty=10)
+        self.other = Product.objects.create(name='SPARK PLUG HONDA', buying_price=300, selling_price=450, stock_qty=5)
+
+    def stock(self, product):
+        product.refresh_from_db()
+        return product.stock_qty
+
+    def test_create_deducts_and_rejects_oversell(self):
+        response = self.client.post('/api/sales/', sale_payload(self.product, 4), format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.stock(self.product), 6)
+        response = self.client.post('/api/sales/', sale_payload(self.product, 7), format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.stock(self.product), 6)
+
+    def test_update_adjusts_stock_by_difference(self):
+        sale_id = self.client.post('/api/sales/', sale_payload(self.product, 2), format='json').data['id']
+        self.assertEqual(self.client.patch(f'/api/sales/{sale_id}/', {'quantity': 5}, format='json').status_code, 200)
+        self.assertEqual(self.stock(self.product), 5)
+        self.assertEqual(self.client.patch(f'/api/sales/{sale_id}/', {'quantity': 1}, format='json').status_code, 200)
+        self.assertEqual(self.stock(self.product), 9)
+        # More than is left: rejected and nothing changes
+        self.assertEqual(self.client.patch(f'/api/sales/{sale_id}/', {'quantity': 11}, format='json').status_code, 400)
+        self.assertEqual(self.stock(self.product), 9)
+        self.assertEqual(Sale.objects.get(id=sale_id).quantity, 1)
+
+    def test_update_moving_sale_to_another_product(self):
+        sale_id = self.client.post('/api/sales/', sale_payload(self.product, 3), format='json').data['id']
+        response = self.client.patch(f'/api/sales/{sale_id}/', {'product': self.other.id, 'quantity': 2}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.stock(self.product), 10)
+        self.assertEqual(self.stock(self.other), 3)
+
+    def test_delete_restores_stock(self):
+        sale_id = self.client.post('/api/sales/', sale_payload(self.product, 3), format='json').data['id']
+        self.assertEqual(self.client.delete(f'/api/sales/{sale_id}/').status_code, 204)
+        self.assertEqual(self.stock(self.product), 10)
+
+
+class CheckoutTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('cashier', 'cashier@example.com', 'pass'))
+        self.pads = Product.objects.create(name='BRAKE PADS BOXER', buying_price=1000, selling_price=1500, stock_qty=10)
+        self.plug = Product.objects.create(name='SPARK PLUG HONDA', buying_price=300, selling_price=450, stock_qty=3)
+
+    def checkout(self, items):
+        return self.client.post('/api/sales/checkout/', {'payment_type': 'cash', 'items': items}, format='json')
+
+    def test_checkout_sells_every_line(self):
+        response = self.checkout([
+            {'product': self.pads.id, 'quantity': 2, 'price': '1500'},
+            {'product': self.plug.id, 'quantity': 3, 'price': '450', 'discount': '50'},
+            {'product': self.pads.id, 'quantity': 1, 'price': '1500'},
+        ])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.data['lines']), 3)
+        self.assertEqual(response.data['total'], Decimal('5800'))
+        self.pads.refresh_from_db()
+        self.plug.refresh_from_db()
+        self.assertEqual((self.pads.stock_qty, self.plug.stock_qty), (7, 0))
+        self.assertEqual(Sale.objects.count(), 3)
+        self.assertEqual(AuditLog.objects.count(), 1)
+        summary = DailySalesSummary.objects.get(product=self.pads)
+        self.assertEqual((summary.sale_count, summary.quantity, summary.revenue), (2, 3, Decimal('4500')))
+
+    def test_checkout_is_all_or_nothing(self):
+        response = self.checkout([
+            {'product': self.pads.id, 'quantity': 2, 'price': '1500'},
+            {'product': self.plug.id, 'quantity': 2, 'price': '450'},
+            {'product': self.plug.id, 'quantity': 2, 'price': '450'},
+        ])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.data['errors']), {1, 2})
+        self.pads.refresh_from_db()
+        self.assertEqual(self.pads.stock_qty, 10)
+        self.assertFalse(Sale.objects.exists())
+        self.assertFalse(DailySalesSummary.objects.exists())
+
+
+class DailySalesSummaryTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_superuser('admin', 'admin@example.com', 'pass'))
+        self.pads = Product.objects.create(name='BRAKE PADS BOXER', buying_price=1000, selling_price=1500, stock_qty=50)
+        self.plug = Product.objects.create(name='SPARK PLUG HONDA', buying_price=300, selling_price=450, stock_qty=50)
+        self.day = business_date(timezone.now()) - timedelta(days=5)
+
+    def sell_at(self, moment, items, payment_type='cash'):
+        with mock.patch('django.utils.timezone.now', return_value=moment):
+            return self.client.post('/api/sales/checkout/', {'payment_type': payment_type, 'items': items}, format='json')
+
+    def totals(self, from_date, to_date):
+        rollup = filter_summaries(from_date, to_date).aggregate(
+            sales=Sum('sale_count'), units=Sum('quantity'), total=Sum('revenue'))
+        line_total = ExpressionWrapper(F('price') * F('quantity') - F('discount'), output_field=DecimalField())
+        raw = filter_sales(from_date, to_date).aggregate(
+            sales=Count('id'), units=Sum('quantity'), total=Sum(line_total))
+        return rollup, raw
+
+    def test_rollup_matches_raw_sales_across_midnight(self):
+        midnight = business_midnight(self.day + timedelta(days=1))
+        self.sell_at(midnight - timedelta(minutes=10), [
+            {'product': self.pads.id, 'quantity': 2, 'price': '1500', 'discount': '100'},
+            {'product': self.plug.id, 'quantity': 1, 'price': '450'},
+        ])
+        self.sell_at(midnight + timedelta(minutes=10), [{'product': self.plug.id, 'quantity': 4, 'price': '450'}], 'mobile')
+        with mock.patch('django.utils.timezone.now', return_value=midnight - timedelta(minutes=5)):
+            sale_id = self.client.post('/api/sales/', sale_payload(self.pads, 3), format='json').data['id']
+        # Edits and deletes go through the incremental path too
+        self.client.patch(f'/api/sales/{sale_id}/', {'quantity': 1}, format='json')
+        self.client.delete(f'/api/sales/{Sale.objects.get(payment_type="mobile").id}/')
+        self.sell_at(midnight + timedelta(hours=2), [{'product': self.pads.id, 'quantity': 1, 'price': '1400'}])
+
+        first, second = self.day.isoformat(), (self.day + timedelta(days=1)).isoformat()
+        for from_date, to_date in ((first, first), (second, second), (first, second)):
+            rollup, raw = self.totals(from_date, to_date)
+            self.assertEqual((rollup['sales'], rollup['units']), (raw['sales'], raw['units']))
+            self.assertEqual(Decimal(rollup['total']), Decimal(raw['total']))
+        self.assertEqual(self.totals(first, first)[1]['sales'], 3)
+        self.assertEqual(self.totals(first, second)[0]['total'], Decimal('6250'))
+        # The rebuild computes the same rows from scratch
+        call_command('rebuild_sales_summary', '--check', stdout=StringIO())
+        call_command('rebuild_sales_summary', stdout=StringIO())
+        self.assertEqual(self.totals(first, second)[0]['total'], Decimal('6250'))
+
+
+    def test_backfill_and_rebuild_invalidate_cached_reports(self):
+        self.sell_at(timezone.now(), [{'product': self.pads.id, 'quantity': 1, 'price': '1500'}])
+        Sale.objects.update(unit_cost=None)
+        generation = reports_cache_stats()['generation']
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('backfill_sale_costs', stdout=StringIO())
+        self.assertNotEqual(reports_cache_stats()['generation'], generation)
+        self.assertEqual(Sale.objects.get().unit_cost, self.pads.unit_cost)
+
+
+class CursorPaginationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_superuser('admin', 'admin@example.com', 'pass'))
+        products = [Product.objects.create(name=f'BEARING {i}', buying_price=100, selling_price=200, stock_qty=10) for i in range(5)]
+        for product in products:
+            self.client.post('/api/sales/', sale_payload(product), format='json')
+        # Equal sort keys, so only the id tie-breaker keeps pages apart
+        Sale.objects.update(date=timezone.now())
+        for i in range(5):
+            self.client.post('/api/expenses/', {'date': '2026-01-15', 'description': f'Fuel {i}', 'category': 'Transport', 'amount': '1000'}, format='json')
+
+    def walk(self, url):
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.data['results']), 2)
+            ids += [row['id'] for row in response.data['results']]
+            url = response.data['next']
+        return ids
+
+    def test_pages_cover_every_row_once_in_order(self):
+        for endpoint, ordering in (('products', 'id'), ('sales', '-id'), ('expenses', '-id')):
+            with self.subTest(endpoint):
+                model = {'products': Product, 'sales': Sale, 'expenses': Expense}[endpoint]
+                expected = list(model.objects.order_by(ordering).values_list('id', flat=True))
+                self.assertEqual(self.walk(f'/api/{endpoint}/?page_size=2'), expected)
+                # The old unpaginated list, for scripts that still read a bare array
+                unpaginated = self.client.get(f'/api/{endpoint}/?paginate=false').data
+                self.assertEqual(sorted(row['id'] for row in unpaginated), sorted(expected))
+
+    def test_bad_cursor_is_not_found(self):
+        # Cursors whose offset or direction isn't a number
+        for cursor in ('bz14', 'cj14'):
+            for endpoint in ('products', 'sales', 'expenses'):
+                self.assertEqual(self.client.get(f'/api/{endpoint}/?cursor={cursor}').status_code, 404)
+
+
+class SparseFieldsTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_superuser('admin', 'admin@example.com', 'pass'))
+        self.product = Product.objects.create(name='CLUTCH CABLE TVS', buying_price=500, selling_price=800, stock_qty=10)
+
+    def test_sparse_fields_reject_unknown_names(self):
+        response = self.client.get(f'/api/products/{self.product.id}/?fields=name,stock_qty')
+        self.assertEqual(set(response.data), {'name', 'stock_qty'})
+        self.assertEqual(self.client.get('/api/products/?fields=display_info').status_code, 400)
+        response = self.client.get('/api/products/?fields=name,nope&omit=bogus')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['fields'], ['Unknown field: bogus', 'Unknown field: nope'])
+
+
+class CatalogVersionTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_superuser('admin', 'admin@example.com', 'pass'))
+        self.product = Product.objects.create(name='CLUTCH CABLE TVS', buying_price=500, selling_price=800, stock_qty=10)
+
+    def test_catalog_version_is_bumped_after_commit(self):
+        version = CatalogVersion.current().version
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/api/sales/', sale_payload(self.product, 1), format='json')
+            # Nothing locks the version row while the sale's transaction is open
+            self.assertEqual(CatalogVersion.current().version, version)
+        self.assertGreater(CatalogVersion.current().version, version)
+
+
+class StockAlertTests(TestCase):
+    def test_sql_buckets_match_stock_status(self):
+        for reorder_level in (None, 0, 1, 4, 7, 10, 25):
+            Product.objects.bulk_create([
+                Product(name=f'TEST PART {reorder_level}-{stock_qty}', buying_price=100, selling_price=150,
+                        stock_qty=stock_qty, reorder_level=reorder_level)
+                for stock_qty in range(31)
+            ])
+        for default in (10, 3):
+            with self.subTest(default_reorder_level=default), override_settings(DEFAULT_REORDER_LEVEL=default):
+                alerts = dict(Product.stock_alerts().values_list('id', 'alert_level'))
+                expected = {product.id: product.stock_status for product in Product.objects.all() if product.stock_status != 'normal'}
+                self.assertEqual(alerts, expected)
+
+
+class BulkUpsertTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_superuser('admin', 'admin@example.com', 'pass'))
+        self.chain = Product.objects.create(name='CHAIN KIT BAJAJ', sku='CK-BJ', buying_price=5000, selling_price=7000, stock_qty=4)
+
+    def upload(self, rows):
+        return self.client.post('/api/products/bulk-upsert/', {'products': rows}, format='json')
+
+    def test_updates_by_sku_and_creates_the_rest(self):
+        response = self.upload([
+            {'sku': 'CK-BJ', 'name': 'CHAIN KIT BAJAJ BOXER', 'stock_qty': 10},
+            {'name': 'MIRROR SET', 'buying_price': '1200', 'selling_price': '2000', 'stock_qty': 6},
+        ])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['created'], response.data['updated']), (1, 1))
+        self.chain.refresh_from_db()
+        # Only the fields in the row change
+        self.assertEqual((self.chain.name, self.chain.stock_qty, self.chain.selling_price), ('CHAIN KIT BAJAJ BOXER', 10, Decimal('7000')))
+        self.assertEqual(StockMovement.objects.filter(kind='import').count(), 2)
+
+    def test_one_bad_row_rolls_back_everything(self):
+        response = self.upload([
+            {'sku': 'CK-BJ', 'stock_qty': 10},
+            {'name': 'MIRROR SET', 'buying_price': '1200', 'selling_price': '2000', 'stock_qty': 6},
+            {'name': 'INDICATOR LAMP', 'selling_price': 'cheap', 'stock_qty': 2},
+            'not an object',
+            {'sku': 'CK-BJ', 'stock_qty': 1},
+        ])
+        self.assertEqual(response.status_code, 400)
+        results = response.data['results']
+        self.assertEqual([result['status'] for result in results], ['skipped', 'skipped', 'error', 'error', 'error'])
+        self.assertEqual(set(results[2]['errors']), {'selling_price'})
+        self.assertIn('more than once', str(results[4]['errors']['sku']))
+        self.chain.refresh_from_db()
+        self.assertEqual(self.chain.stock_qty, 4)
+        self.assertEqual(Product.objects.count(), 1)
+
+    def test_row_limit(self):
+        with mock.patch('core.views.BULK_UPSERT_MAX_ROWS', 2):
+            response = self.upload([{'name': f'WASHER {i}', 'buying_price': '10', 'selling_price': '20'} for i in range(3)])
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Product.objects.filter(name__startswith='WASHER').exists())
+
+
+class StockLedgerTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_superuser('admin', 'admin@example.com', 'pass'))
+        self.product = Product.objects.create(name='CHAIN SPROCKET KIT BAJAJ', buying_price=2000, selling_price=3000, stock_qty=10)
+
+    def stock_at(self, moment):
+        return stock_as_of(moment).get(id=self.product.id).stock_at
+
+    def test_every_stock_change_is_in_the_ledger(self):
+        sale_id = self.client.post('/api/sales/', sale_payload(self.product, 4), format='json').data['id']
+        self.client.patch(f'/api/sales/{sale_id}/', {'quantity': 3}, format='json')
+        self.client.post(f'/api/products/{self.product.id}/restock/', {'quantity': 5}, format='json')
+        self.client.post('/api/sales/checkout/', {'payment_type': 'cash', 'items': [{'product': self.product.id, 'quantity': 2, 'price': '3000'}]}, format='json')
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock_qty, 10)
+        kinds = list(StockMovement.objects.order_by('id').values_list('kind', 'quantity'))
+        self.assertEqual(kinds, [('adjustment', 10), ('sale', -4), ('sale', 1), ('restock', 5), ('sale', -2)])
+        self.assertEqual(self.stock_at(timezone.now()), 10)
+
+    def test_stock_as_of_replays_movements_after_snapshot(self):
+        start = timezone.now()
+        StockMovement.objects.update(created_at=start - timedelta(days=3))
+        self.product.deduct_stock(4)
+        StockMovement.objects.filter(quantity=-4).update(created_at=start - timedelta(days=1))
+        self.assertEqual(take_snapshots(start - timedelta(days=2)), 1)
+        self.product.add_stock(6)
+
+        self.assertEqual(self.stock_at(start - timedelta(days=4)), 0)
+        self.assertEqual(self.stock_at(start - timedelta(days=2)), 10)
+        self.assertEqual(self.stock_at(start - timedelta(hours=1)), 6)
+        self.assertEqual(self.stock_at(timezone.now()), 12)
+        value = inventory_value_at(start - timedelta(hours=1))
+        self.assertEqual((value['total_units'], value['inventory_value']), (6, 12000.0))
+
+    def test_stock_as_of_endpoint_rejects_bad_product(self):
+        today = business_date(timezone.now()).isoformat()
+        response = self.client.get(f'/api/stock/as-of/?date={today}&product={self.product.id}')
+        self.assertEqual([row['stock_at'] for row in response.data['results']], [10])
+        self.assertEqual(self.client.get(f'/api/stock/as-of/?date={today}&product=abc').status_code, 400)
+
+
+class AuditLogTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser('admin', 'admin@example.com', 'pass')
+        self.cashier = User.objects.create_user('cashier', 'cashier@example.com', 'pass')
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        now = timezone.now()
+        for days_ago in (40, 40, 3):
+            AuditLog.objects.create(user=self.cashier, action='create', model='Sale', object_id='1', timestamp=now - timedelta(days=days_ago))
+        AuditLog.objects.create(user=self.admin, action='update', model='Product', object_id='2', timestamp=now - timedelta(days=40))
+
+    def test_filters(self):
+        def ids(query):
+            return [row['id'] for row in self.client.get(f'/api/audit-logs/?{query}').data['results']]
+        self.assertEqual(len(ids('user=cashier')), 3)
+        self.assertEqual(ids(f'user={self.admin.id}'), ids('model=Product'))
+        self.assertEqual(len(ids('model=Sale&action=update')), 0)
+
+    def test_archive_moves_old_entries_and_keeps_them_searchable(self):
+        with tempfile.TemporaryDirectory() as archive_dir:
+            archived = archive_audit_logs(timezone.now() - timedelta(days=30), archive_dir)
+            self.assertEqual(sum(archived.values()), 3)
+            self.assertEqual(AuditLog.objects.count(), 1)
+            day = list(archived)[0]
+            found = search_archive(day, day, user=self.cashier.id, archive_dir=archive_dir)
+            self.assertEqual([(e['model'], e['username']) for e in found], [('Sale', 'cashier')] * 2)
+            self.assertEqual(search_archive(day, day, model='Expense', archive_dir=archive_dir), [])
+
+    def test_history_records_field_changes(self):
+        product = Product.objects.create(name='OIL FILTER YAMAHA', buying_price=400, selling_price=700, stock_qty=5)
+        self.client.patch(f'/api/products/{product.id}/', {'selling_price': '750', 'name': 'OIL FILTER YAMAHA'}, format='json')
+        self.client.post(f'/api/products/{product.id}/restock/', {'quantity': 3}, format='json')
+        response = self.client.get(f'/api/audit-logs/history/product/{product.id}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([entry['changes'] for entry in response.data['results']], [
+            {'selling_price': ['700.00', '750.00']},
+            {'stock_qty': [5, 8]},
+        ])
+        self.assertEqual(self.client.get('/api/audit-logs/history/nosuchmodel/1/').status_code, 404)
+
+    def test_bulk_upsert_records_each_products_changes(self):
+        product = Product.objects.create(name='OIL FILTER YAMAHA', buying_price=400, selling_price=700, stock_qty=5)
+        response = self.client.post('/api/products/bulk-upsert/', [
+            {'name': 'OIL FILTER YAMAHA', 'selling_price': '720', 'stock_qty': 5},
+            {'name': 'AIR FILTER TVS', 'buying_price': '300', 'selling_price': '500', 'stock_qty': 4},
+        ], format='json')
+        self.assertEqual((response.data['created'], response.data['updated']), (1, 1))
+        history = self.client.get(f'/api/audit-logs/history/product/{product.id}/').data['results']
+        self.assertEqual([entry['changes'] for entry in history], [{'selling_price': ['700.00', '720.00']}])
+        created_id = response.data['results'][1]['id']
+        history = self.client.get(f'/api/audit-logs/history/product/{created_id}/').data['results']
+        self.assertEqual(history[-1]['details'], 'Created product AIR FILTER TVS (bulk upload)')
+
+
+class ClaimsTokenTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('cashier', 'cashier@example.com', 'pass')
+        self.product = Product.objects.create(name='HEADLAMP BULB', buying_price=200, selling_price=350, stock_qty=20)
+
+    def login(self):
+        tokens = APIClient().post('/api/token/', {'username': 'cashier', 'password': 'pass'}, format='json').data
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+        return client, tokens
+
+    def test_requests_authenticate_without_user_queries(self):
+        client, _ = self.login()
+        client.get('/api/user-info/')  # warms the token version cache
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(client.post('/api/sales/', sale_payload(self.product), format='json').status_code, 201)
+            self.assertEqual(client.delete(f'/api/products/{self.product.id}/').status_code, 403)
+        self.assertFalse([q['sql'] for q in queries.captured_queries if 'auth_user' in q['sql'] or 'auth_group' in q['sql']])
+        self.assertEqual(Sale.objects.get().user, self.user)
+
+    def test_role_change_revokes_tokens(self):
+        client, tokens = self.login()
+        self.assertEqual(client.get('/api/user-info/').data['groups'], [])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.groups.add(Group.objects.create(name='Admin'))
+        self.assertEqual(client.get('/api/user-info/').status_code, 401)
+        self.assertEqual(APIClient().post('/api/token/refresh/', {'refresh': tokens['refresh']}, format='json').status_code, 401)
+        client, _ = self.login()
+        self.assertEqual(client.get('/api/user-info/').data['groups'], ['Admin'])
+
+
+class BusinessSettingsCacheTests(TestCase):
+    def setUp(self):
+        BusinessSettings._cached = None
+        self.addCleanup(setattr, BusinessSettings, '_cached', None)
+
+    def test_cached_settings_need_no_queries(self):
+        BusinessSettings.cached()
+        with self.assertNumQueries(0):
+            self.assertEqual(BusinessSettings.cached().currency, 'TZS')
+
+    @override_settings(BUSINESS_SETTINGS_CHECK_SECONDS=0)
+    def test_change_from_another_worker_is_noticed(self):
+        self.assertEqual(BusinessSettings.cached().currency, 'TZS')
+        # Another process saving bumps the stored version behind this one's back
+        BusinessSettings.objects.filter(pk=1).update(currency='KES', version=F('version') + 1)
+        with self.assertNumQueries(2):
+            self.assertEqual(BusinessSettings.cached().currency, 'KES')
+        with self.assertNumQueries(1):
+            BusinessSettings.cached()
+
+    def test_save_bumps_version_in_the_database(self):
+        first = BusinessSettings.get_settings()
+        stale = BusinessSettings.objects.get(pk=first.pk)
+        first.save()
+        stale.currency = 'UGX'
+        stale.save()
+        # The stale copy didn't overwrite the other save's bump
+        self.assertEqual(stale.version, first.version + 1)
+        self.assertEqual(BusinessSettings.objects.get(pk=first.pk).version, stale.version)
+
+
+class ProductSearchTests(TestCase):
+    def setUp(self):
+        self.pads = Product.objects.create(name='BRAKE PADS BOXER', buying_price=1000, selling_price=1500, stock_qty=10)
+        Product.objects.create(name='SPARK PLUG HONDA', buying_price=300, selling_price=450, stock_qty=5)
+
+    def names(self, query):
+        return [product.name for product in search_products(query)]
+
+    def test_finds_products_created_after_migrate(self):
+        self.assertEqual(self.names('brake'), ['BRAKE PADS BOXER'])
+        self.pads.name = 'BRAKE SHOES BOXER'
+        self.pads.save()
+        self.assertEqual(self.names('shoes'), ['BRAKE SHOES BOXER'])
+
+    def test_prefix_and_typo_matches(self):
+        self.assertEqual(self.names('brak'), ['BRAKE PADS BOXER'])
+        self.assertEqual(self.names('brak pads'), ['BRAKE PADS BOXER'])
+        self.assertEqual(self.names('sprak plug'), ['SPARK PLUG HONDA'])
+
+    def test_single_word_typos(self):
+        self.assertEqual(self.names('sprak'), ['SPARK PLUG HONDA'])
+        self.assertEqual(self.names('bxoer'), ['BRAKE PADS BOXER'])
+        self.assertEqual(self.names('hondq'), ['SPARK PLUG HONDA'])
+        self.assertEqual(self.names('xyz'), [])
+
+    def test_out_of_date_index_falls_back_to_scanning(self):
+        with connection.cursor() as cursor:
+            cursor.execute("DROP TRIGGER core_product_fts_insert")
+        Product.objects.create(name='CLUTCH PLATE TVS', buying_price=800, selling_price=1200, stock_qty=4)
+        self.assertEqual(self.names('cluch plate'), ['CLUTCH PLATE TVS'])
+        self.assertEqual(self.names('brake pads'), ['BRAKE PADS BOXER'])
+
+
+class BusinessDayReportTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_superuser('admin', 'admin@example.com', 'pass'))
+        self.product = Product.objects.create(name='HEAD LAMP BULB', buying_price=200, selling_price=350, stock_qty=10)
+        self.day = business_date(timezone.now()) - timedelta(days=3)
+        self.client.post('/api/sales/', sale_payload(self.product, 2), format='json')
+        # Late evening locally, which is still the same business day
+        Sale.objects.update(date=business_midnight(self.day) + timedelta(hours=23, minutes=30))
+
+    def test_filter_sales_uses_whole_business_days(self):
+        day, next_day = self.day.isoformat(), (self.day + timedelta(days=1)).isoformat()
+        self.assertEqual(filter_sales(day, day).count(), 1)
+        self.assertEqual(filter_sales(next_day, next_day).count(), 0)
+
+    def test_bad_dates_are_rejected(self):
+        self.assertEqual(self.client.get('/api/reports/data/?from=garbage').status_code, 400)
+        self.assertEqual(self.client.get('/api/reports/sales/excel/?to=2026-02-30').status_code, 400)
+
+    def test_dashboard_lists_recent_sales(self):
+        response = self.client.get('/api/reports/dashboard/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([sale['product_name'] for sale in response.data['recent_sales']], ['HEAD LAMP BULB'])
+
+    def test_export_of_a_single_day(self):
+        day = self.day.isoformat()
+        response = self.client.get(f'/api/sales/export/?from={day}&to={day}&output=ndjson')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(b''.join(response.streaming_content).splitlines()), 1)
+        self.assertEqual(self.client.get('/api/sales/export/?from=garbage').status_code, 400)
+        self.assertEqual(self.client.get('/api/audit-logs/export/?to=garbage').status_code, 400)
+        today = business_date(timezone.now()).isoformat()
+        self.assertTrue(AuditLog.objects.exists())
+        response = self.client.get(f'/api/audit-logs/export/?from={today}&to={today}&output=ndjson')
+        self.assertEqual(len(b''.join(response.streaming_content).splitlines()), AuditLog.objects.count())
+
+    def test_excel_rows_show_the_business_date(self):
+        # 01:00 locally is still the previous day in UTC
+        Sale.objects.update(date=business_midnight(self.day) + timedelta(hours=1))
+        report = BytesIO()
+        write_sales_excel(report, self.day.isoformat(), self.day.isoformat())
+        rows = list(load_workbook(report).active.iter_rows(min_row=5, max_col=2, values_only=True))
+        self.assertEqual(rows[0], (Sale.objects.get().id, self.day.isoformat()))
+
+
+class SyncTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_superuser('admin', 'admin@example.com', 'pass'))
+        self.products = [
+            Product.objects.create(name=f'BRAKE SHOE {i}', buying_price=500, selling_price=800, stock_qty=20)
+            for i in range(3)
+        ]
+        for product in self.products:
+            self.client.post('/api/sales/', sale_payload(product), format='json')
+
+    def sync(self, query=''):
+        response = self.client.get(f'/api/sync/?{query}')
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data
+
+    def test_full_sync_is_paged_and_limited_to_models(self):
+        page = self.sync('models=products,sales&page_size=2')
+        self.assertTrue(page['full'])
+        self.assertNotIn('expenses', page)
+        seen = {'products': [], 'sales': []}
+        while True:
+            for key in seen:
+                seen[key] += [row['id'] for row in page[key]]
+            self.assertLessEqual(len(page['products']) + len(page['sales']), 2)
+            if not page['next']:
+                break
+            self.assertIsNone(page['token'])
+            page = self.sync(f"cursor={page['next']}")
+        self.assertEqual(seen['products'], [product.id for product in self.products])
+        self.assertEqual(seen['sales'], list(Sale.objects.order_by('id').values_list('id', flat=True)))
+        self.assertTrue(page['token'])
+        self.assertEqual(self.client.get('/api/sync/?models=widgets').status_code, 400)
+        self.assertEqual(self.client.get('/api/sync/?cursor=forged').status_code, 400)
+
+    def synced_token(self):
+        # Put existing rows well before the token so only later writes show up
+        hour_ago = timezone.now() - timedelta(hours=1)
+        Product.objects.update(updated_at=hour_ago)
+        Sale.objects.update(updated_at=hour_ago)
+        return encode_token(timezone.now())
+
+    def test_delta_after_update(self):
+        token = self.synced_token()
+        self.client.patch(f'/api/products/{self.products[1].id}/', {'selling_price': '850'}, format='json')
+        delta = self.sync(f'since={token}')
+        self.assertFalse(delta['full'])
+        self.assertEqual([row['id'] for row in delta['products']], [self.products[1].id])
+        self.assertEqual((delta['sales'], delta['expenses']), ([], []))
+
+    def test_delete_leaves_tombstone_and_touches_sales(self):
+        token = self.synced_token()
+        product = self.products[0]
+        sale = Sale.objects.get(product=product)
+        self.assertEqual(self.client.delete(f'/api/products/{product.id}/').status_code, 204)
+        delta = self.sync(f'since={token}')
+        self.assertEqual(delta['deleted']['products'], [product.id])
+        # The sale lost its product, so clients need the updated row
+        self.assertEqual([(row['id'], row['product']) for row in delta['sales']], [(sale.id, None)])
+
+    def test_token_past_retention_gets_full_sync(self):
+        token = encode_token(timezone.now() - timedelta(days=31))
+        delta = self.sync(f'since={token}')
+        self.assertTrue(delta['full'])
+        self.assertEqual(len(delta['products']), 3)
+        self.assertEqual(self.client.get('/api/sync/?since=yesterday').status_code, 400)
+
+
+class ReportJobTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name))
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_superuser('admin', 'admin@example.com', 'pass'))
+        product = Product.objects.create(name='FUEL TAP BOXER', buying_price=900, selling_price=1400, stock_qty=5)
+        self.client.post('/api/sales/', sale_payload(product, 2), format='json')
+
+    def test_identical_requests_share_a_job(self):
+        job, created = enqueue_report_job('excel', '2024-01-01', '2024-01-31')
+        self.assertTrue(created)
+        self.assertEqual(enqueue_report_job('excel', '2024-01-01T00:00', '2024-01-31'), (job, False))
+        self.assertTrue(enqueue_report_job('pdf', '2024-01-01', '2024-01-31')[1])
+        # A finished job is reused until it expires
+        ReportJob.objects.filter(id=job.id).update(status='done', finished_at=timezone.now())
+        self.assertFalse(enqueue_report_job('excel', '2024-01-01', '2024-01-31')[1])
+        ReportJob.objects.filter(id=job.id).update(finished_at=timezone.now() - timedelta(hours=1))
+        self.assertTrue(enqueue_report_job('excel', '2024-01-01', '2024-01-31')[1])
+
+    def test_queue_run_and_download(self):
+        response = self.client.get('/api/reports/sales/excel/?async=true')
+        self.assertEqual(response.status_code, 202)
+        job_id = response.data['id']
+        self.assertEqual(self.client.get(f'/api/reports/jobs/{job_id}/download/').status_code, 409)
+        # The worker drops stale connections between jobs, which would close the test's transaction
+        with mock.patch('core.management.commands.run_report_worker.close_old_connections'):
+            call_command('run_report_worker', '--once', stdout=StringIO())
+        job = self.client.get(f'/api/reports/jobs/{job_id}/').data
+        self.assertEqual(job['status'], 'done')
+        self.assertTrue(job['download_url'].endswith(f'/api/reports/jobs/{job_id}/download/'))
+        download = self.client.get(f'/api/reports/jobs/{job_id}/download/')
+        self.assertEqual(download.status_code, 200)
+        self.assertEqual(load_workbook(BytesIO(b''.join(download.streaming_content))).active['A1'].value, 'Moto Spares Sales Report')
+        # The same request is now answered with the finished job
+        self.assertEqual(self.client.get('/api/reports/sales/excel/?async=true').status_code, 200)
+
+    def test_failed_job_records_the_error(self):
+        job, _ = enqueue_report_job('pdf')
+        broken = mock.Mock(side_effect=RuntimeError('disk full'))
+        with mock.patch.dict(REPORT_WRITERS, {'pdf': (broken, 'pdf')}), self.assertLogs('core.jobs', 'ERROR'):
+            run_report_job(claim_next_job())
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.error), ('failed', 'disk full'))
+
+    def test_stale_running_job_is_requeued(self):
+        job, _ = enqueue_report_job('pdf')
+        self.assertEqual(claim_next_job(), job)
+        self.assertIsNone(claim_next_job())
+        self.assertEqual(requeue_stale_jobs(timedelta(minutes=30)), 0)
+        ReportJob.objects.filter(id=job.id).update(started_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(requeue_stale_jobs(timedelta(minutes=30)), 1)
+        self.assertEqual(claim_next_job(), job)
+
+
+@override_settings(REPORTS_CACHE_ALIAS='default')
+class ReportsCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_superuser('admin', 'admin@example.com', 'pass'))
+        self.product = Product.objects.create(name='SHOCK ABSORBER TVS', buying_price=4000, selling_price=6000, stock_qty=8)
+
+    def reports(self):
+        response = self.client.get('/api/reports/data/')
+        return response['X-Cache'], response.data
+
+    @contextmanager
+    def assert_invalidated(self, read):
+        """Warm the cache, run the block's write, and expect a miss showing new numbers"""
+        self.reports()
+        cache_state, data = self.reports()
+        self.assertEqual(cache_state, 'HIT')
+        before = read(data)
+        with self.captureOnCommitCallbacks(execute=True):
+            yield
+        cache_state, data = self.reports()
+        self.assertEqual(cache_state, 'MISS')
+        self.assertNotEqual(read(data), before)
+
+    def test_sale_writes_invalidate(self):
+        def sales(data):
+            return data['summary']['total_sales'], data['summary']['total_revenue']
+        with self.assert_invalidated(sales):
+            sale_id = self.client.post('/api/sales/', sale_payload(self.product, 2), format='json').data['id']
+        with self.assert_invalidated(sales):
+            self.client.patch(f'/api/sales/{sale_id}/', {'quantity': 1}, format='json')
+        with self.assert_invalidated(sales):
+            self.client.delete(f'/api/sales/{sale_id}/')
+
+    def test_expense_writes_invalidate(self):
+        def expenses(data):
+            return data['profit_analysis']['total_expenses']
+        expense = {'date': business_date(timezone.now()).isoformat(), 'description': 'Shop rent', 'category': 'Rent', 'amount': '50000'}
+        with self.assert_invalidated(expenses):
+            expense_id = self.client.post('/api/expenses/', expense, format='json').data['id']
+        with self.assert_invalidated(expenses):
+            self.client.patch(f'/api/expenses/{expense_id}/', {'amount': '60000'}, format='json')
+        with self.assert_invalidated(expenses):
+            self.client.delete(f'/api/expenses/{expense_id}/')
+
+    def test_product_and_stock_writes_invalidate(self):
+        def stock(data):
+            return data['stock_analysis']['total_products'], data['stock_analysis']['total_stock_quantity']
+        product = {'name': 'HORN 12V', 'buying_price': '700', 'selling_price': '1000', 'stock_qty': 3}
+        with self.assert_invalidated(stock):
+            product_id = self.client.post('/api/products/', product, format='json').data['id']
+        with self.assert_invalidated(stock):
+            self.client.patch(f'/api/products/{product_id}/', {'stock_qty': 9}, format='json')
+        with self.assert_invalidated(stock):
+            self.client.post(f'/api/products/{self.product.id}/restock/', {'quantity': 4}, format='json')
+        with self.assert_invalidated(stock):
+            self.client.delete(f'/api/products/{product_id}/')
@@ -0,0 +1,83 @@
+import logging
+import os
+from io import BytesIO
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps, features
+
+logger = logging.getLogger(__name__)
+
+# Variant name -> (longest side in pixels, Pillow format, file extension)
+THUMBNAIL_VARIANTS = {
+    'medium': (256, 'JPEG', 'jpg'),
+    'medium_webp': (256, 'WEBP', 'webp'),
+    'small': (64, 'JPEG', 'jpg'),
+    'small_webp': (64, 'WEBP', 'webp'),
+}
+THUMBNAIL_DIR = 'product_images/thumbs'
+THUMBNAIL_QUALITY = 80
+WEBP_AVAILABLE = features.check('webp')
+
+
+def thumbnail_name(image_name, variant):
+    stem = os.path.splitext(os.path.basename(image_name))[0]
+    extension = THUMBNAIL_VARIANTS[variant][2]
+    return f'{THUMBNAIL_DIR}/{stem}_{variant}.{extension}'
+
+
+def _load_image(image_name):
+    with default_storage.open(image_name, 'rb') as f:
+        image = Image.open(f)
+        # Let the JPEG decoder scale down while decoding; phone photos are far bigger than we need
+        largest = max(size for size, _, _ in THUMBNAIL_VARIANTS.values())
+        image.draft('RGB', (largest * 2, largest * 2))
+        image = ImageOps.exif_transpose(image)
+        image.load()
+    if image.mode not in ('RGB', 'L'):
+        background = Image.new('RGB', image.size, 'white')
+        image = image.convert('RGBA')
+        background.paste(image, mask=image.getchannel('A'))
+        image = background
+    return image
+
+
+def generate_thumbnails(image_name):
+    """Write every thumbnail variant of a stored image and return {variant: storage name}.
+
+    Takes and returns plain names so it can run in worker processes.
+    """
+    image = _load_image(image_name)
+    thumbnails = {}
+    # Variants are ordered largest first, so each resize starts from an already small image
+    for variant, (size, image_format, _) in THUMBNAIL_VARIANTS.items():
+        if image_format == 'WEBP' and not WEBP_AVAILABLE:
+            continue
+        image.thumbnail((size, size), Image.LANCZOS)
+        buffer = BytesIO()
+        image.save(buffer, image_format, quality=THUMBNAIL_QUALITY, optimize=image_format == 'JPEG')
+        name = thumbnail_name(image_name, variant)
+        if default_storage.exists(name):
+            default_storage.delete(name)
+        thumbnails[variant] = default_storage.save(name, ContentFile(buffer.getvalue()))
+    return thumbnails
+
+
+def delete_thumbnails(thumbnails):
+    for name in (thumbnails or {}).values():
+        if default_storage.exists(name):
+            default_storage.delete(name)
+
+
+def refresh_product_thumbnails(product):
+    """Regenerate a product's thumbnails from its current image, or clear them if it has none"""
+    delete_thumbnails(product.thumbnails)
+    thumbnails = {}
+    if product.image:
+        try:
+            thumbnails = generate_thumbnails(product.image.name)
+        except Exception:
+            # A broken upload shouldn't fail the request; the list falls back to the original image
+            logger.exception("Thumbnail generation failed for product %s", product.id)
+    product.thumbnails = thumbnails
+    product.save(update_fields=['thumbnails', 'updated_at'])
+    return thumbnails
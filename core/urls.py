@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import CategoryViewSet, ProductViewSet, SaleViewSet, ExpenseViewSet, UserInfoView, LowStockProductsView, StockValidationView, sales_report_pdf, sales_report_excel, reports_data, AuditLogViewSet, health_check, simple_test, business_settings
+from .views import CategoryViewSet, ProductViewSet, SaleViewSet, ExpenseViewSet, UserInfoView, LowStockProductsView, StockValidationView, sales_report_pdf, sales_report_excel, reports_data, reports_cache_status, dashboard_data, AuditLogViewSet, ReportJobViewSet, health_check, simple_test, business_settings, sync_changes, stock_as_of_date, inventory_value
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
 router = DefaultRouter()
@@ -9,6 +9,7 @@ router.register(r'products', ProductViewSet)
 router.register(r'sales', SaleViewSet)
 router.register(r'expenses', ExpenseViewSet)
 router.register(r'audit-logs', AuditLogViewSet, basename='auditlog')
+router.register(r'reports/jobs', ReportJobViewSet, basename='reportjob')
 
 urlpatterns = [
     path('', include(router.urls)),
@@ -22,7 +23,12 @@ urlpatterns = [
     path('reports/sales/pdf/', sales_report_pdf, name='sales_report_pdf'),
     path('reports/sales/excel/', sales_report_excel, name='sales_report_excel'),
     path('reports/data/', reports_data, name='reports_data'),
+    path('reports/cache-stats/', reports_cache_status, name='reports_cache_status'),
+    path('reports/dashboard/', dashboard_data, name='dashboard_data'),
     path('business-settings/', business_settings, name='business_settings'),
+    path('sync/', sync_changes, name='sync_changes'),
+    path('stock/as-of/', stock_as_of_date, name='stock_as_of'),
+    path('stock/inventory-value/', inventory_value, name='inventory_value'),
     path('auth/', include('djoser.urls')),  # registration, password reset, etc.
     path('auth/', include('djoser.urls.jwt')),  # JWT endpoints for djoser
 ] 
\ No newline at end of file
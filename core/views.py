@@ -1,49 +1,152 @@
 from django.shortcuts import render
+from django.apps import apps
+from django.contrib.auth.models import User
 from rest_framework import viewsets, permissions, status
 from rest_framework.response import Response
-from .models import Category, Product, Sale, Expense, AuditLog, BusinessSettings
-from .serializers import CategorySerializer, ProductSerializer, SaleSerializer, ExpenseSerializer, AuditLogSerializer, BusinessSettingsSerializer
+from .models import Category, Product, Sale, Expense, AuditLog, BusinessSettings, ReportJob, CatalogVersion
+from .serializers import CategorySerializer, ProductSerializer, SaleSerializer, ExpenseSerializer, AuditLogSerializer, AuditLogHistorySerializer, BusinessSettingsSerializer, ReportJobSerializer
+from .jobs import enqueue_report_job
+from .pagination import KeysetCursorPagination
+from .search import search_products, DEFAULT_SEARCH_LIMIT
+from .sync import build_sync_payload, parse_models, parse_page_size, SyncError
+from .thumbnails import refresh_product_thumbnails, delete_thumbnails
+from .bulk import bulk_upsert_products, BULK_UPSERT_MAX_ROWS
+from .checkout import CheckoutSerializer, CheckoutError, checkout, build_receipt
+from .auth import user_group_names
+from .audit import log_action, audit_atomic, snapshot, diff
+from .audit_archive import search_archive, ARCHIVE_SEARCH_LIMIT, ARCHIVE_SEARCH_MAX_DAYS
+from .inventory import stock_as_of, inventory_value_at, business_midnight, month_end
+from .exports import write_sales_excel, write_sales_pdf, streaming_export_response, STREAM_FORMATS, OPENPYXL_AVAILABLE, REPORTLAB_AVAILABLE
+from .reports import filter_sales, filter_expenses, business_day_range, cached_reports_data, reports_cache_stats, build_dashboard_data
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import api_view, permission_classes, action
-from django.http import HttpResponse, JsonResponse
-try:
-    from reportlab.pdfgen import canvas
-    from openpyxl import Workbook
-    REPORTLAB_AVAILABLE = True
-except ImportError:
-    REPORTLAB_AVAILABLE = False
-import io
+from django.http import HttpResponse, JsonResponse, FileResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+import hashlib
+from datetime import date, timedelta
+from django.utils.dateparse import parse_date
+import os
+import tempfile
 from django.core.exceptions import ValidationError
+from rest_framework.exceptions import ValidationError as APIValidationError
 
 # Create your views here.
 
+REPORT_SPOOL_MAX_SIZE = 5 * 1024 * 1024
+# Derived from the image, so their changes would only repeat the image diff
+PRODUCT_AUDIT_EXCLUDE = ('thumbnails',)
+
+def is_admin(user):
+    # Group names come from the token claims, so this is query-free on the request path
+    return bool(user and user.is_authenticated and (user.is_superuser or 'Admin' in user_group_names(user)))
+
 class IsAdminOrReadCreateOnly(permissions.BasePermission):
     def has_permission(self, request, view):
         if request.method in permissions.SAFE_METHODS or request.method == 'POST':
             return request.user and request.user.is_authenticated
-        return request.user and (request.user.is_superuser or request.user.groups.filter(name='Admin').exists())
+        return is_admin(request.user)
+
+class CatalogConditionalGetMixin:
+    """Serves list/retrieve with ETag and Last-Modified from the catalog version.
+
+    An unchanged catalog is answered with 304 before the product or
+    category tables are queried.
+    """
+
+    def catalog_validators(self, request):
+        catalog = CatalogVersion.current()
+        # The same catalog renders differently per URL, host (image links) and content type
+        variant = f"{request.get_host()}{request.get_full_path()}|{request.META.get('HTTP_ACCEPT', '')}"
+        etag = f'"{catalog.version}-{hashlib.md5(variant.encode()).hexdigest()[:12]}"'
+        return etag, int(catalog.updated_at.timestamp())
+
+    def conditional_response(self, request, handler, *args, **kwargs):
+        etag, last_modified = self.catalog_validators(request)
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        # Let browsers keep the copy but revalidate it on every use
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
 
-class CategoryViewSet(viewsets.ModelViewSet):
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(request, super().retrieve, *args, **kwargs)
+
+class CategoryViewSet(CatalogConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = [IsAuthenticated]
 
-def log_action(user, action, model, object_id, details=''):
-    AuditLog.objects.create(user=user, action=action, model=model, object_id=str(object_id), details=details)
+class StreamingExportMixin:
+    """Adds an export/ action that streams the filtered rows as CSV or NDJSON"""
+    export_fields = []
+    export_filename = 'export'
+
+    def get_export_queryset(self, from_date, to_date):
+        """Rows for an inclusive range of business dates; raise ValueError for a bad date"""
+        raise NotImplementedError
+
+    @action(detail=False, methods=['get'], url_path='export')
+    def export(self, request):
+        # 'format' is taken by DRF's content negotiation, so the file type is passed as 'output'
+        output = request.GET.get('output', 'csv')
+        if output not in STREAM_FORMATS:
+            return Response({'error': f"Unsupported output '{output}'. Use one of: {', '.join(STREAM_FORMATS)}"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            queryset = self.get_export_queryset(request.GET.get('from'), request.GET.get('to'))
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return streaming_export_response(queryset, self.export_fields, output, self.export_filename)
+
+class AuditedWritesMixin:
+    """In strict audit mode, commit each write together with its audit entries"""
+    def create(self, request, *args, **kwargs):
+        with audit_atomic():
+            return super().create(request, *args, **kwargs)
+
+    def update(self, request, *args, **kwargs):
+        with audit_atomic():
+            return super().update(request, *args, **kwargs)
 
-class ProductViewSet(viewsets.ModelViewSet):
+    def destroy(self, request, *args, **kwargs):
+        with audit_atomic():
+            return super().destroy(request, *args, **kwargs)
+
+class ProductViewSet(CatalogConditionalGetMixin, AuditedWritesMixin, viewsets.ModelViewSet):
     queryset = Product.objects.all()
     serializer_class = ProductSerializer
     permission_classes = [IsAdminOrReadCreateOnly]
+    pagination_class = KeysetCursorPagination
+    cursor_ordering = ('id',)
     
     def get_serializer_context(self):
         return {'request': self.request}
     
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        # Sparse fieldsets only need their own columns
+        selected = ProductSerializer.selected_fields(self.request)
+        if selected is not None:
+            queryset = queryset.only(*ProductSerializer.model_columns(selected))
+        return queryset
+    
     def perform_create(self, serializer):
         obj = serializer.save()
+        if obj.image:
+            refresh_product_thumbnails(obj)
         log_action(self.request.user, 'create', 'Product', obj.id, f'Created product {obj.name}')
     def perform_update(self, serializer):
+        before = snapshot(serializer.instance, exclude=PRODUCT_AUDIT_EXCLUDE)
+        previous_image = serializer.instance.image.name if serializer.instance.image else None
         # Handle image removal
         if self.request.data.get('remove_image') == 'true':
             instance = serializer.instance
@@ -53,24 +156,74 @@ class ProductViewSet(viewsets.ModelViewSet):
                 # Clear the image field
                 instance.image = None
         obj = serializer.save()
-        log_action(self.request.user, 'update', 'Product', obj.id, f'Updated product {obj.name}')
+        if (obj.image.name if obj.image else None) != previous_image:
+            refresh_product_thumbnails(obj)
+        log_action(self.request.user, 'update', 'Product', obj.id, f'Updated product {obj.name}',
+                   changes=diff(before, snapshot(obj, exclude=PRODUCT_AUDIT_EXCLUDE)))
     def perform_destroy(self, instance):
         log_action(self.request.user, 'delete', 'Product', instance.id, f'Deleted product {instance.name}')
+        delete_thumbnails(instance.thumbnails)
         instance.delete()
 
+    @action(detail=False, methods=['post'], url_path='bulk-upsert')
+    def bulk_upsert(self, request):
+        """Create or update many products in one transaction, matching by SKU or name"""
+        if not is_admin(request.user):
+            return Response({'error': 'Only admins can bulk upload products'}, status=status.HTTP_403_FORBIDDEN)
+        rows = request.data.get('products') if isinstance(request.data, dict) else request.data
+        if not isinstance(rows, list):
+            return Response({'error': 'Send a list of products, or {"products": [...]}'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(rows) > BULK_UPSERT_MAX_ROWS:
+            return Response({'error': f'At most {BULK_UPSERT_MAX_ROWS} products per request'}, status=status.HTTP_400_BAD_REQUEST)
+        with audit_atomic():
+            results, created, updated = bulk_upsert_products(rows)
+            if any(result['status'] == 'error' for result in results):
+                return Response({'created': 0, 'updated': 0, 'results': results}, status=status.HTTP_400_BAD_REQUEST)
+            # One entry per product so each one's history shows the upload
+            for result in results:
+                if result['status'] == 'created':
+                    log_action(request.user, 'create', 'Product', result['id'], f"Created product {result['name']} (bulk upload)")
+                elif result['changes']:
+                    log_action(request.user, 'update', 'Product', result['id'], f"Updated product {result['name']} (bulk upload)",
+                               changes=result['changes'])
+            log_action(request.user, 'other', 'Product', '', f'Bulk upload: created {created}, updated {updated} products')
+        return Response({'created': created, 'updated': updated, 'results': results})
+
+    @action(detail=False, methods=['get'], url_path='search')
+    def search(self, request):
+        """Ranked product search with prefix and typo-tolerant matching"""
+        query = request.query_params.get('q', '')
+        try:
+            limit = int(request.query_params.get('limit', DEFAULT_SEARCH_LIMIT))
+        except ValueError:
+            return Response({'error': 'limit must be a number'}, status=status.HTTP_400_BAD_REQUEST)
+        products = search_products(query, limit)
+        serializer = self.get_serializer(products, many=True)
+        return Response(serializer.data)
+
     @action(detail=True, methods=['post'], url_path='restock')
     def restock(self, request, pk=None):
         product = self.get_object()
         qty = int(request.data.get('quantity', 10))  # Default restock amount is 10
-        product.add_stock(qty)
-        log_action(request.user, 'update', 'Product', product.id, f'Restocked {qty} units')
+        with audit_atomic():
+            previous = product.stock_qty
+            product.add_stock(qty, user=request.user)
+            log_action(request.user, 'update', 'Product', product.id, f'Restocked {qty} units',
+                       changes={'stock_qty': [previous, product.stock_qty]})
         serializer = self.get_serializer(product)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
-class SaleViewSet(viewsets.ModelViewSet):
+class SaleViewSet(StreamingExportMixin, AuditedWritesMixin, viewsets.ModelViewSet):
     queryset = Sale.objects.all()
     serializer_class = SaleSerializer
     permission_classes = [IsAdminOrReadCreateOnly]
+    pagination_class = KeysetCursorPagination
+    cursor_ordering = ('-date', '-id')
+    export_fields = ['id', 'date', 'product_id', 'product__name', 'quantity', 'price', 'discount', 'unit_cost', 'payment_type', 'user__username']
+    export_filename = 'sales'
+    
+    def get_export_queryset(self, from_date, to_date):
+        return filter_sales(from_date, to_date).order_by('date', 'id')
     
     def perform_create(self, serializer):
         # Validate stock before creating sale
@@ -78,68 +231,194 @@ class SaleViewSet(viewsets.ModelViewSet):
         quantity = serializer.validated_data.get('quantity')
         
         if product and not product.can_sell_quantity(quantity):
-            raise ValidationError(f"Insufficient stock for {product.name}. Available: {product.stock_qty}, Requested: {quantity}")
+            raise APIValidationError(f"Insufficient stock for {product.name}. Available: {product.stock_qty}, Requested: {quantity}")
         
-        obj = serializer.save(user=self.request.user)
+        # The stock check above is only a fast path; Sale.save deducts atomically and
+        # fails here if another till sold the last units in the meantime
+        obj = self.save_sale(serializer, user=self.request.user)
         log_action(self.request.user, 'create', 'Sale', obj.id, f'Created sale #{obj.id} for {product.name} x {quantity}')
     
     def perform_update(self, serializer):
-        obj = serializer.save()
-        log_action(self.request.user, 'update', 'Sale', obj.id, f'Updated sale #{obj.id}')
+        before = snapshot(serializer.instance)
+        obj = self.save_sale(serializer)
+        log_action(self.request.user, 'update', 'Sale', obj.id, f'Updated sale #{obj.id}', changes=diff(before, snapshot(obj)))
+    
+    def save_sale(self, serializer, **kwargs):
+        try:
+            return serializer.save(**kwargs)
+        except ValidationError as e:
+            raise APIValidationError(e.messages)
+    
+    @action(detail=False, methods=['post'], url_path='checkout')
+    def checkout(self, request):
+        """Sell a cart of line items in one transaction and return a receipt"""
+        serializer = CheckoutSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            with audit_atomic():
+                sales = checkout(serializer.validated_data['items'], serializer.validated_data['payment_type'], request.user)
+        except CheckoutError as e:
+            return Response({'errors': e.errors}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(build_receipt(sales, request.user), status=status.HTTP_201_CREATED)
     
     def perform_destroy(self, instance):
         log_action(self.request.user, 'delete', 'Sale', instance.id, f'Deleted sale #{instance.id}')
         instance.delete()
 
-class ExpenseViewSet(viewsets.ModelViewSet):
+class ExpenseViewSet(StreamingExportMixin, AuditedWritesMixin, viewsets.ModelViewSet):
     queryset = Expense.objects.all()
     serializer_class = ExpenseSerializer
     permission_classes = [IsAdminOrReadCreateOnly]
+    pagination_class = KeysetCursorPagination
+    cursor_ordering = ('-date', '-id')
+    export_fields = ['id', 'date', 'description', 'category', 'amount']
+    export_filename = 'expenses'
+    
+    def get_export_queryset(self, from_date, to_date):
+        return filter_expenses(from_date, to_date).order_by('date', 'id')
+    
     def perform_create(self, serializer):
         obj = serializer.save()
         log_action(self.request.user, 'create', 'Expense', obj.id, f'Created expense {obj.description}')
     def perform_update(self, serializer):
+        before = snapshot(serializer.instance)
         obj = serializer.save()
-        log_action(self.request.user, 'update', 'Expense', obj.id, f'Updated expense {obj.description}')
+        log_action(self.request.user, 'update', 'Expense', obj.id, f'Updated expense {obj.description}', changes=diff(before, snapshot(obj)))
     def perform_destroy(self, instance):
         log_action(self.request.user, 'delete', 'Expense', instance.id, f'Deleted expense {instance.description}')
         instance.delete()
 
-class AuditLogViewSet(viewsets.ReadOnlyModelViewSet):
+class AuditLogViewSet(StreamingExportMixin, viewsets.ReadOnlyModelViewSet):
     queryset = AuditLog.objects.all().order_by('-timestamp')
     permission_classes = [permissions.IsAdminUser]
     serializer_class = AuditLogSerializer
+    pagination_class = KeysetCursorPagination
+    cursor_ordering = ('-timestamp', '-id')
+    export_fields = ['id', 'timestamp', 'user__username', 'action', 'model', 'object_id', 'details']
+    export_filename = 'audit_logs'
+
+    def filter_params(self):
+        """?user= (id or username), ?model= and ?action= as ORM filters"""
+        params = self.request.query_params
+        filters = {}
+        user = params.get('user')
+        if user:
+            filters['user_id' if user.isdigit() else 'user__username'] = user
+        if params.get('model'):
+            filters['model'] = params['model']
+        if params.get('action'):
+            filters['action'] = params['action']
+        return filters
+
+    def get_queryset(self):
+        return super().get_queryset().filter(**self.filter_params())
+
+    def get_export_queryset(self, from_date, to_date):
+        start, end = business_day_range(from_date, to_date)
+        logs = AuditLog.objects.filter(**self.filter_params())
+        if start:
+            logs = logs.filter(timestamp__gte=start)
+        if end:
+            logs = logs.filter(timestamp__lt=end)
+        return logs.order_by('timestamp', 'id')
+
+    @action(detail=False, methods=['get'], url_path=r'history/(?P<model_name>\w+)/(?P<object_id>[^/]+)')
+    def history(self, request, model_name=None, object_id=None):
+        """Every audit entry for one object, oldest first"""
+        try:
+            # Entries store the model's class name; accept any case in the URL
+            model_name = apps.get_model('core', model_name)._meta.object_name
+        except LookupError:
+            return Response({'error': f'Unknown model {model_name}'}, status=status.HTTP_404_NOT_FOUND)
+        logs = AuditLog.objects.filter(model=model_name, object_id=object_id).select_related('user').order_by('timestamp', 'id')
+        return Response({
+            'model': model_name,
+            'object_id': object_id,
+            'results': AuditLogHistorySerializer(logs, many=True).data,
+        })
+
+    @action(detail=False, methods=['get'], url_path='archived')
+    def archived(self, request):
+        """Search archived entries between ?from= and ?to= (dates), with the same filters"""
+        from_date = parse_date(request.GET.get('from') or '')
+        to_date = parse_date(request.GET.get('to') or '')
+        if from_date is None or to_date is None:
+            return Response({'error': 'from and to must be YYYY-MM-DD'}, status=status.HTTP_400_BAD_REQUEST)
+        if (to_date - from_date).days > ARCHIVE_SEARCH_MAX_DAYS:
+            return Response({'error': f'Search at most {ARCHIVE_SEARCH_MAX_DAYS} days at a time'}, status=status.HTTP_400_BAD_REQUEST)
+        params = request.query_params
+        user = params.get('user')
+        if user and not user.isdigit():
+            user = User.objects.filter(username=user).values_list('id', flat=True).first() or -1
+        entries = search_archive(
+            from_date, to_date,
+            user=int(user) if user else None,
+            model=params.get('model') or None,
+            action=params.get('action') or None,
+            object_id=params.get('object_id') or None,
+            limit=ARCHIVE_SEARCH_LIMIT,
+        )
+        return Response({'results': entries, 'truncated': len(entries) >= ARCHIVE_SEARCH_LIMIT})
+
+class ReportJobViewSet(viewsets.ReadOnlyModelViewSet):
+    queryset = ReportJob.objects.all().order_by('-created_at')
+    permission_classes = [permissions.IsAdminUser]
+    serializer_class = ReportJobSerializer
+
+    @action(detail=True, methods=['get'], url_path='download')
+    def download(self, request, pk=None):
+        job = self.get_object()
+        if job.status != 'done' or not job.file:
+            return Response({'error': f'Report is not ready (status: {job.status})'}, status=status.HTTP_409_CONFLICT)
+        return FileResponse(job.file.open('rb'), as_attachment=True, filename=os.path.basename(job.file.name))
+
+def date_range_error(request):
+    """A 400 response if ?from= or ?to= isn't a valid date, otherwise None"""
+    try:
+        business_day_range(request.GET.get('from'), request.GET.get('to'))
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    return None
+
+def queue_report(request, report_type):
+    """Queue a background report job and return its status payload"""
+    job, created = enqueue_report_job(report_type, request.GET.get('from'), request.GET.get('to'), request.user)
+    serializer = ReportJobSerializer(job, context={'request': request})
+    return Response(serializer.data, status=status.HTTP_202_ACCEPTED if created or job.status != 'done' else status.HTTP_200_OK)
 
 class UserInfoView(APIView):
     permission_classes = [IsAuthenticated]
     def get(self, request):
         user = request.user
+        # A token-claims user has only its claims loaded; fetch the profile fields together
+        profile_fields = {'email', 'first_name', 'last_name'} & user.get_deferred_fields()
+        if profile_fields:
+            user.refresh_from_db(fields=profile_fields)
         return Response({
             'id': user.id,
             'username': user.username,
             'email': user.email,
             'first_name': user.first_name,
             'last_name': user.last_name,
-            'groups': [g.name for g in user.groups.all()],
+            'groups': sorted(user_group_names(user)),
             'is_superuser': user.is_superuser,
         })
 
 class LowStockProductsView(APIView):
     permission_classes = [IsAuthenticated]
     def get(self, request):
-        # Get products with different stock alert levels
-        out_of_stock = Product.objects.filter(stock_qty=0)
-        critical_stock = Product.objects.filter(stock_qty__lte=2, stock_qty__gt=0)
-        low_stock = Product.objects.filter(stock_qty__lte=5, stock_qty__gt=2)
-        medium_stock = Product.objects.filter(stock_qty__lte=10, stock_qty__gt=5)
-        
-        data = {
-            'out_of_stock': ProductSerializer(out_of_stock, many=True).data,
-            'critical': ProductSerializer(critical_stock, many=True).data,
-            'low': ProductSerializer(low_stock, many=True).data,
-            'medium': ProductSerializer(medium_stock, many=True).data,
-            'total_alerts': out_of_stock.count() + critical_stock.count() + low_stock.count() + medium_stock.count()
-        }
+        # One query: products at or below their reorder level, bucketed by a CASE annotation
+        products = Product.stock_alerts().order_by('stock_qty', 'id')
+        selected = ProductSerializer.selected_fields(request)
+        if selected is not None:
+            products = products.only(*ProductSerializer.model_columns(selected))
+        products = list(products)
+        serialized = ProductSerializer(products, many=True, context={'request': request}).data
+        
+        data = {level: [] for level in ('out_of_stock', 'critical', 'low', 'medium')}
+        for product, row in zip(products, serialized):
+            data[product.alert_level].append(row)
+        data['total_alerts'] = len(products)
         return Response(data)
 
 class StockValidationView(APIView):
@@ -168,135 +447,29 @@ class StockValidationView(APIView):
 def sales_report_pdf(request):
     if not REPORTLAB_AVAILABLE:
         return HttpResponse("PDF generation not available. Please install reportlab.", status=503)
+    error = date_range_error(request)
+    if error:
+        return error
+    
+    # Large reports can be generated by the report worker instead of in the request
+    if request.GET.get('async') == 'true':
+        return queue_report(request, 'pdf')
     
     try:
-        from .models import Sale
-        from datetime import datetime
-        
-        # Create PDF buffer
-        buffer = io.BytesIO()
-        p = canvas.Canvas(buffer, pagesize=(612, 792))  # Standard letter size
-        
-        # Set PDF metadata
-        p.setTitle("Sales Report")
-        p.setAuthor("Moto Spares Manager")
-        p.setSubject("Sales Report")
-        p.setCreator("Moto Spares Manager")
-        
-        # Set up the PDF with better spacing - moved down from top
-        p.setFont("Helvetica-Bold", 18)
-        p.drawString(50, 750, "SALES REPORT")
-        
-        p.setFont("Helvetica", 10)
-        p.drawString(50, 730, f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        
         # Get sales data with date filtering
         from_date = request.GET.get('from')
         to_date = request.GET.get('to')
         
-        # Add date range if specified
-        if from_date or to_date:
-            date_range = f"Date Range: {from_date or 'Start'} to {to_date or 'End'}"
-            p.drawString(50, 710, date_range)
-        
-        sales_query = Sale.objects.all()
-        if from_date:
-            sales_query = sales_query.filter(date__gte=from_date)
-        if to_date:
-            sales_query = sales_query.filter(date__lte=to_date)
-        
-        sales = sales_query.order_by('-date')[:100]  # Limit to 100 records
-        
-        if not sales:
-            p.drawString(50, 690, "No sales data available")
-        else:
-            # Table header with better spacing
-            p.setFont("Helvetica-Bold", 11)
-            p.drawString(50, 690, "Date")
-            p.drawString(120, 690, "Product")
-            p.drawString(320, 690, "Qty")
-            p.drawString(380, 690, "Price")
-            p.drawString(480, 690, "Total")
-            
-            # Draw header line
-            p.line(50, 685, 550, 685)
-            
-            # Data rows with better formatting
-            p.setFont("Helvetica", 10)
-            y = 670
-            total_revenue = 0
-            row_count = 0
-            
-            for sale in sales:
-                if y < 80:  # Start new page if running out of space
-                    p.showPage()
-                    p.setFont("Helvetica-Bold", 12)
-                    p.drawString(50, 750, "Sales Report (Continued)")
-                    p.setFont("Helvetica", 10)
-                    y = 730
-                
-                # Get product name
-                product_name = sale.product.name if sale.product else f"Product {sale.product_id}"
-                
-                # Calculate total with error handling
-                try:
-                    sale_total = float(sale.price) * sale.quantity - float(sale.discount or 0)
-                    total_revenue += sale_total
-                except (ValueError, TypeError):
-                    sale_total = 0
-                
-                # Draw row with better spacing
-                p.drawString(50, y, sale.date.strftime('%Y-%m-%d'))
-                # Handle long product names better - allow more space
-                display_name = product_name[:35] + "..." if len(product_name) > 35 else product_name
-                p.drawString(120, y, display_name)
-                p.drawString(320, y, str(sale.quantity))
-                p.drawString(380, y, f"TZS {sale.price}")
-                p.drawString(480, y, f"TZS {sale_total:.2f}")
-                
-                # Draw subtle line between rows
-                p.setStrokeColorRGB(0.9, 0.9, 0.9)
-                p.line(50, y - 2, 550, y - 2)
-                p.setStrokeColorRGB(0, 0, 0)  # Reset to black
-                
-                y -= 18  # Slightly closer spacing
-                row_count += 1
-            
-            # Summary section with better positioning
-            # Draw summary box
-            p.setFillColorRGB(0.95, 0.95, 0.95)
-            p.rect(50, y - 80, 500, 60, fill=1)
-            p.setFillColorRGB(0, 0, 0)  # Reset to black
-            
-            p.setFont("Helvetica-Bold", 12)
-            p.drawString(60, y - 30, "SUMMARY")
-            p.setFont("Helvetica", 10)
-            p.drawString(60, y - 50, f"Total Revenue: TZS {total_revenue:,.2f}")
-            p.drawString(60, y - 70, f"Total Sales: {len(sales)}")
-            
-            # Add footer
-            p.setFont("Helvetica", 8)
-            p.drawString(50, 30, "Generated by Moto Spares Manager")
-            p.drawString(50, 20, f"Page 1 of 1")
-        
-        # Finalize PDF
-        p.showPage()
-        p.save()
-        
-        # Get PDF content
-        buffer.seek(0)
-        pdf_content = buffer.getvalue()
-        buffer.close()
+        # Small reports stay in memory, large ones spill over to disk
+        report_file = tempfile.SpooledTemporaryFile(max_size=REPORT_SPOOL_MAX_SIZE)
+        write_sales_pdf(report_file, from_date, to_date)
+        report_file.seek(0)
         
         # Create response with proper headers
-        response = HttpResponse(content_type='application/pdf')
-        response['Content-Disposition'] = 'attachment; filename="sales_report.pdf"'
+        response = FileResponse(report_file, as_attachment=True, filename='sales_report.pdf', content_type='application/pdf')
         response['Cache-Control'] = 'no-cache, no-store, must-revalidate'
         response['Pragma'] = 'no-cache'
         response['Expires'] = '0'
-        
-        # Write PDF content to response
-        response.write(pdf_content)
         return response
         
     except Exception as e:
@@ -308,71 +481,31 @@ def sales_report_pdf(request):
 @api_view(['GET'])
 @permission_classes([permissions.IsAdminUser])
 def sales_report_excel(request):
-    if not REPORTLAB_AVAILABLE:
+    if not OPENPYXL_AVAILABLE:
         return HttpResponse("Excel generation not available. Please install openpyxl.", status=503)
+    error = date_range_error(request)
+    if error:
+        return error
+    
+    if request.GET.get('async') == 'true':
+        return queue_report(request, 'excel')
     
     try:
-        from .models import Sale
-        from datetime import datetime
-        
-        response = HttpResponse(content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
-        response['Content-Disposition'] = 'attachment; filename="sales_report.xlsx"'
-        
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Sales Report"
-        
-        # Add header
-        ws.append(["Sales Report"])
-        ws.append([f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"])
-        ws.append([])  # Empty row
-        
         # Get date range from query params
         from_date = request.GET.get('from')
         to_date = request.GET.get('to')
         
-        # Filter sales by date range if provided
-        sales_query = Sale.objects.all()
-        if from_date:
-            sales_query = sales_query.filter(date__gte=from_date)
-        if to_date:
-            sales_query = sales_query.filter(date__lte=to_date)
-        
-        sales = sales_query.order_by('-date')[:100]  # Limit to 100 records
+        # Build the workbook on disk, then stream it to the client in blocks
+        report_file = tempfile.TemporaryFile()
+        write_sales_excel(report_file, from_date, to_date)
+        report_file.seek(0)
         
-        # Add column headers
-        headers = ["ID", "Date", "Product", "Quantity", "Price", "Discount", "Total", "Payment Type"]
-        ws.append(headers)
-        
-        # Add data
-        total_revenue = 0
-        for sale in sales:
-            product_name = sale.product.name if sale.product else f"Product {sale.product_id}"
-            try:
-                sale_total = float(sale.price) * sale.quantity - float(sale.discount or 0)
-                total_revenue += sale_total
-            except (ValueError, TypeError):
-                sale_total = 0
-            
-            ws.append([
-                sale.id,
-                sale.date.strftime('%Y-%m-%d'),
-                product_name,
-                sale.quantity,
-                float(sale.price),
-                float(sale.discount),
-                sale_total,
-                sale.payment_type
-            ])
-        
-        # Add summary
-        ws.append([])  # Empty row
-        ws.append(["Summary"])
-        ws.append(["Total Revenue", total_revenue])
-        ws.append(["Total Sales", len(sales)])
-        
-        wb.save(response)
-        return response
+        return FileResponse(
+            report_file,
+            as_attachment=True,
+            filename='sales_report.xlsx',
+            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        )
         
     except Exception as e:
         print(f"Excel generation error: {e}")
@@ -382,115 +515,81 @@ def sales_report_excel(request):
 @permission_classes([permissions.IsAdminUser])
 def reports_data(request):
     """Get comprehensive data for reports and charts"""
+    error = date_range_error(request)
+    if error:
+        return error
     try:
-        from .models import Sale, Product, Expense
-        from datetime import datetime, timedelta
-        
         # Get date range from query params
         from_date = request.GET.get('from')
         to_date = request.GET.get('to')
         
-        # Filter sales by date range if provided
-        sales_query = Sale.objects.all()
-        if from_date:
-            sales_query = sales_query.filter(date__gte=from_date)
-        if to_date:
-            sales_query = sales_query.filter(date__lte=to_date)
-        
-        sales = sales_query.order_by('-date')
-        
-        # Monthly revenue data
-        monthly_revenue = {}
-        for sale in sales:
-            month = sale.date.strftime('%Y-%m')
-            total = float(sale.price) * sale.quantity - float(sale.discount)
-            monthly_revenue[month] = monthly_revenue.get(month, 0) + total
-        
-        # Top products by quantity sold
-        product_sales = {}
-        for sale in sales:
-            product_name = sale.product.name if sale.product else f"Product {sale.product_id}"
-            product_sales[product_name] = product_sales.get(product_name, 0) + sale.quantity
-        
-        # Payment method distribution
-        payment_methods = {}
-        for sale in sales:
-            payment_methods[sale.payment_type] = payment_methods.get(sale.payment_type, 0) + 1
-        
-        # Stock analysis with proper bulk product handling
-        products = Product.objects.all()
-        total_stock_value = 0
-        total_stock_cost = 0
-        
-        for product in products:
-            if product.is_bulk_product and product.units_per_box > 1:
-                # For bulk products: use unit buying price × stock quantity
-                unit_buying_price = float(product.buying_price) / product.units_per_box
-                total_stock_cost += product.stock_qty * unit_buying_price
-                total_stock_value += product.stock_qty * unit_buying_price  # Using cost for stock value
-            else:
-                # For regular products: use buying price × stock quantity
-                total_stock_cost += product.stock_qty * float(product.buying_price)
-                total_stock_value += product.stock_qty * float(product.buying_price)
-        
-        stock_analysis = {
-            'total_products': products.count(),
-            'out_of_stock': products.filter(stock_qty=0).count(),
-            'low_stock': products.filter(stock_qty__lte=5, stock_qty__gt=0).count(),
-            'total_stock_value': total_stock_value,
-            'total_stock_quantity': sum(p.stock_qty for p in products)
-        }
-        
-        # Profit analysis with proper cost calculation and expenses
-        total_revenue = sum(float(sale.price) * sale.quantity - float(sale.discount) for sale in sales)
-        
-        # Calculate total cost of goods sold (COGS)
-        total_cost = 0
-        for sale in sales:
-            if sale.product:
-                if sale.product.is_bulk_product and sale.product.units_per_box > 1:
-                    # For bulk products: use unit buying price × quantity sold
-                    unit_buying_price = float(sale.product.buying_price) / sale.product.units_per_box
-                    total_cost += sale.quantity * unit_buying_price
-                else:
-                    # For regular products: use buying price × quantity sold
-                    total_cost += sale.quantity * float(sale.product.buying_price)
-        
-        # Add expenses to the cost
-        expenses = Expense.objects.all()
-        if from_date:
-            expenses = expenses.filter(date__gte=from_date)
-        if to_date:
-            expenses = expenses.filter(date__lte=to_date)
-        
-        total_expenses = sum(float(expense.amount) for expense in expenses)
-        total_cost += total_expenses
-        
-        total_profit = total_revenue - total_cost
-        
-        return Response({
-            'monthly_revenue': monthly_revenue,
-            'top_products': dict(sorted(product_sales.items(), key=lambda x: x[1], reverse=True)[:10]),
-            'payment_methods': payment_methods,
-            'stock_analysis': stock_analysis,
-            'profit_analysis': {
-                'total_revenue': total_revenue,
-                'total_cost': total_cost,
-                'total_expenses': total_expenses,
-                'total_profit': total_profit,
-                'profit_margin': (total_profit / total_revenue * 100) if total_revenue > 0 else 0
-            },
-            'summary': {
-                'total_sales': sales.count(),
-                'total_revenue': total_revenue,
-                'average_sale': total_revenue / sales.count() if sales.count() > 0 else 0
-            }
-        })
+        data, hit = cached_reports_data(from_date, to_date)
+        response = Response(data)
+        response['X-Cache'] = 'HIT' if hit else 'MISS'
+        return response
         
     except Exception as e:
         print(f"Reports data error: {e}")
         return Response({'error': str(e)}, status=500)
 
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def reports_cache_status(request):
+    """Get hit/miss counters for the reports cache"""
+    return Response(reports_cache_stats())
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def dashboard_data(request):
+    """Get dashboard KPIs from the daily sales rollups"""
+    return Response(build_dashboard_data())
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def sync_changes(request):
+    """A page of products, sales and expenses changed since ?since=<token>, with deleted ids.
+
+    ?models=products,sales limits the sync to those lists; follow ?cursor=<next>
+    until next is null.
+    """
+    try:
+        payload = build_sync_payload(
+            request.GET.get('since'), request,
+            models=parse_models(request.GET.get('models')),
+            cursor=request.GET.get('cursor'),
+            page_size=parse_page_size(request.GET.get('page_size')),
+        )
+        return Response(payload)
+    except SyncError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def stock_as_of_date(request):
+    """Stock on hand at the end of ?date=YYYY-MM-DD, optionally for one ?product=<id>"""
+    day = parse_date(request.GET.get('date') or '')
+    if day is None:
+        return Response({'error': 'date must be YYYY-MM-DD'}, status=status.HTTP_400_BAD_REQUEST)
+    moment = business_midnight(day + timedelta(days=1))
+    products = Product.objects.all()
+    if request.GET.get('product'):
+        if not request.GET['product'].isdigit():
+            return Response({'error': 'product must be a product id'}, status=status.HTTP_400_BAD_REQUEST)
+        products = products.filter(id=int(request.GET['product']))
+    rows = stock_as_of(moment, products).order_by('name').values('id', 'name', 'sku', 'stock_at')
+    return Response({'as_of': moment.isoformat(), 'results': list(rows)})
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def inventory_value(request):
+    """Inventory units and value at the end of ?month=YYYY-MM"""
+    try:
+        year, month = (int(part) for part in request.GET.get('month', '').split('-'))
+        date(year, month, 1)  # rejects months outside 1-12
+    except ValueError:
+        return Response({'error': 'month must be YYYY-MM'}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(inventory_value_at(month_end(year, month)))
+
 @api_view(['GET'])
 def health_check(request):
     """Ultra-simple health check endpoint"""
@@ -505,7 +604,7 @@ def simple_test(request):
 def business_settings(request):
     """Get or update business settings"""
     if request.method == 'GET':
-        settings = BusinessSettings.get_settings()
+        settings = BusinessSettings.cached()
         serializer = BusinessSettingsSerializer(settings)
         return Response(serializer.data)
     
@@ -1,35 +1,73 @@
 const API_BASE = import.meta.env.VITE_API_URL ? import.meta.env.VITE_API_URL + '/api/' : 'https://web-production-3b1a6.up.railway.app/api/';
 
-export async function fetchMetrics(token) {
-  try {
-    const [productsRes, salesRes] = await Promise.all([
-      fetch(API_BASE + 'products/', { headers: { Authorization: 'Bearer ' + token } }),
-      fetch(API_BASE + 'sales/', { headers: { Authorization: 'Bearer ' + token } })
-    ]);
-    
-    if (!productsRes.ok) {
-      throw new Error(`Products API error: ${productsRes.status} ${productsRes.statusText}`);
+// List endpoints are cursor-paginated; follow the `next` links to collect every page
+async function fetchAllPages(url, token, label) {
+  const results = [];
+  let next = url;
+  while (next) {
+    const res = await fetch(next, { headers: { Authorization: 'Bearer ' + token } });
+    if (!res.ok) {
+      throw new Error(`${label} API error: ${res.status} ${res.statusText}`);
     }
-    if (!salesRes.ok) {
-      throw new Error(`Sales API error: ${salesRes.status} ${salesRes.statusText}`);
+    const data = await res.json();
+    if (Array.isArray(data)) {
+      return data;
     }
-    
-    const products = await productsRes.json();
-    const sales = await salesRes.json();
-    return { products, sales };
-  } catch (error) {
-    console.error('fetchMetrics error:', error);
-    throw error;
+    results.push(...data.results);
+    next = data.next;
   }
+  return results;
 }
 
-export async function getProducts(token) {
+// Rows changed since the last sync token, for the listed models only; omit `since` for a full copy.
+// The server pages the rows, so follow `next` and combine the pages into one delta.
+export async function syncChanges(token, since, models) {
+  const params = new URLSearchParams({ models: models.join(',') });
+  if (since) params.set('since', since);
+  let url = API_BASE + 'sync/?' + params;
+  let delta = null;
+  while (url) {
+    const res = await fetch(url, { headers: { Authorization: 'Bearer ' + token } });
+    if (!res.ok) {
+      throw new Error(`Sync API error: ${res.status} ${res.statusText}`);
+    }
+    const page = await res.json();
+    if (delta) {
+      models.forEach(model => delta[model].push(...page[model]));
+      delta.token = page.token;
+    } else {
+      delta = page;
+    }
+    url = page.next ? API_BASE + 'sync/?cursor=' + encodeURIComponent(page.next) : null;
+  }
+  return delta;
+}
+
+// Apply a sync delta to a local list: upsert changed rows by id and drop deleted ids
+export function mergeChanges(rows, changed, deletedIds) {
+  const byId = new Map(rows.map(row => [row.id, row]));
+  deletedIds.forEach(id => byId.delete(id));
+  changed.forEach(row => byId.set(row.id, row));
+  return Array.from(byId.values());
+}
+
+// Dashboard KPIs, 14-day growth, payment mix and recent sales, computed server-side from the rollups
+export async function fetchDashboard(token) {
   try {
-    const res = await fetch(API_BASE + 'products/', { headers: { Authorization: 'Bearer ' + token } });
+    const res = await fetch(API_BASE + 'reports/dashboard/', { headers: { Authorization: 'Bearer ' + token } });
     if (!res.ok) {
-      throw new Error(`Products API error: ${res.status} ${res.statusText}`);
+      throw new Error(`Dashboard API error: ${res.status} ${res.statusText}`);
     }
     return res.json();
+  } catch (error) {
+    console.error('fetchDashboard error:', error);
+    throw error;
+  }
+}
+
+export async function getProducts(token) {
+  try {
+    return await fetchAllPages(API_BASE + 'products/?page_size=500', token, 'Products');
   } catch (error) {
     console.error('getProducts error:', error);
     throw error;
@@ -57,6 +95,8 @@ export async function addProduct(product, token) {
   formData.append('stock_qty', product.stock_qty);
   formData.append('is_bulk_product', product.is_bulk_product ? 'true' : 'false');
   formData.append('units_per_box', product.units_per_box);
+  // Blank means the shop-wide default reorder level
+  formData.append('reorder_level', product.reorder_level ?? '');
   if (product.image) {
     formData.append('image', product.image);
   }
@@ -76,6 +116,8 @@ export async function updateProduct(id, product, token) {
   formData.append('stock_qty', product.stock_qty);
   formData.append('is_bulk_product', product.is_bulk_product ? 'true' : 'false');
   formData.append('units_per_box', product.units_per_box);
+  // Blank means the shop-wide default reorder level
+  formData.append('reorder_level', product.reorder_level ?? '');
   if (product.image) {
     formData.append('image', product.image);
   }
@@ -101,17 +143,36 @@ export async function deleteProduct(id, token) {
 
 export async function getSales(token) {
   try {
-    const res = await fetch(API_BASE + 'sales/', { headers: { Authorization: 'Bearer ' + token } });
-    if (!res.ok) {
-      throw new Error(`Sales API error: ${res.status} ${res.statusText}`);
-    }
-    return res.json();
+    return await fetchAllPages(API_BASE + 'sales/?page_size=500', token, 'Sales');
   } catch (error) {
     console.error('getSales error:', error);
     throw error;
   }
 }
 
+// Sell several line items in one request; resolves to the receipt, or rejects with per-line errors
+export async function checkoutCart(items, paymentType, token) {
+  const payload = {
+    payment_type: paymentType,
+    items: items.map(item => ({
+      product: item.product,
+      quantity: item.quantity,
+      price: item.price,
+      discount: item.discount || 0,
+    })),
+  };
+  const res = await fetch(API_BASE + 'sales/checkout/', {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json', Authorization: 'Bearer ' + token },
+    body: JSON.stringify(payload),
+  });
+  const data = await res.json();
+  if (!res.ok) {
+    throw Object.assign(new Error('Checkout failed'), { errors: data.errors || data });
+  }
+  return data;
+}
+
 export async function addSale(sale, token) {
   const payload = {
     product: sale.product,
@@ -153,8 +214,7 @@ export async function deleteSale(id, token) {
 }
 
 export async function getExpenses(token) {
-  const res = await fetch(API_BASE + 'expenses/', { headers: { Authorization: 'Bearer ' + token } });
-  return res.json();
+  return fetchAllPages(API_BASE + 'expenses/?page_size=500', token, 'Expenses');
 }
 
 export async function addExpense(expense, token) {
@@ -184,8 +244,7 @@ export async function deleteExpense(id, token) {
 }
 
 export async function getAuditLogs(token) {
-  const res = await fetch(API_BASE + 'audit-logs/', { headers: { Authorization: 'Bearer ' + token } });
-  return res.json();
+  return fetchAllPages(API_BASE + 'audit-logs/?page_size=500', token, 'Audit logs');
 }
 
 export async function getLowStockProducts(token) {
@@ -6,6 +6,7 @@ const ProductForm = ({ product, onSave, onCancel }) => {
     buying_price: '',
     selling_price: '',
     stock_qty: '',
+    reorder_level: '',
     image: null,
     is_bulk_product: false,
     units_per_box: 1,
@@ -20,6 +21,7 @@ const ProductForm = ({ product, onSave, onCancel }) => {
         buying_price: product.buying_price || '',
         selling_price: product.selling_price || '',
         stock_qty: product.stock_qty || '',
+        reorder_level: product.reorder_level ?? '',
         image: null,
         is_bulk_product: product.is_bulk_product || false,
         units_per_box: product.units_per_box || 1,
@@ -264,6 +266,28 @@ const ProductForm = ({ product, onSave, onCancel }) => {
         )}
       </div>
 
+      <div>
+        <label style={{ fontWeight: 500, marginBottom: 6, textAlign: 'left', display: 'block' }}>
+          Reorder Level
+        </label>
+        <input 
+          name="reorder_level" 
+          type="number" 
+          min="0" 
+          value={form.reorder_level} 
+          onChange={handleChange} 
+          placeholder="Leave blank to use the default (10)" 
+          style={{ 
+            fontSize: '1rem', 
+            padding: '12px 14px', 
+            borderRadius: 8, 
+            border: '1.5px solid #ddd', 
+            width: '100%',
+            boxSizing: 'border-box'
+          }} 
+        />
+      </div>
+
       <div>
         <label style={{ fontWeight: 500, marginBottom: 6, textAlign: 'left', display: 'block' }}>
           Product Image
@@ -69,7 +69,7 @@ const ProductTable = ({ products, onEdit, onDelete, isAdmin, onView, sortField,
     
     return (
       <tr key={p.id || i} style={rowStyle}>
-        <td style={{ boxSizing: 'border-box', width: 60, padding: '10px 8px', textAlign: 'center', maxWidth: 60, overflow: 'hidden' }}>{p.image ? <img src={p.image} alt={p.name} style={{ width: 40, height: 40, objectFit: 'cover', borderRadius: 4 }} /> : '-'}</td>
+        <td style={{ boxSizing: 'border-box', width: 60, padding: '10px 8px', textAlign: 'center', maxWidth: 60, overflow: 'hidden' }}>{p.image ? <img src={p.thumbnails?.small_webp || p.thumbnails?.small || p.image} alt={p.name} style={{ width: 40, height: 40, objectFit: 'cover', borderRadius: 4 }} /> : '-'}</td>
         <td style={{ boxSizing: 'border-box', width: 260, padding: '10px 8px', fontWeight: 'bold', maxWidth: 260, overflow: 'hidden', textOverflow: 'ellipsis', whiteSpace: 'nowrap', textAlign: 'left' }}>
           <div style={{ fontWeight: 'bold' }}>{displayInfo.name}</div>
           {p.is_out_of_stock && (
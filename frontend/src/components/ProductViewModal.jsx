@@ -48,7 +48,7 @@ const ProductViewModal = ({ product, onClose }) => {
         )}
         {freshProduct.image && (
           <div style={{ marginBottom: 18, textAlign: 'center' }}>
-            <img src={freshProduct.image} alt={freshProduct.name} style={{ width: 120, height: 120, objectFit: 'cover', borderRadius: 8, border: '1.5px solid #eee' }} />
+            <img src={freshProduct.thumbnails?.medium_webp || freshProduct.thumbnails?.medium || freshProduct.image} alt={freshProduct.name} style={{ width: 120, height: 120, objectFit: 'cover', borderRadius: 8, border: '1.5px solid #eee' }} />
           </div>
         )}
         <div style={{ marginBottom: 10 }}><strong>Buying Price:</strong> {formatTZS(buying)}</div>
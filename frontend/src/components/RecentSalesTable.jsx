@@ -1,11 +1,10 @@
 import React from 'react';
 
-const RecentSalesTable = ({ sales, products }) => {
+const RecentSalesTable = ({ sales }) => {
   // Map sales directly into rows: [{product, quantity, price, date}]
   const rows = sales.slice(0, 5).map(sale => {
-    const prod = products.find(p => p.id === sale.product);
     return {
-      product: prod ? prod.name : sale.product,
+      product: sale.product_name || sale.product,
       quantity: sale.quantity,
       price: sale.price,
       date: sale.date ? sale.date.slice(0, 16).replace('T', ' ') : '',
@@ -8,11 +8,11 @@ const AuditLog = () => {
   const [model, setModel] = useState('');
 
   useEffect(() => {
-    fetch('/api/audit-logs/', {
+    fetch('/api/audit-logs/?page_size=200', {
       headers: { Authorization: 'Bearer ' + token },
     })
       .then(res => res.json())
-      .then(setLogs)
+      .then(data => setLogs(Array.isArray(data) ? data : data.results))
       .catch(() => setLogs([]));
   }, [token]);
 
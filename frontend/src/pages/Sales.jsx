@@ -1,7 +1,7 @@
-import React, { useEffect, useState } from 'react';
+import React, { useEffect, useRef, useState } from 'react';
 import SalesTable from '../components/SalesTable';
 import SaleForm from '../components/SaleForm';
-import { getProducts, getSales, addSale, updateSale, deleteSale } from '../api';
+import { syncChanges, mergeChanges, addSale, updateSale, deleteSale } from '../api';
 import { useAuth } from '../AuthContext';
 import ProductViewModal from '../components/ProductViewModal';
 
@@ -18,42 +18,39 @@ const Sales = () => {
   const [filterMonth, setFilterMonth] = useState('');
   const [filterYear, setFilterYear] = useState('');
 
-  useEffect(() => {
-    setLoading(true);
-    Promise.all([
-      getProducts(token),
-      getSales(token)
-    ]).then(([prods, salesData]) => {
-      console.log('Sales: Fetched data successfully', { productsCount: prods.length, salesCount: salesData.length });
-      setProducts(prods);
-      setSales(salesData);
-      setLoading(false);
-    }).catch(error => {
-      console.error('Sales: Error fetching data:', error);
-      setProducts([]);
-      setSales([]);
-      setLoading(false);
-    });
-  }, [token]);
+  const syncToken = useRef(null);
 
+  // Newest first, matching the sales list endpoint
+  const sortSales = rows => rows.sort((a, b) => new Date(b.date) - new Date(a.date) || b.id - a.id);
+
+  // The first call downloads everything; later calls only fetch what changed since the last token
   const refresh = () => {
     setLoading(true);
-    Promise.all([
-      getProducts(token),
-      getSales(token)
-    ]).then(([prods, salesData]) => {
-      console.log('Sales: Refreshed data successfully', { productsCount: prods.length, salesCount: salesData.length });
-      setProducts(prods);
-      setSales(salesData);
+    syncChanges(token, syncToken.current, ['products', 'sales']).then(delta => {
+      console.log('Sales: Synced data successfully', { full: delta.full, productsChanged: delta.products.length, salesChanged: delta.sales.length });
+      if (delta.full) {
+        setProducts(delta.products);
+        setSales(sortSales(delta.sales));
+      } else {
+        setProducts(prev => mergeChanges(prev, delta.products, delta.deleted.products));
+        setSales(prev => sortSales(mergeChanges(prev, delta.sales, delta.deleted.sales)));
+      }
+      syncToken.current = delta.token;
       setLoading(false);
     }).catch(error => {
-      console.error('Sales: Error refreshing data:', error);
+      console.error('Sales: Error syncing data:', error);
+      syncToken.current = null;
       setProducts([]);
       setSales([]);
       setLoading(false);
     });
   };
 
+  useEffect(() => {
+    syncToken.current = null;
+    refresh();
+  }, [token]);
+
   const handleAdd = () => { setEditSale(null); setShowForm(true); };
   const handleSave = async (form) => {
     if (editSale) {
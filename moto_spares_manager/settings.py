@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 import os
+import tempfile
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -85,6 +86,16 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Take the write lock when a transaction starts, so concurrent sales queue up on
+        # the busy timeout instead of failing with "database is locked"
+        'OPTIONS': {
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20,
+        },
+        # A file rather than shared-cache memory, so the concurrency tests behave like a real database
+        'TEST': {
+            'NAME': BASE_DIR / 'test_db.sqlite3',
+        },
     }
 }
 
@@ -115,6 +126,9 @@ LANGUAGE_CODE = 'en-us'
 
 TIME_ZONE = 'UTC'
 
+# Local time zone of the shop, used for business day boundaries in reports
+BUSINESS_TIME_ZONE = os.environ.get('BUSINESS_TIME_ZONE', 'Africa/Dar_es_Salaam')
+
 USE_I18N = True
 
 USE_TZ = True
@@ -128,6 +142,39 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'static')
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Caches
+# The reports cache is file-based so every gunicorn worker on the instance shares it
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'reports': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('REPORTS_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'moto_spares_reports_cache')),
+        'TIMEOUT': int(os.environ.get('REPORTS_CACHE_TIMEOUT', 60 * 60)),
+    },
+}
+
+# Finished background reports are reused for identical requests for this many seconds
+REPORT_JOB_CACHE_TTL = int(os.environ.get('REPORT_JOB_CACHE_TTL', 10 * 60))
+
+# Products without their own reorder level alert at or below this stock quantity
+DEFAULT_REORDER_LEVEL = int(os.environ.get('DEFAULT_REORDER_LEVEL', 10))
+
+# Deleted rows are reported to /api/sync/ clients for this many days; older tokens get a full sync
+SYNC_TOMBSTONE_RETENTION_DAYS = int(os.environ.get('SYNC_TOMBSTONE_RETENTION_DAYS', 30))
+
+# Audit entries are queued per process and bulk inserted once this many are waiting or
+# the oldest is this many seconds old. Strict mode writes each entry in the same
+# transaction as the change it records instead.
+AUDIT_LOG_STRICT = os.environ.get('AUDIT_LOG_STRICT', 'false').lower() == 'true'
+AUDIT_LOG_BUFFER_SIZE = int(os.environ.get('AUDIT_LOG_BUFFER_SIZE', 50))
+AUDIT_LOG_FLUSH_SECONDS = float(os.environ.get('AUDIT_LOG_FLUSH_SECONDS', 2))
+
+# archive_audit_logs moves older entries out of the database into daily .jsonl.gz files here
+AUDIT_LOG_RETENTION_DAYS = int(os.environ.get('AUDIT_LOG_RETENTION_DAYS', 90))
+AUDIT_ARCHIVE_DIR = os.environ.get('AUDIT_ARCHIVE_DIR', os.path.join(BASE_DIR, 'audit_archive'))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -135,17 +182,30 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'core.auth.ClaimsJWTAuthentication',
     ),
 }
 
+# Default and maximum page size for the cursor-paginated list endpoints
+API_PAGE_SIZE = int(os.environ.get('API_PAGE_SIZE', 50))
+API_MAX_PAGE_SIZE = int(os.environ.get('API_MAX_PAGE_SIZE', 500))
+
 from datetime import timedelta
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=60),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
     'AUTH_HEADER_TYPES': ('Bearer',),
+    # Tokens carry the user's roles so requests authenticate without a user query
+    'TOKEN_OBTAIN_SERIALIZER': 'core.auth.ClaimsTokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'core.auth.VersionCheckedTokenRefreshSerializer',
 }
 
+# Each process caches BusinessSettings and checks the stored version at most this often
+BUSINESS_SETTINGS_CHECK_SECONDS = int(os.environ.get('BUSINESS_SETTINGS_CHECK_SECONDS', 5))
+
+# Role and password changes revoke a user's tokens; other processes notice within this many seconds
+TOKEN_VERSION_CACHE_SECONDS = int(os.environ.get('TOKEN_VERSION_CACHE_SECONDS', 30))
+
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 EMAIL_HOST = 'smtp.gmail.com'
 EMAIL_PORT = 587
@@ -32,7 +32,7 @@ print("=" * 50)
 print("Clearing existing data...")
 try:
     # Get all products and delete them
-    products_response = requests.get(f"{BACKEND_URL}/api/products/", headers=headers)
+    products_response = requests.get(f"{BACKEND_URL}/api/products/?paginate=false", headers=headers)
     if products_response.status_code == 200:
         products = products_response.json()
         for product in products:
@@ -41,7 +41,7 @@ try:
                 print(f"✓ Deleted product: {product['name']}")
     
     # Get all sales and delete them
-    sales_response = requests.get(f"{BACKEND_URL}/api/sales/", headers=headers)
+    sales_response = requests.get(f"{BACKEND_URL}/api/sales/?paginate=false", headers=headers)
     if sales_response.status_code == 200:
         sales = sales_response.json()
         for sale in sales:
@@ -50,7 +50,7 @@ try:
                 print(f"✓ Deleted sale: {sale['id']}")
     
     # Get all expenses and delete them
-    expenses_response = requests.get(f"{BACKEND_URL}/api/expenses/", headers=headers)
+    expenses_response = requests.get(f"{BACKEND_URL}/api/expenses/?paginate=false", headers=headers)
     if expenses_response.status_code == 200:
         expenses = expenses_response.json()
         for expense in expenses:
@@ -133,9 +133,9 @@ print("=" * 50)
 # Verify the upload
 print("\nVerifying upload...")
 try:
-    products_response = requests.get(f"{BACKEND_URL}/api/products/", headers=headers)
-    sales_response = requests.get(f"{BACKEND_URL}/api/sales/", headers=headers)
-    expenses_response = requests.get(f"{BACKEND_URL}/api/expenses/", headers=headers)
+    products_response = requests.get(f"{BACKEND_URL}/api/products/?paginate=false", headers=headers)
+    sales_response = requests.get(f"{BACKEND_URL}/api/sales/?paginate=false", headers=headers)
+    expenses_response = requests.get(f"{BACKEND_URL}/api/expenses/?paginate=false", headers=headers)
     
     if products_response.status_code == 200:
         products = products_response.json()